@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
 from .brands import router as brands_router
+from .cache import router as cache_router
 from .categories import router as categories_router
 from .cities import router as cities_router
 from .lgas import router as lgas_router
@@ -21,3 +22,4 @@ base_router.include_router(retailers_router, prefix="/retailers", tags=["Retaile
 base_router.include_router(sales_router, prefix="/sales", tags=["Sales"])
 base_router.include_router(brands_router, prefix="/brands", tags=["Brands"])
 base_router.include_router(categories_router, prefix="/categories", tags=["Categories"])
+base_router.include_router(cache_router, prefix="/cache", tags=["Cache"])
@@ -4,6 +4,7 @@ from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 
 from app.models.schemas import Brand, BrandResponse, HTTPError
+from app.services.base import InvalidCursorError, InvalidFieldsError
 from app.services.brand_service import brand_service
 
 router = APIRouter()
@@ -20,14 +21,27 @@ async def get_brands(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=1000, description="Items per page"),
     brand_name: Optional[str] = Query(None, description="Filter by brand name"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page; overrides page"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. brand_name",
+    ),
 ):
     """Get paginated list of Brands with optional brand name filter"""
     try:
         skip = (page - 1) * page_size
         result = await brand_service.get_brands(
-            skip=skip, limit=page_size, brand_name=brand_name
+            skip=skip,
+            limit=page_size,
+            brand_name=brand_name,
+            cursor=cursor,
+            fields=fields,
         )
         return JSONResponse(content=result)
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -35,14 +49,24 @@ async def get_brands(
 @router.get(
     "/{brand_name}",
     response_model=BrandResponse,
-    responses={404: {"model": HTTPError}, 500: {"model": HTTPError}},
+    responses={
+        400: {"model": HTTPError},
+        404: {"model": HTTPError},
+        500: {"model": HTTPError},
+    },
     summary="Get Brand by Name",
     description="Get detailed information about a specific Brand",
 )
-async def get_brand(brand_name: str):
+async def get_brand(
+    brand_name: str,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. brand_name",
+    ),
+):
     """Get a single Brand by its name"""
     try:
-        brand = await brand_service.get_brand_by_name(brand_name)
+        brand = await brand_service.get_brand_by_name(brand_name, fields=fields)
         if not brand:
             raise HTTPException(
                 status_code=404, detail=f"Brand with name {brand_name} not found"
@@ -50,5 +74,7 @@ async def get_brand(brand_name: str):
         return JSONResponse(content=brand)
     except HTTPException:
         raise
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,93 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+
+from app.core.config import settings
+from app.models.schemas import HTTPError
+from app.services.base import BaseService
+from app.services.cache_warmer import cache_warmer
+
+router = APIRouter()
+
+
+def is_admin(x_admin_token: Optional[str]) -> bool:
+    """Check a request's X-Admin-Token; without a configured token only development allows it"""
+    if not settings.CACHE_ADMIN_TOKEN:
+        return settings.ENVIRONMENT.lower() == "development"
+    return bool(x_admin_token) and secrets.compare_digest(
+        x_admin_token, settings.CACHE_ADMIN_TOKEN
+    )
+
+
+async def verify_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Allow admin requests carrying CACHE_ADMIN_TOKEN, or any request in development"""
+    if is_admin(x_admin_token):
+        return
+    if not settings.CACHE_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Cache admin token is not configured")
+    raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get(
+    "/stats",
+    responses={403: {"model": HTTPError}},
+    summary="Get Cache Stats",
+    description="Get hit/miss counters per cache layer for the worker serving the request "
+    "and progress of the latest cache warm-up",
+    dependencies=[Depends(verify_admin_token)],
+)
+async def get_cache_stats():
+    """Get cache counters for the current worker and cache warm-up progress"""
+    return {**BaseService.cache_stats(), "warmer": await cache_warmer.stats()}
+
+
+@router.get(
+    "/metrics",
+    responses={403: {"model": HTTPError}},
+    summary="Get Cache Metrics",
+    description="Get per-namespace hit ratios, counters and latency histograms "
+    "for the worker serving the request",
+    dependencies=[Depends(verify_admin_token)],
+)
+async def get_cache_metrics():
+    """Get cache metrics for the current worker"""
+    return BaseService.cache_metrics()
+
+
+@router.get(
+    "/keys/largest",
+    responses={403: {"model": HTTPError}, 500: {"model": HTTPError}},
+    summary="Get Largest Cache Keys",
+    description="List the Redis keys using the most memory, sampled with SCAN",
+    dependencies=[Depends(verify_admin_token)],
+)
+async def get_largest_keys(
+    prefix: str = Query("", description="Only consider keys starting with this prefix"),
+    limit: int = Query(20, ge=1, le=1000, description="Number of keys to return"),
+    max_keys: int = Query(
+        100000, ge=1, le=10000000, description="Stop after sampling this many keys"
+    ),
+):
+    """Get the largest cache keys"""
+    try:
+        return await BaseService.largest_cache_keys(prefix, limit, max_keys)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete(
+    "/keys",
+    responses={403: {"model": HTTPError}, 500: {"model": HTTPError}},
+    summary="Invalidate Cache Keys",
+    description="Delete every cache key starting with a prefix, using SCAN and UNLINK",
+    dependencies=[Depends(verify_admin_token)],
+)
+async def invalidate_keys(
+    prefix: str = Query(..., min_length=1, description="Key prefix to invalidate"),
+):
+    """Invalidate cache keys by prefix"""
+    try:
+        return {"prefix": prefix, "deleted": await BaseService.invalidate_prefix(prefix)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -4,6 +4,7 @@ from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 
 from app.models.schemas import Category, CategoryResponse, HTTPError
+from app.services.base import InvalidCursorError, InvalidFieldsError
 from app.services.category_service import category_service
 
 router = APIRouter()
@@ -22,14 +23,27 @@ async def get_categories(
     product_category: Optional[str] = Query(
         None, description="Filter by product category"
     ),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page; overrides page"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. product_category",
+    ),
 ):
     """Get paginated list of Categories with optional product_category filter"""
     try:
         skip = (page - 1) * page_size
         result = await category_service.get_categories(
-            skip=skip, limit=page_size, product_category=product_category
+            skip=skip,
+            limit=page_size,
+            product_category=product_category,
+            cursor=cursor,
+            fields=fields,
         )
         return JSONResponse(content=result)
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -37,14 +51,26 @@ async def get_categories(
 @router.get(
     "/{product_category}",
     response_model=CategoryResponse,
-    responses={404: {"model": HTTPError}, 500: {"model": HTTPError}},
+    responses={
+        400: {"model": HTTPError},
+        404: {"model": HTTPError},
+        500: {"model": HTTPError},
+    },
     summary="Get Category by Name",
     description="Get detailed information about a specific Category",
 )
-async def get_category(product_category: str):
+async def get_category(
+    product_category: str,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. product_category",
+    ),
+):
     """Get a single Category by its product_category"""
     try:
-        category = await category_service.get_category_by_name(product_category)
+        category = await category_service.get_category_by_name(
+            product_category, fields=fields
+        )
         if not category:
             raise HTTPException(
                 status_code=404,
@@ -53,5 +79,7 @@ async def get_category(product_category: str):
         return JSONResponse(content=category)
     except HTTPException:
         raise
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -4,6 +4,7 @@ from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 
 from app.models.schemas import LGA, HTTPError, LGAResponse
+from app.services.base import InvalidCursorError, InvalidFieldsError
 from app.services.lga_service import lga_service
 
 router = APIRouter()
@@ -20,14 +21,35 @@ async def get_lgas(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=1000, description="Items per page"),
     state_code: Optional[str] = Query(None, description="Filter by state code"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page; overrides page"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. lga_name,lga_code",
+    ),
+    zoom: Optional[int] = Query(
+        None, ge=0, le=22, description="Map zoom; returns geometry simplified for it"
+    ),
+    tolerance: Optional[float] = Query(
+        None, gt=0, description="Largest geometry error in degrees; overrides zoom"
+    ),
 ):
     """Get paginated list of LGAs with optional state filter"""
     try:
         skip = (page - 1) * page_size
         result = await lga_service.get_lgas(
-            skip=skip, limit=page_size, state_code=state_code
+            skip=skip,
+            limit=page_size,
+            state_code=state_code,
+            cursor=cursor,
+            fields=fields,
+            zoom=zoom,
+            tolerance=tolerance,
         )
         return JSONResponse(content=result)
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -35,14 +57,24 @@ async def get_lgas(
 @router.get(
     "/{lga_code}",
     response_model=LGA,
-    responses={404: {"model": HTTPError}, 500: {"model": HTTPError}},
+    responses={
+        400: {"model": HTTPError},
+        404: {"model": HTTPError},
+        500: {"model": HTTPError},
+    },
     summary="Get LGA by Code",
     description="Get detailed information about a specific LGA",
 )
-async def get_lga(lga_code: str):
+async def get_lga(
+    lga_code: str,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. lga_name,lga_code",
+    ),
+):
     """Get a single LGA by its code"""
     try:
-        lga = await lga_service.get_lga_by_code(lga_code)
+        lga = await lga_service.get_lga_by_code(lga_code, fields=fields)
         if not lga:
             raise HTTPException(
                 status_code=404, detail=f"LGA with code {lga_code} not found"
@@ -50,5 +82,7 @@ async def get_lga(lga_code: str):
         return JSONResponse(content=lga)
     except HTTPException:
         raise
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -5,6 +5,7 @@ from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 
 from app.models.schemas import HTTPError, SalesMetricsResponse
+from app.services.base import InvalidCursorError
 from app.services.sales_service import sales_service
 
 router = APIRouter()
@@ -29,7 +30,16 @@ async def get_sales_metrics(
     lga_id: Optional[str] = Query(None, description="Filter by LGA ObjectId"),
     brand_id: Optional[str] = Query(None, description="Filter by Brand ObjectId"),
     state_id: Optional[str] = Query(None, description="Filter by State ObjectId"),
-    product_category: Optional[str] = Query(None, description="Filter by product category")
+    product_category: Optional[str] = Query(None, description="Filter by product category"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page; overrides page"
+    ),
+    zoom: Optional[int] = Query(
+        None, ge=0, le=22, description="Map zoom; returns geometry simplified for it"
+    ),
+    tolerance: Optional[float] = Query(
+        None, gt=0, description="Largest geometry error in degrees; overrides zoom"
+    ),
 ):
     """Get sales metrics with optional filters"""
     try:
@@ -42,9 +52,13 @@ async def get_sales_metrics(
             lga_id=lga_id,
             state_id=state_id,
             brand_id=brand_id,
-            product_category=product_category
-            
+            product_category=product_category,
+            cursor=cursor,
+            zoom=zoom,
+            tolerance=tolerance,
         )
         return JSONResponse(content=result)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
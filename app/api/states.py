@@ -4,6 +4,7 @@ from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 
 from app.models.schemas import HTTPError, State, StateResponse
+from app.services.base import InvalidCursorError, InvalidFieldsError
 from app.services.state_service import state_service
 
 router = APIRouter()
@@ -20,14 +21,35 @@ async def get_lgas(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=1000, description="Items per page"),
     state_code: Optional[str] = Query(None, description="Filter by state code"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page; overrides page"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. state_name,state_code",
+    ),
+    zoom: Optional[int] = Query(
+        None, ge=0, le=22, description="Map zoom; returns geometry simplified for it"
+    ),
+    tolerance: Optional[float] = Query(
+        None, gt=0, description="Largest geometry error in degrees; overrides zoom"
+    ),
 ):
     """Get paginated list of LGAs with optional state filter"""
     try:
         skip = (page - 1) * page_size
         result = await state_service.get_states(
-            skip=skip, limit=page_size, state_code=state_code
+            skip=skip,
+            limit=page_size,
+            state_code=state_code,
+            cursor=cursor,
+            fields=fields,
+            zoom=zoom,
+            tolerance=tolerance,
         )
         return JSONResponse(content=result)
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -35,14 +57,24 @@ async def get_lgas(
 @router.get(
     "/{state_code}",
     response_model=State,
-    responses={404: {"model": HTTPError}, 500: {"model": HTTPError}},
+    responses={
+        400: {"model": HTTPError},
+        404: {"model": HTTPError},
+        500: {"model": HTTPError},
+    },
     summary="Get State by Code",
     description="Get detailed information about a specific State",
 )
-async def get_state(state_code: str):
+async def get_state(
+    state_code: str,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. state_name,state_code",
+    ),
+):
     """Get a single State by its code"""
     try:
-        state = await state_service.get_state_by_code(state_code)
+        state = await state_service.get_state_by_code(state_code, fields=fields)
         if not state:
             raise HTTPException(
                 status_code=404, detail=f"State with code {state_code} not found"
@@ -50,5 +82,7 @@ async def get_state(state_code: str):
         return JSONResponse(content=state)
     except HTTPException:
         raise
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
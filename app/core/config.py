@@ -1,8 +1,35 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
 
+class CachePolicy(BaseModel):
+    """Cache behaviour for one service namespace"""
+
+    soft_ttl: int = 3600  # Served fresh until this age in seconds
+    hard_ttl: int = 86400  # Served stale while refreshing until evicted at this age
+    negative_ttl: int = 60  # TTL for not-found and empty results; 0 to not cache them
+    max_entry_bytes: int = 32 * 1024 * 1024  # Larger encoded entries are not cached
+    serializer: Optional[str] = None  # Defaults to CACHE_SERIALIZER
+    compression: Optional[str] = None  # Defaults to CACHE_COMPRESSION
+    dedupe_geometry: bool = False  # Store GeoJSON geometries once, referenced by hash
+
+
+class GeometryLevel(BaseModel):
+    """A precomputed boundary simplification, see app.db.geometry_levels"""
+
+    tolerance: float  # Largest distance in degrees a removed point may lie from the line
+    quantum: float  # Grid spacing in degrees coordinates are snapped to
+
+
+class WarmQuery(BaseModel):
+    """A service call the cache warmer keeps cached"""
+
+    name: str  # Qualified service method name, e.g. "CityService.get_cities"
+    kwargs: Dict[str, Any] = {}
+
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Nigeria Retail Economics API"
     API_V1_STR: str = "/api/v1"
@@ -22,11 +49,101 @@ class Settings(BaseSettings):
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
-    REDIS_TTL: int = 3600  # Cache TTL in seconds
+    REDIS_TTL: int = 3600  # TTL in seconds for entries written without a policy
+    REDIS_MAX_CONNECTIONS: int = 50  # Connection pool size per worker
+    REDIS_POOL_TIMEOUT: float = 2.0  # Max wait for a free pooled connection
+    REDIS_SOCKET_TIMEOUT: float = 1.0  # Max wait for a command reply
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 1.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30  # Seconds between idle connection checks
+
+    # In-process (L1) Cache Settings, applied per worker
+    L1_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    L1_CACHE_MAX_ENTRY_BYTES: int = 4 * 1024 * 1024
+    L1_CACHE_TTL: int = 60  # Bounds staleness across workers
+
+    # Cache Miss Coalescing Settings
+    CACHE_LOCK_LEASE_MS: int = 30000  # Lock expiry if the computing worker dies
+    CACHE_LOCK_WAIT_TIMEOUT: float = 30.0  # Max wait on another worker's computation
+    CACHE_LOCK_POLL_INTERVAL: float = 0.05
+
+    # Cache Policies per service namespace; unlisted namespaces use "default".
+    # Entries are served fresh until soft_ttl, served stale while being
+    # refreshed in the background until hard_ttl, then evicted.
+    CACHE_POLICIES: Dict[str, CachePolicy] = {
+        "default": CachePolicy(),
+        "cities": CachePolicy(soft_ttl=3600, hard_ttl=86400),
+        "sales": CachePolicy(soft_ttl=900, hard_ttl=21600, negative_ttl=300),
+        "lgas": CachePolicy(
+            soft_ttl=86400, hard_ttl=604800, negative_ttl=600, dedupe_geometry=True
+        ),
+        "states": CachePolicy(
+            soft_ttl=86400, hard_ttl=604800, negative_ttl=600, dedupe_geometry=True
+        ),
+        "retailers": CachePolicy(soft_ttl=1800, hard_ttl=43200, negative_ttl=120),
+    }
+    CACHE_XFETCH_BETA: float = 1.0  # Higher values refresh earlier
+
+    # Cache Encoding Settings
+    CACHE_SERIALIZER: str = "msgpack"  # json | msgpack
+    CACHE_COMPRESSION: str = "zstd"  # none | zstd | lz4
+    CACHE_COMPRESSION_THRESHOLD: int = 16384  # Compress bodies at least this size
+    CACHE_COMPRESSION_LEVEL: int = 3
+
+    # Cache Admin Settings
+    CACHE_ADMIN_TOKEN: Optional[str] = None  # Required in X-Admin-Token outside development
+
+    # Geometry Store Settings
+    GEOMETRY_STORE_TTL: int = 2592000  # Must outlive every entry referencing a geometry
+    GEOMETRY_CACHE_MAX_BYTES: int = 268435456  # In-process geometry budget per worker
+    # Simplified boundary levels served to zoomed out maps; a request's zoom or
+    # tolerance picks the coarsest level within its tolerance
+    GEOMETRY_LEVELS: Dict[str, GeometryLevel] = {
+        "high": GeometryLevel(tolerance=0.0005, quantum=0.00001),
+        "medium": GeometryLevel(tolerance=0.002, quantum=0.0001),
+        "low": GeometryLevel(tolerance=0.01, quantum=0.0005),
+    }
+
+    # Cache Warmer Settings
+    CACHE_WARM_ENABLED: bool = True
+    CACHE_WARM_INTERVAL: int = 300  # Seconds between warm cycles
+    CACHE_WARM_CONCURRENCY: int = 4  # Queries computed at once
+    CACHE_WARM_TOP_N: int = 50  # Most frequently requested queries to warm
+    CACHE_WARM_WINDOW: int = 86400  # Seconds of access history used to rank queries
+    CACHE_WARM_QUERIES: List[WarmQuery] = [
+        WarmQuery(name="CityService.get_cities"),
+        WarmQuery(name="StateService.get_states"),
+        WarmQuery(name="LGAService.get_lgas"),
+        WarmQuery(name="CategoryService.get_categories"),
+        WarmQuery(name="SalesService.get_sales_metricsv2"),
+    ]
 
     # MongoDB Settings
     MONGODB_URI: str
     MONGODB_DB: str
+    MONGODB_MAX_POOL_SIZE: int = 100  # Connections per worker process
+    MONGODB_MIN_POOL_SIZE: int = 0  # Connections kept open per worker process
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = 0  # Fail a pool checkout after this long, 0 to wait
+    # Wire compression, in order of preference; zstd needs pymongo[zstd] installed,
+    # e.g. "zstd,zlib", or PyMongo silently falls back to the next compressor
+    MONGODB_COMPRESSORS: str = "zlib"
+    MONGODB_MAX_TIME_MS: int = 15000  # Server-side time limit for every read
+    MONGODB_READ_PREFERENCE: str = "primary"  # Default for every read
+    # Analytics aggregations, such as sales metrics, tolerate replication lag
+    MONGODB_ANALYTICS_READ_PREFERENCE: str = "secondaryPreferred"
+    MONGODB_ANALYTICS_MAX_STALENESS_SECONDS: int = -1  # -1 for no limit, else at least 90
+    MONGODB_ANALYTICS_MAX_TIME_MS: int = 60000
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGODB_CONNECT_TIMEOUT_MS: int = 5000
+    MONGODB_INDEX_RECONCILE: str = "report"  # On startup: off, report or create missing indexes
+    MONGODB_SLOW_QUERY_MS: int = 500  # Log queries slower than this, 0 to disable
+    # Referenced documents cached in process when populated
+    MONGODB_REFERENCE_CACHE_COLLECTIONS: List[str] = ["brands", "product_categories", "periods"]
+    MONGODB_REFERENCE_CACHE_TTL: int = 300
+    MONGODB_REFERENCE_CACHE_MAX_BYTES: int = 16777216  # 16 MB per worker
+    MONGODB_REFERENCE_REGISTRY_REFRESH: int = 300  # Seconds between reference registry reloads
+    MONGODB_PERIOD_INDEX_REFRESH: int = 300  # Seconds between reloads of the period index
+    MONGODB_SALES_ROLLUP: bool = False  # Answer sales metrics from app.db.rollup collections
+    MONGODB_QUERY_CACHE_TTL: int = 300  # Default TTL of builder results cached with .cached()
 
     class Config:
         env_file = ".env"
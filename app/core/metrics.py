@@ -0,0 +1,153 @@
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+# Upper bounds of latency histogram buckets in seconds
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+# Upper bounds of size histogram buckets in bytes, 1 KB to 64 MB
+SIZE_BUCKETS: Tuple[float, ...] = tuple(1024 * 4**i for i in range(9))
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram with count and sum"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot holds values above every bucket
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket holding it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                str(bound): count for bound, count in zip(self.buckets, self.counts)
+            },
+        }
+
+
+class Metrics:
+    """
+    In-process counters and histograms keyed by name and labels.
+    Each worker keeps its own values; they are reported as they are, without
+    aggregation across workers.
+    """
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+
+    @staticmethod
+    def _labels(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def increment(self, name: str, amount: float = 1, **labels: Any) -> None:
+        """
+        Add to a counter.
+
+        Args:
+            name (str): Counter name
+            amount (float): Amount to add
+            **labels: Label values identifying the series
+        """
+        series = self._counters.setdefault(name, {})
+        key = self._labels(labels)
+        series[key] = series.get(key, 0) + amount
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        **labels: Any,
+    ) -> None:
+        """
+        Record a value in a histogram.
+
+        Args:
+            name (str): Histogram name
+            value (float): Observed value
+            buckets (Sequence[float]): Bucket upper bounds, used when the series is created
+            **labels: Label values identifying the series
+        """
+        series = self._histograms.setdefault(name, {})
+        key = self._labels(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram(buckets)
+        histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the enclosed block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        """Return the sum of a counter over every series matching the given labels."""
+        wanted = set(self._labels(labels))
+        return sum(
+            value
+            for key, value in self._counters.get(name, {}).items()
+            if wanted <= set(key)
+        )
+
+    def snapshot(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """
+        Get the current value of every series.
+
+        Returns:
+            Dict[str, Dict[str, List[Dict[str, Any]]]]: Counters and histograms by
+                name, each a list of series with their labels
+        """
+        return {
+            "counters": {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            },
+            "histograms": {
+                name: [
+                    {"labels": dict(key), **histogram.snapshot()}
+                    for key, histogram in series.items()
+                ]
+                for name, series in self._histograms.items()
+            },
+        }
+
+    def reset(self) -> None:
+        """Clear every series."""
+        self._counters.clear()
+        self._histograms.clear()
+
+
+metrics = Metrics()
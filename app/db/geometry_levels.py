@@ -0,0 +1,534 @@
+"""
+Precomputed simplified boundary geometries for coarse map zooms.
+
+Every boundary collection gets a companion "<collection>_levels" collection
+holding each boundary's geometry at every level of settings.GEOMETRY_LEVELS.
+Levels are simplified together, as a topology: coordinates are snapped to the
+level's grid, rings are split into arcs at the points where boundaries meet,
+and every arc is simplified once, so neighbouring boundaries stay gap-free and
+non-overlapping along the border they share.
+
+Usage:
+    python -m app.db.geometry_levels            # build every level of every collection
+    python -m app.db.geometry_levels --only lga_boundaries
+"""
+
+import argparse
+import asyncio
+import math
+import sys
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+from app.core.config import settings
+from app.db.mongo_client import MongoDBClient, mongodb_client
+from app.db.redis_client import redis_client
+from app.db.reference_registry import mark_changed
+
+console = Console()
+
+# Boundary collections with levels, and the prefixes of the cached responses
+# embedding their geometry, dropped when the levels are rebuilt
+BOUNDARY_COLLECTIONS: Dict[str, List[str]] = {
+    "lga_boundaries": ["lgas_list", "lga_"],
+    "state_boundaries": ["states_list", "state_"],
+}
+
+Point = Tuple[int, int]
+
+
+def levels_collection(collection: str) -> str:
+    """Name of the collection holding the levels of a boundary collection."""
+    return f"{collection}_levels"
+
+
+def level_id(level: str, boundary_id: Any) -> str:
+    """_id of a boundary's geometry at a level."""
+    return f"{level}:{boundary_id}"
+
+
+def resolve_level(
+    zoom: Optional[int] = None, tolerance: Optional[float] = None
+) -> Optional[str]:
+    """
+    Pick the coarsest geometry level whose error stays within a tolerance.
+
+    Args:
+        zoom (Optional[int]): Web map zoom; the tolerance is the width of a
+            256 pixel tile's pixel at that zoom, in degrees
+        tolerance (Optional[float]): Largest acceptable error in degrees;
+            overrides zoom
+
+    Returns:
+        Optional[str]: The level name, None for full resolution
+    """
+    if tolerance is None:
+        if zoom is None:
+            return None
+        tolerance = 360 / (256 * 2**zoom)
+    coarsest = None
+    for name, level in settings.GEOMETRY_LEVELS.items():
+        if level.tolerance <= tolerance and (
+            coarsest is None
+            or level.tolerance > settings.GEOMETRY_LEVELS[coarsest].tolerance
+        ):
+            coarsest = name
+    return coarsest
+
+
+def _polygons(geometry: Dict[str, Any]) -> List[List[List[List[float]]]]:
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    return geometry["coordinates"]
+
+
+def _snap(ring: List[List[float]], quantum: float) -> List[Point]:
+    """Snap a ring to the grid, dropping repeated points; closed on return."""
+    snapped: List[Point] = []
+    for x, y, *_ in ring:
+        point = (round(x / quantum), round(y / quantum))
+        if not snapped or snapped[-1] != point:
+            snapped.append(point)
+    if snapped and snapped[0] != snapped[-1]:
+        snapped.append(snapped[0])
+    return snapped
+
+
+def _douglas_peucker(points: List[Point], tolerance: float) -> List[Point]:
+    """Simplify a line keeping its endpoints, iteratively to bound the stack."""
+    if len(points) < 3:
+        return points
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = points[first], points[last]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+        farthest, index = -1.0, first
+        for i in range(first + 1, last):
+            x, y = points[i]
+            if length:
+                distance = abs(dy * (x - x1) - dx * (y - y1)) / length
+            else:
+                distance = math.hypot(x - x1, y - y1)
+            if distance > farthest:
+                farthest, index = distance, i
+        if farthest > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _simplify_arc(arc: Tuple[Point, ...], tolerance: float) -> List[Point]:
+    points = list(arc)
+    if len(points) > 3 and points[0] == points[-1]:
+        # A closed arc has no second endpoint; split it at its farthest point.
+        x0, y0 = points[0]
+        split = max(
+            range(1, len(points) - 1),
+            key=lambda i: (points[i][0] - x0) ** 2 + (points[i][1] - y0) ** 2,
+        )
+        head = _douglas_peucker(points[: split + 1], tolerance)
+        return head + _douglas_peucker(points[split:], tolerance)[1:]
+    return _douglas_peucker(points, tolerance)
+
+
+def _canonical(arc: List[Point]) -> Tuple[Tuple[Point, ...], bool]:
+    """Orient an arc the way every ring sharing it agrees on; True if reversed."""
+    reverse = (arc[-1], arc[-2] if len(arc) > 1 else arc[-1]) < (arc[0], arc[1])
+    return tuple(reversed(arc) if reverse else arc), reverse
+
+
+def _split_ring(
+    ring: List[Point], neighbours: Dict[Point, Set[Point]]
+) -> List[Tuple[Tuple[Point, ...], bool]]:
+    """Split a closed ring at its junctions into canonical arcs and their direction."""
+    points = ring[:-1]
+    count = len(points)
+    junctions = [i for i, point in enumerate(points) if len(neighbours[point]) != 2]
+    if junctions:
+        start = junctions[0]
+        cuts = sorted((i - start) % count for i in junctions) + [count]
+    else:
+        # An isolated ring is one closed arc, started at a point every ring
+        # tracing it agrees on.
+        start = points.index(min(points))
+        cuts = [0, count]
+    points = points[start:] + points[:start]
+    return [
+        _canonical(points[begin:end] + [points[end % count]])
+        for begin, end in zip(cuts, cuts[1:])
+    ]
+
+
+def _orientation(a: Point, b: Point, c: Point) -> int:
+    cross = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+    return (cross > 0) - (cross < 0)
+
+
+def _within(a: Point, b: Point, c: Point) -> bool:
+    """Whether c, collinear with segment ab, lies on it."""
+    return (
+        min(a[0], b[0]) <= c[0] <= max(a[0], b[0])
+        and min(a[1], b[1]) <= c[1] <= max(a[1], b[1])
+    )
+
+
+def _intersects(a: Point, b: Point, c: Point, d: Point) -> bool:
+    """Whether segments ab and cd meet anywhere but at a shared endpoint."""
+    if a in (c, d) or b in (c, d):
+        return False
+    o1, o2 = _orientation(a, b, c), _orientation(a, b, d)
+    o3, o4 = _orientation(c, d, a), _orientation(c, d, b)
+    if o1 != o2 and o3 != o4:
+        return True
+    return (
+        (o1 == 0 and _within(a, b, c))
+        or (o2 == 0 and _within(a, b, d))
+        or (o3 == 0 and _within(c, d, a))
+        or (o4 == 0 and _within(c, d, b))
+    )
+
+
+def _crossing_arcs(
+    arcs: Dict[Tuple[Point, ...], List[Point]]
+) -> Set[Tuple[Point, ...]]:
+    """Find arcs with a segment meeting another segment away from shared endpoints."""
+    segments = [
+        (key, a, b) for key, line in arcs.items() for a, b in zip(line, line[1:])
+    ]
+    if not segments:
+        return set()
+    # Bucket segments by the grid cells their bounding boxes cover, so only
+    # segments sharing a cell are compared.
+    cell = max(
+        1,
+        2 * sum(max(abs(b[0] - a[0]), abs(b[1] - a[1])) for _, a, b in segments)
+        // len(segments),
+    )
+    buckets: Dict[Point, List[int]] = {}
+    for index, (_, a, b) in enumerate(segments):
+        for x in range(min(a[0], b[0]) // cell, max(a[0], b[0]) // cell + 1):
+            for y in range(min(a[1], b[1]) // cell, max(a[1], b[1]) // cell + 1):
+                buckets.setdefault((x, y), []).append(index)
+
+    crossing: Set[Tuple[Point, ...]] = set()
+    for members in buckets.values():
+        for i, first in enumerate(members):
+            key, a, b = segments[first]
+            for second in members[i + 1:]:
+                other, c, d = segments[second]
+                if key in crossing and other in crossing:
+                    continue
+                if _intersects(a, b, c, d):
+                    crossing.update((key, other))
+    return crossing
+
+
+def simplify_topology(
+    geometries: Dict[Any, Dict[str, Any]], tolerance: float, quantum: float
+) -> Dict[Any, Dict[str, Any]]:
+    """
+    Simplify polygon geometries together, preserving the borders they share.
+    Coordinates are snapped to a grid of the quantum, which also makes borders
+    traced by both neighbours coincide exactly. Rings are split into arcs at
+    junctions, points with other than two distinct neighbours across all
+    rings, and each distinct arc is simplified once with Douglas-Peucker, so
+    both sides of a border get the same simplified line. Arcs that then cross
+    are simplified again more finely. Rings that collapse are dropped; a
+    geometry losing every polygon keeps its snapped rings.
+    Geometries other than polygons are returned unchanged.
+
+    Args:
+        geometries (Dict[Any, Dict[str, Any]]): GeoJSON geometries by id
+        tolerance (float): Largest distance in degrees a removed point may lie
+            from the simplified line
+        quantum (float): Grid spacing in degrees
+
+    Returns:
+        Dict[Any, Dict[str, Any]]: Simplified geometries by id
+    """
+    snapped: Dict[Any, List[List[List[Point]]]] = {}
+    neighbours: Dict[Point, Set[Point]] = {}
+    for geometry_id, geometry in geometries.items():
+        if geometry.get("type") not in ("Polygon", "MultiPolygon"):
+            continue
+        polygons = []
+        for polygon in _polygons(geometry):
+            rings = [_snap(ring, quantum) for ring in polygon]
+            # A polygon whose exterior collapses on the grid is dropped with its holes.
+            if not rings or len(rings[0]) < 4:
+                continue
+            polygons.append([ring for ring in rings if len(ring) >= 4])
+            for ring in polygons[-1]:
+                for i in range(len(ring) - 1):
+                    neighbours.setdefault(ring[i], set()).update(
+                        (ring[i - 1] if i else ring[-2], ring[i + 1])
+                    )
+        snapped[geometry_id] = polygons
+
+    # Each ring as the arcs it is made of, with the direction it traces them in
+    split = {
+        geometry_id: [
+            [_split_ring(ring, neighbours) for ring in polygon] for polygon in polygons
+        ]
+        for geometry_id, polygons in snapped.items()
+    }
+    tolerances = {
+        key: tolerance / quantum
+        for polygons in split.values()
+        for polygon in polygons
+        for ring in polygon
+        for key, _ in ring
+    }
+    arcs = {key: _simplify_arc(key, limit) for key, limit in tolerances.items()}
+    # Arcs simplified apart may cross; simplify those again, more finely, until
+    # none do. At zero tolerance an arc keeps every point that is not collinear.
+    while True:
+        retry = [key for key in _crossing_arcs(arcs) if tolerances[key] > 0]
+        if not retry:
+            break
+        for key in retry:
+            tolerances[key] = tolerances[key] / 2 if tolerances[key] > 0.5 else 0
+            arcs[key] = _simplify_arc(key, tolerances[key])
+
+    def assemble(ring: List[Tuple[Tuple[Point, ...], bool]]) -> List[Point]:
+        points: List[Point] = []
+        for key, reverse in ring:
+            line = arcs[key][::-1] if reverse else arcs[key]
+            points.extend(line[1:] if points else line)
+        return points
+
+    decimals = max(0, math.ceil(-math.log10(quantum)))
+    results: Dict[Any, Dict[str, Any]] = {}
+    for geometry_id, geometry in geometries.items():
+        if geometry_id not in snapped:
+            results[geometry_id] = geometry
+            continue
+        polygons = []
+        for polygon in split[geometry_id]:
+            rings = [assemble(ring) for ring in polygon]
+            if len(set(rings[0])) >= 3:
+                polygons.append([ring for ring in rings if len(set(ring)) >= 3])
+        # Boundaries smaller than the tolerance keep their snapped rings, or
+        # their original ones if even those collapsed.
+        polygons = polygons or snapped[geometry_id]
+        if not polygons:
+            results[geometry_id] = geometry
+            continue
+        coordinates = [
+            [
+                [
+                    [round(x * quantum, decimals), round(y * quantum, decimals)]
+                    for x, y in ring
+                ]
+                for ring in polygon
+            ]
+            for polygon in polygons
+        ]
+        if geometry["type"] == "Polygon" and len(coordinates) == 1:
+            results[geometry_id] = {"type": "Polygon", "coordinates": coordinates[0]}
+        else:
+            results[geometry_id] = {"type": "MultiPolygon", "coordinates": coordinates}
+    return results
+
+
+def count_vertices(geometry: Dict[str, Any]) -> int:
+    if geometry.get("type") not in ("Polygon", "MultiPolygon"):
+        return 0
+    return sum(len(ring) for polygon in _polygons(geometry) for ring in polygon)
+
+
+class GeometryLevels:
+    """
+    Builds the simplified levels of boundary collections and swaps them into
+    documents read from those collections.
+    """
+
+    def __init__(self, client: MongoDBClient):
+        """
+        Initialize the levels.
+
+        Args:
+            client (MongoDBClient): MongoDB client
+        """
+        self.client = client
+
+    async def build(self, collection: str) -> Dict[str, Dict[str, int]]:
+        """
+        Rebuild every level of a boundary collection. Levels are written to a
+        scratch collection renamed over the previous levels when complete, so
+        readers never see a partial build.
+
+        Args:
+            collection (str): Boundary collection
+
+        Returns:
+            Dict[str, Dict[str, int]]: Boundaries and vertices per level,
+                "full" included for comparison
+        """
+        documents = await self.client.find_many(
+            collection, {"geometry": {"$exists": True}}, projection={"geometry": 1}
+        )
+        geometries = {document["_id"]: document["geometry"] for document in documents}
+        report = {
+            "full": {
+                "boundaries": len(geometries),
+                "vertices": sum(map(count_vertices, geometries.values())),
+            }
+        }
+
+        target = levels_collection(collection)
+        scratch = self.client.get_collection(f"{target}_build")
+        await scratch.drop()
+        for name, level in settings.GEOMETRY_LEVELS.items():
+            # CPU bound; run off the event loop.
+            simplified = await asyncio.to_thread(
+                simplify_topology, geometries, level.tolerance, level.quantum
+            )
+            if simplified:
+                await scratch.insert_many(
+                    [
+                        {
+                            "_id": level_id(name, boundary_id),
+                            "boundary": boundary_id,
+                            "level": name,
+                            "geometry": geometry,
+                        }
+                        for boundary_id, geometry in simplified.items()
+                    ]
+                )
+            report[name] = {
+                "boundaries": len(simplified),
+                "vertices": sum(map(count_vertices, simplified.values())),
+            }
+        if geometries:
+            await scratch.rename(target, dropTarget=True)
+            await mark_changed(self.client, target)
+        return report
+
+    async def attach(
+        self, documents: List[Dict[str, Any]], collection: str, level: str
+    ) -> None:
+        """
+        Set the geometry of boundary documents to a level, in place. Documents
+        whose level has not been built get their full geometry.
+
+        Args:
+            documents (List[Dict[str, Any]]): Documents of the collection, read
+                without their geometry
+            collection (str): Boundary collection
+            level (str): Level name
+        """
+        ids = [document["_id"] for document in documents]
+        if not ids:
+            return
+        found = await self.client.find_many(
+            levels_collection(collection),
+            {"_id": {"$in": [level_id(level, boundary_id) for boundary_id in ids]}},
+            projection={"boundary": 1, "geometry": 1},
+        )
+        geometries = {item["boundary"]: item["geometry"] for item in found}
+        missing = [boundary_id for boundary_id in ids if boundary_id not in geometries]
+        if missing:
+            full = await self.client.find_many(
+                collection, {"_id": {"$in": missing}}, projection={"geometry": 1}
+            )
+            geometries.update((item["_id"], item.get("geometry")) for item in full)
+        for document in documents:
+            if geometries.get(document["_id"]) is not None:
+                document["geometry"] = geometries[document["_id"]]
+
+
+geometry_levels = GeometryLevels(mongodb_client)
+
+
+async def check_geometry_levels() -> None:
+    """Log boundary collections without levels on startup instead of failing."""
+    for collection in BOUNDARY_COLLECTIONS:
+        target = levels_collection(collection)
+        try:
+            built = await mongodb_client.count(target, {})
+        except Exception as e:
+            console.log(f"[red]Checking {target} failed: {str(e)}[/red]")
+            continue
+        if not built:
+            console.log(
+                f"[yellow]{collection} has no geometry levels; zoomed out requests get "
+                "full geometry until python -m app.db.geometry_levels is run[/yellow]"
+            )
+
+
+async def build_geometry_levels(
+    collections: Optional[List[str]] = None,
+) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """
+    Rebuild the levels of boundary collections and drop the cached responses
+    embedding their geometry.
+
+    Args:
+        collections (Optional[List[str]]): Boundary collections; defaults to all
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, int]]]: Build reports by collection
+    """
+    collections = collections or list(BOUNDARY_COLLECTIONS)
+    reports = await asyncio.gather(
+        *(geometry_levels.build(collection) for collection in collections)
+    )
+    for collection in collections:
+        for prefix in BOUNDARY_COLLECTIONS[collection]:
+            try:
+                await redis_client.delete_by_prefix(prefix)
+            except Exception as e:
+                console.log(
+                    f"[yellow]Could not drop cached {prefix} keys: {str(e)}[/yellow]"
+                )
+    return dict(zip(collections, reports))
+
+
+async def main(args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    reports = await build_geometry_levels(args.only)
+    table = Table(
+        title=f"Built geometry levels in {time.perf_counter() - started:.2f}s"
+    )
+    table.add_column("Collection")
+    table.add_column("Level")
+    table.add_column("Tolerance", justify="right")
+    table.add_column("Boundaries", justify="right")
+    table.add_column("Vertices", justify="right")
+    for collection, report in reports.items():
+        for name, counts in report.items():
+            level = settings.GEOMETRY_LEVELS.get(name)
+            table.add_row(
+                collection,
+                name,
+                f"{level.tolerance:g}" if level else "-",
+                str(counts["boundaries"]),
+                str(counts["vertices"]),
+            )
+    console.print(table)
+
+    await redis_client.close()
+    await mongodb_client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build simplified boundary geometries"
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=list(BOUNDARY_COLLECTIONS),
+        help="Boundary collections to build",
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,221 @@
+import hashlib
+import time
+from typing import Any, Dict, Set, Tuple
+
+import msgpack
+from redis.exceptions import RedisError
+from rich.console import Console
+
+from app.core.config import settings
+from app.db.memory_cache import MemoryCache
+from app.db.redis_client import RedisClient, redis_client
+
+console = Console()
+
+# Marker replacing a geometry in cached data: {"$geometry": "<geometry id>"}
+GEOMETRY_REF = "$geometry"
+
+
+class MissingGeometryError(Exception):
+    """Raised when cached data references a geometry that is no longer stored"""
+
+
+class GeometryStore:
+    """
+    Content-addressed store for GeoJSON geometries referenced by cached data.
+    Cached responses keep a small reference in place of each geometry, and every
+    distinct geometry is stored once in Redis under its content hash. Geometries
+    are re-attached at read time from an in-process cache, falling back to Redis.
+    """
+
+    def __init__(self, client: RedisClient, ttl: int, max_memory_bytes: int):
+        """
+        Initialize the store.
+
+        Args:
+            client (RedisClient): Redis client holding the shared geometry copies
+            ttl (int): Redis TTL for geometries; at least twice the longest hard TTL
+                of a namespace that references them
+            max_memory_bytes (int): Budget for geometries kept in process
+        """
+        self.client = client
+        self.ttl = ttl
+        self.memory = MemoryCache(
+            max_bytes=max_memory_bytes, default_ttl=ttl, max_entry_bytes=max_memory_bytes
+        )
+        # When this worker last wrote each geometry to Redis. Geometries are
+        # rewritten after half their TTL so referencing entries never outlive them.
+        self._persisted: Dict[str, float] = {}
+
+    @staticmethod
+    def geometry_id(geometry: Dict) -> str:
+        """Return the content hash identifying a geometry."""
+        return hashlib.sha256(msgpack.packb(geometry, use_bin_type=True)).hexdigest()[:32]
+
+    @staticmethod
+    def _is_geometry(value: Any) -> bool:
+        return isinstance(value, dict) and "coordinates" in value
+
+    @staticmethod
+    def _is_reference(value: Any) -> bool:
+        return isinstance(value, dict) and GEOMETRY_REF in value
+
+    @classmethod
+    def strip(cls, data: Any) -> Tuple[Any, Dict[str, Dict]]:
+        """
+        Replace every "geometry" value in data with a reference. The input is not modified.
+
+        Args:
+            data (Any): Cached data, typically a document, feature or list of them
+
+        Returns:
+            Tuple[Any, Dict[str, Dict]]: A copy of data holding geometry references,
+                and the referenced geometries keyed by id
+        """
+        geometries: Dict[str, Dict] = {}
+
+        def walk(value: Any) -> Any:
+            if isinstance(value, list):
+                return [walk(item) for item in value]
+            if not isinstance(value, dict):
+                return value
+            result = {}
+            for key, item in value.items():
+                if key == "geometry" and cls._is_geometry(item):
+                    geometry_id = cls.geometry_id(item)
+                    geometries[geometry_id] = item
+                    result[key] = {GEOMETRY_REF: geometry_id}
+                elif isinstance(item, (dict, list)) and key != "coordinates":
+                    result[key] = walk(item)
+                else:
+                    result[key] = item
+            return result
+
+        return walk(data), geometries
+
+    async def externalize(self, data: Any) -> Any:
+        """
+        Replace geometries in data with references, storing any geometry this
+        worker has not written recently.
+
+        Args:
+            data (Any): Cached data, typically a document, feature or list of them
+
+        Returns:
+            Any: A copy of data holding geometry references
+        """
+        externalized, geometries = self.strip(data)
+        pending = {
+            geometry_id: geometry
+            for geometry_id, geometry in geometries.items()
+            if self._needs_persist(geometry_id)
+        }
+        if pending:
+            await self._persist(pending)
+        return externalized
+
+    def _needs_persist(self, geometry_id: str) -> bool:
+        persisted_at = self._persisted.get(geometry_id)
+        return persisted_at is None or time.monotonic() - persisted_at > self.ttl / 2
+
+    async def _persist(self, geometries: Dict[str, Dict]) -> None:
+        payloads = {
+            geometry_id: self.client.codec.encode(geometry)
+            for geometry_id, geometry in geometries.items()
+        }
+        try:
+            async with self.client.redis.pipeline(transaction=False) as pipe:
+                for geometry_id, payload in payloads.items():
+                    pipe.set(f"geom:{geometry_id}", payload, ex=self.ttl)
+                await pipe.execute()
+        except RedisError as e:
+            console.log(f"[red]Geometry store write failed: {str(e)}[/red]")
+            return
+
+        persisted_at = time.monotonic()
+        for geometry_id, geometry in geometries.items():
+            self._persisted[geometry_id] = persisted_at
+            self.memory.set(geometry_id, geometry, len(payloads[geometry_id]))
+
+    async def hydrate(self, data: Any) -> Any:
+        """
+        Replace geometry references in data with the stored geometries.
+        The input is not modified, so cached objects can be shared safely.
+
+        Args:
+            data (Any): Cached data holding geometry references
+
+        Returns:
+            Any: A copy of data with full geometries
+
+        Raises:
+            MissingGeometryError: If a referenced geometry has expired
+        """
+        missing: Set[str] = set()
+
+        def collect(value: Any) -> None:
+            if isinstance(value, list):
+                for item in value:
+                    collect(item)
+            elif isinstance(value, dict):
+                for key, item in value.items():
+                    if key == "geometry" and self._is_reference(item):
+                        if self.memory.get(item[GEOMETRY_REF]) is None:
+                            missing.add(item[GEOMETRY_REF])
+                    elif isinstance(item, (dict, list)) and key != "coordinates":
+                        collect(item)
+
+        collect(data)
+        geometries = await self._load(missing) if missing else {}
+
+        def walk(value: Any) -> Any:
+            if isinstance(value, list):
+                return [walk(item) for item in value]
+            if not isinstance(value, dict):
+                return value
+            result = {}
+            for key, item in value.items():
+                if key == "geometry" and self._is_reference(item):
+                    geometry_id = item[GEOMETRY_REF]
+                    geometry = geometries.get(geometry_id) or self.memory.get(geometry_id)
+                    if geometry is None:
+                        raise MissingGeometryError(geometry_id)
+                    result[key] = geometry
+                elif isinstance(item, (dict, list)) and key != "coordinates":
+                    result[key] = walk(item)
+                else:
+                    result[key] = item
+            return result
+
+        return walk(data)
+
+    async def _load(self, geometry_ids: Set[str]) -> Dict[str, Dict]:
+        ids = list(geometry_ids)
+        try:
+            payloads = await self.client.redis.mget([f"geom:{i}" for i in ids])
+        except RedisError as e:
+            console.log(f"[red]Geometry store read failed: {str(e)}[/red]")
+            raise MissingGeometryError(ids[0])
+
+        geometries = {}
+        for geometry_id, payload in zip(ids, payloads):
+            if payload is None:
+                # Evicted or flushed from Redis, so others may be gone too;
+                # make the next writes store every geometry again.
+                self._persisted.clear()
+                raise MissingGeometryError(geometry_id)
+            geometry = self.client.codec.decode(payload)
+            geometries[geometry_id] = geometry
+            self.memory.set(geometry_id, geometry, len(payload))
+        return geometries
+
+    def stats(self) -> Dict[str, Any]:
+        """Return in-process geometry cache counters."""
+        return {**self.memory.stats(), "persisted": len(self._persisted)}
+
+
+geometry_store = GeometryStore(
+    client=redis_client,
+    ttl=settings.GEOMETRY_STORE_TTL,
+    max_memory_bytes=settings.GEOMETRY_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,426 @@
+"""
+Declared MongoDB indexes and the canonical queries they serve.
+
+Reconcile from the command line:
+    python -m app.db.indexes            # report missing indexes
+    python -m app.db.indexes --create   # create missing indexes
+    python -m app.db.indexes --explain  # also flag queries scanning a collection
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from bson import ObjectId
+from pymongo import ASCENDING, GEOSPHERE, IndexModel
+from rich.console import Console
+from rich.table import Table
+
+from app.db.mongo_client import MongoDBClient, mongodb_client
+from app.db.query_profiler import plan_stages
+
+console = Console()
+
+IndexKeys = List[Tuple[str, Union[int, str]]]
+
+
+class IndexSpec:
+    """A compound index declared for a collection"""
+
+    def __init__(self, collection: str, keys: IndexKeys, reason: str):
+        """
+        Declare an index.
+
+        Args:
+            collection (str): Collection name
+            keys (IndexKeys): Index keys in order: equality fields, then sort
+                fields, then range fields
+            reason (str): The query the index serves
+        """
+        self.collection = collection
+        self.keys = keys
+        self.reason = reason
+
+    @property
+    def name(self) -> str:
+        """Index name, built the way MongoDB names indexes by default."""
+        return "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+    def model(self) -> IndexModel:
+        return IndexModel(self.keys, name=self.name)
+
+    def describe(self) -> Dict[str, str]:
+        return {"collection": self.collection, "name": self.name, "reason": self.reason}
+
+
+class CanonicalQuery:
+    """A representative query of a service method, explained to check index use"""
+
+    def __init__(
+        self,
+        name: str,
+        collection: str,
+        query: Dict[str, Any],
+        sort: Optional[List[Tuple[str, int]]] = None,
+    ):
+        """
+        Declare a canonical query.
+
+        Args:
+            name (str): Service method issuing the query
+            collection (str): Collection name
+            query (Dict[str, Any]): Filter with representative values; aggregations
+                are declared by the filter of their leading $match stage
+            sort (Optional[List[Tuple[str, int]]]): Sort specification
+        """
+        self.name = name
+        self.collection = collection
+        self.query = query
+        self.sort = sort
+
+
+# Placeholder ids; plans depend on the query shape, not on matching documents.
+SAMPLE_ID = ObjectId("000000000000000000000000")
+SAMPLE_PERIODS = {"$in": [SAMPLE_ID, ObjectId("000000000000000000000001")]}
+
+INDEXES: List[IndexSpec] = [
+    # Sales metrics match period ids, optionally narrowed by location or brand.
+    *(
+        IndexSpec(collection, keys, reason)
+        for collection in ("brand_boundaries_unit", "brand_category_boundaries_unit")
+        for keys, reason in (
+            (
+                [("date", ASCENDING), ("_id", ASCENDING)],
+                "sales metrics by period and rollup watermarks",
+            ),
+            ([("lga", ASCENDING), ("date", ASCENDING)], "sales metrics by LGA"),
+            ([("state", ASCENDING), ("date", ASCENDING)], "sales metrics by state"),
+            ([("brand", ASCENDING), ("date", ASCENDING)], "sales metrics by brand"),
+        )
+    ),
+    IndexSpec(
+        "brand_category_boundaries_unit",
+        [("items.product_category", ASCENDING), ("date", ASCENDING)],
+        "sales metrics v2 by product category",
+    ),
+    # Rollups answer the same filters with the period id in place of date.
+    *(
+        IndexSpec(collection, keys, reason)
+        for collection in (
+            "brand_boundaries_rollup",
+            "brand_category_boundaries_rollup",
+        )
+        for keys, reason in (
+            ([("period", ASCENDING)], "sales metrics by period and rollup refresh"),
+            ([("lga", ASCENDING), ("period", ASCENDING)], "sales metrics by LGA"),
+            ([("state", ASCENDING), ("period", ASCENDING)], "sales metrics by state"),
+            ([("brand", ASCENDING), ("period", ASCENDING)], "sales metrics by brand"),
+        )
+    ),
+    IndexSpec(
+        "brand_category_boundaries_rollup",
+        [("product_category", ASCENDING), ("period", ASCENDING)],
+        "sales metrics v2 by product category",
+    ),
+    IndexSpec("periods", [("period_name", ASCENDING)], "period upserts on reload"),
+    IndexSpec("lga_boundaries", [("lga_code", ASCENDING)], "LGA by code"),
+    IndexSpec(
+        "lga_boundaries",
+        [("state_name", ASCENDING), ("lga_name", ASCENDING), ("_id", ASCENDING)],
+        "LGA listing order",
+    ),
+    IndexSpec(
+        "lga_boundaries",
+        [
+            ("state_code", ASCENDING),
+            ("state_name", ASCENDING),
+            ("lga_name", ASCENDING),
+            ("_id", ASCENDING),
+        ],
+        "LGA listing filtered by state",
+    ),
+    IndexSpec("lga_boundaries", [("geometry", GEOSPHERE)], "geospatial queries"),
+    IndexSpec("state_boundaries", [("state_code", ASCENDING)], "state by code"),
+    IndexSpec(
+        "state_boundaries",
+        [("state_name", ASCENDING), ("_id", ASCENDING)],
+        "state listing order",
+    ),
+    IndexSpec(
+        "brands",
+        [("brand_name", ASCENDING), ("_id", ASCENDING)],
+        "brand by name and brand listing order",
+    ),
+    IndexSpec(
+        "product_categories",
+        [("product_category", ASCENDING), ("_id", ASCENDING)],
+        "category by name and category listing order",
+    ),
+]
+
+CANONICAL_QUERIES: List[CanonicalQuery] = [
+    CanonicalQuery(
+        "SalesService.get_sales_metrics",
+        "brand_boundaries_rollup",
+        {"period": SAMPLE_PERIODS, "lga": SAMPLE_ID},
+    ),
+    CanonicalQuery(
+        "SalesService.get_sales_metricsv2",
+        "brand_category_boundaries_rollup",
+        {"period": SAMPLE_PERIODS},
+    ),
+    CanonicalQuery(
+        "SalesService.get_sales_metricsv2",
+        "brand_category_boundaries_rollup",
+        {"period": SAMPLE_PERIODS, "state": SAMPLE_ID},
+    ),
+    CanonicalQuery(
+        "SalesService.get_sales_metricsv2",
+        "brand_category_boundaries_rollup",
+        {"period": SAMPLE_PERIODS, "brand": SAMPLE_ID},
+    ),
+    CanonicalQuery(
+        "SalesService.get_sales_metricsv2",
+        "brand_category_boundaries_rollup",
+        {"period": SAMPLE_PERIODS, "product_category": SAMPLE_ID},
+    ),
+    CanonicalQuery(
+        "SalesRollup.refresh",
+        "brand_category_boundaries_unit",
+        {"date": SAMPLE_PERIODS},
+    ),
+    CanonicalQuery(
+        "LGAService.get_lgas",
+        "lga_boundaries",
+        {"state_code": "NG001"},
+        [("state_name", 1), ("lga_name", 1), ("_id", 1)],
+    ),
+    CanonicalQuery(
+        "LGAService.get_lga_by_code", "lga_boundaries", {"lga_code": "NG001001"}
+    ),
+    CanonicalQuery(
+        "StateService.get_states",
+        "state_boundaries",
+        {},
+        [("state_name", 1), ("_id", 1)],
+    ),
+    CanonicalQuery(
+        "StateService.get_state_by_code", "state_boundaries", {"state_code": "NG001"}
+    ),
+    CanonicalQuery(
+        "BrandService.get_brands",
+        "brands",
+        {"brand_name": {"$nin": [None, "-"]}},
+        [("brand_name", 1), ("_id", 1)],
+    ),
+    CanonicalQuery(
+        "BrandService.get_brand_by_name", "brands", {"brand_name": "Sunlight"}
+    ),
+    CanonicalQuery(
+        "CategoryService.get_categories",
+        "product_categories",
+        {"product_category": {"$nin": [None, "-"]}},
+        [("product_category", 1), ("_id", 1)],
+    ),
+    CanonicalQuery(
+        "CategoryService.get_category_by_name",
+        "product_categories",
+        {"product_category": "Beverages"},
+    ),
+]
+
+
+class IndexRegistry:
+    """
+    Compares declared indexes with those on the server and creates missing ones.
+    Indexes present on the server but not declared are reported, never dropped.
+    """
+
+    def __init__(
+        self,
+        client: MongoDBClient,
+        indexes: List[IndexSpec],
+        queries: List[CanonicalQuery],
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            client (MongoDBClient): MongoDB client
+            indexes (List[IndexSpec]): Declared indexes
+            queries (List[CanonicalQuery]): Canonical queries to explain
+        """
+        self.client = client
+        self.indexes = indexes
+        self.queries = queries
+
+    @staticmethod
+    def _normalize(keys: Any) -> Tuple[Tuple[str, Union[int, str]], ...]:
+        # The server may return directions as floats, e.g. 1.0
+        return tuple(
+            (field, int(direction) if isinstance(direction, float) else direction)
+            for field, direction in keys
+        )
+
+    async def reconcile(self, create: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Compare declared indexes with the server, optionally creating missing ones.
+
+        Args:
+            create (bool): Create missing indexes
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Indexes that are present, missing,
+                created, and present on the server but not declared
+        """
+        report: Dict[str, List[Dict[str, Any]]] = {
+            "present": [],
+            "missing": [],
+            "created": [],
+            "undeclared": [],
+        }
+        by_collection: Dict[str, List[IndexSpec]] = {}
+        for spec in self.indexes:
+            by_collection.setdefault(spec.collection, []).append(spec)
+
+        for collection_name, specs in by_collection.items():
+            collection = self.client.get_collection(collection_name)
+            cursor = await collection.list_indexes()
+            existing = {
+                self._normalize(index["key"].items()): index["name"]
+                async for index in cursor
+            }
+
+            missing = []
+            for spec in specs:
+                if self._normalize(spec.keys) in existing:
+                    report["present"].append(spec.describe())
+                else:
+                    missing.append(spec)
+                    report["missing"].append(spec.describe())
+
+            declared = {self._normalize(spec.keys) for spec in specs}
+            report["undeclared"].extend(
+                {"collection": collection_name, "name": name}
+                for keys, name in existing.items()
+                if keys not in declared and name != "_id_"
+            )
+
+            if create and missing:
+                await collection.create_indexes([spec.model() for spec in missing])
+                report["created"].extend(spec.describe() for spec in missing)
+        return report
+
+    async def explain(self) -> List[Dict[str, Any]]:
+        """
+        Explain every canonical query and flag those scanning a whole collection.
+
+        Returns:
+            List[Dict[str, Any]]: Per query, its name, collection, plan stages and
+                whether the plan contains a COLLSCAN
+        """
+        results = []
+        for query in self.queries:
+            command: Dict[str, Any] = {
+                "find": query.collection,
+                "filter": query.query,
+            }
+            if query.sort:
+                command["sort"] = dict(query.sort)
+            explain = await self.client.db.command(
+                {"explain": command, "verbosity": "queryPlanner"}
+            )
+            stages = plan_stages(explain)
+            results.append(
+                {
+                    "name": query.name,
+                    "collection": query.collection,
+                    "fields": sorted(query.query),
+                    "stages": stages,
+                    "collscan": "COLLSCAN" in stages,
+                }
+            )
+        return results
+
+    async def check(self, create: bool = False) -> None:
+        """Reconcile indexes on startup, logging missing ones instead of failing."""
+        try:
+            report = await self.reconcile(create=create)
+        except Exception as e:
+            console.log(f"[red]Index reconciliation failed: {str(e)}[/red]")
+            return
+
+        for index in report["created"]:
+            console.log(
+                f"[green]Created index {index['collection']}.{index['name']}[/green]"
+            )
+        if not create:
+            for index in report["missing"]:
+                console.log(
+                    f"[yellow]Missing index {index['collection']}.{index['name']} "
+                    f"for {index['reason']}; create it with "
+                    "python -m app.db.indexes --create[/yellow]"
+                )
+
+
+index_registry = IndexRegistry(mongodb_client, INDEXES, CANONICAL_QUERIES)
+
+
+async def main(args: argparse.Namespace) -> int:
+    report = await index_registry.reconcile(create=args.create)
+
+    table = Table(title="Declared indexes")
+    table.add_column("Collection")
+    table.add_column("Index")
+    table.add_column("Serves")
+    table.add_column("Status")
+    created = {(index["collection"], index["name"]) for index in report["created"]}
+    for status in ("present", "missing"):
+        for index in report[status]:
+            key = (index["collection"], index["name"])
+            label = "created" if key in created else status
+            color = {"present": "green", "created": "cyan", "missing": "red"}[label]
+            table.add_row(
+                index["collection"],
+                index["name"],
+                index["reason"],
+                f"[{color}]{label}[/{color}]",
+            )
+    for index in report["undeclared"]:
+        table.add_row(
+            index["collection"], index["name"], "", "[yellow]undeclared[/yellow]"
+        )
+    console.print(table)
+
+    failed = bool(report["missing"]) and not args.create
+    if args.explain:
+        table = Table(title="Canonical query plans")
+        table.add_column("Query")
+        table.add_column("Collection")
+        table.add_column("Filtered on")
+        table.add_column("Plan")
+        for result in await index_registry.explain():
+            plan = " <- ".join(result["stages"])
+            table.add_row(
+                result["name"],
+                result["collection"],
+                ", ".join(result["fields"]),
+                f"[red]{plan}[/red]" if result["collscan"] else plan,
+            )
+            failed = failed or result["collscan"]
+        console.print(table)
+
+    await mongodb_client.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile declared MongoDB indexes")
+    parser.add_argument("--create", action="store_true", help="Create missing indexes")
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Flag canonical queries that scan a collection",
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,358 @@
+"""
+Load LGA and state boundaries and sales periods into MongoDB.
+
+GeoJSON files are streamed feature by feature and written in batches of
+upserts keyed on lga_code, state_code and period_name, so a reload replaces
+documents in place, keeping their _id, instead of duplicating them. The
+sources load concurrently, and the declared indexes are built once every
+source has loaded, sales periods not rolled up yet are then rolled up and
+the simplified geometry levels of the loaded boundaries are rebuilt.
+
+Usage:
+    python -m app.db.ingest
+    python -m app.db.ingest --only states periods --batch-size 1000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from pymongo import ASCENDING, IndexModel, ReplaceOne
+from rich.console import Console
+from rich.table import Table
+
+from app.db.geometry_levels import BOUNDARY_COLLECTIONS, build_geometry_levels
+from app.db.indexes import index_registry
+from app.db.mongo_client import MongoDBClient, mongodb_client
+from app.db.reference_registry import mark_changed
+from app.db.rollup import refresh_rollups
+
+console = Console()
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def stream_features(
+    path: str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the features of a GeoJSON FeatureCollection one at a time.
+    The file is read in chunks, so memory use is bounded by the largest feature
+    rather than by the file.
+
+    Args:
+        path (str): Path to the GeoJSON file
+        chunk_size (int): Characters read at a time
+
+    Returns:
+        Iterator[Dict[str, Any]]: The features, in file order
+
+    Raises:
+        ValueError: If the file has no "features" array
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as file:
+        buffer = ""
+        position = -1
+        # Skip to the start of the features array.
+        while position < 0:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                raise ValueError(f"No features array in {path}")
+            buffer += chunk
+            key = buffer.find('"features"')
+            if key >= 0:
+                position = buffer.find("[", key)
+        buffer = buffer[position + 1:]
+        position = 0
+
+        eof = False
+        while True:
+            # Skip separators between features.
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                feature, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The feature continues past the buffer. Read at least as much again
+                # as is buffered, so a large feature is re-parsed only a few times.
+                if eof:
+                    raise
+                chunk = file.read(max(chunk_size, len(buffer) - position))
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield feature
+            position = end
+            if position > chunk_size:
+                buffer = buffer[position:]
+                position = 0
+
+
+def lga_document(feature: Dict[str, Any]) -> Dict[str, Any]:
+    properties = feature["properties"]
+    return {
+        "lga_name": properties.get("admin2Name", "Unknown"),
+        "lga_code": properties.get("admin2Pcod", "Unknown"),
+        "state_name": properties.get("admin1Name", "Unknown"),
+        "state_code": properties.get("admin1Pcod", "Unknown"),
+        "country_name": properties.get("admin0Name", "Nigeria"),
+        "geometry": feature["geometry"],
+    }
+
+
+def state_document(feature: Dict[str, Any]) -> Dict[str, Any]:
+    properties = feature["properties"]
+    return {
+        "state_name": properties.get("admin1Name", "Unknown"),
+        "state_code": properties.get("admin1Pcod", "Unknown"),
+        "country_name": properties.get("admin0Name", "Nigeria"),
+        "geometry": feature["geometry"],
+    }
+
+
+def period_documents(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield periods from a JSON array, with dates parsed so range queries match."""
+    with open(path, "r", encoding="utf-8") as file:
+        periods = json.load(file)
+    for period in periods:
+        yield {
+            "period_name": period["period_name"],
+            "start_date": datetime.fromisoformat(period["start_date"]),
+            "end_date": datetime.fromisoformat(period["end_date"]),
+        }
+
+
+class Source:
+    """A file loaded into one collection, upserting on a key field"""
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        collection: str,
+        key: str,
+        documents: Callable[[str], Iterator[Dict[str, Any]]],
+    ):
+        """
+        Declare a source.
+
+        Args:
+            name (str): Name used on the command line and in the report
+            path (str): Path to the file
+            collection (str): Target collection
+            key (str): Field identifying a document across reloads
+            documents (Callable[[str], Iterator[Dict[str, Any]]]): Reads the
+                file into documents
+        """
+        self.name = name
+        self.path = path
+        self.collection = collection
+        self.key = key
+        self.documents = documents
+
+
+def default_sources(lgas: str, states: str, periods: str) -> List[Source]:
+    return [
+        Source(
+            "lgas",
+            lgas,
+            "lga_boundaries",
+            "lga_code",
+            lambda path: (lga_document(feature) for feature in stream_features(path)),
+        ),
+        Source(
+            "states",
+            states,
+            "state_boundaries",
+            "state_code",
+            lambda path: (state_document(feature) for feature in stream_features(path)),
+        ),
+        Source("periods", periods, "periods", "period_name", period_documents),
+    ]
+
+
+async def load(
+    client: MongoDBClient, source: Source, batch_size: int
+) -> Dict[str, Any]:
+    """
+    Upsert every document of a source in unordered batches.
+    The next batch is parsed while the previous one is being written.
+
+    Args:
+        client (MongoDBClient): MongoDB client
+        source (Source): The source to load
+        batch_size (int): Documents per bulk write
+
+    Returns:
+        Dict[str, Any]: Document counts, bytes read and elapsed seconds
+    """
+    collection = client.get_collection(source.collection)
+    # Upserts find documents by key; without an index each one scans the collection.
+    await collection.create_indexes(
+        [IndexModel([(source.key, ASCENDING)], name=f"{source.key}_1")]
+    )
+
+    report = {"documents": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+    started = time.perf_counter()
+    pending: Optional[asyncio.Task] = None
+
+    async def write(batch: List[ReplaceOne]) -> None:
+        result = await collection.bulk_write(batch, ordered=False)
+        report["inserted"] += result.upserted_count
+        report["updated"] += result.modified_count
+        report["unchanged"] += result.matched_count - result.modified_count
+
+    batch: List[ReplaceOne] = []
+    for document in source.documents(source.path):
+        batch.append(
+            ReplaceOne({source.key: document[source.key]}, document, upsert=True)
+        )
+        report["documents"] += 1
+        if len(batch) >= batch_size:
+            if pending is not None:
+                await pending
+            pending = asyncio.create_task(write(batch))
+            batch = []
+            # Let the write start before parsing the next batch.
+            await asyncio.sleep(0)
+    if pending is not None:
+        await pending
+    if batch:
+        await write(batch)
+    if report["inserted"] or report["updated"]:
+        await mark_changed(client, source.collection)
+
+    return {
+        **report,
+        "bytes": os.path.getsize(source.path),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+async def main(args: argparse.Namespace) -> int:
+    sources = [
+        source
+        for source in default_sources(args.lgas, args.states, args.periods)
+        if not args.only or source.name in args.only
+    ]
+    missing = [source for source in sources if not os.path.exists(source.path)]
+    for source in missing:
+        console.log(f"[yellow]Skipping {source.name}: {source.path} not found[/yellow]")
+    sources = [source for source in sources if source not in missing]
+    if not sources:
+        console.log("[red]Nothing to load[/red]")
+        return 1
+
+    await mongodb_client.ping()
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(load(mongodb_client, source, args.batch_size) for source in sources),
+        return_exceptions=True,
+    )
+    loaded = time.perf_counter() - started
+
+    table = Table(title=f"Loaded {len(sources)} sources in {loaded:.2f}s")
+    table.add_column("Source")
+    table.add_column("Collection")
+    table.add_column("Documents", justify="right")
+    table.add_column("Inserted", justify="right")
+    table.add_column("Updated", justify="right")
+    table.add_column("Unchanged", justify="right")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Docs/s", justify="right")
+    table.add_column("MB/s", justify="right")
+    failed = False
+    for source, result in zip(sources, results):
+        if isinstance(result, BaseException):
+            failed = True
+            console.log(f"[red]Loading {source.name} failed: {str(result)}[/red]")
+            continue
+        seconds = result["seconds"] or 1e-9
+        table.add_row(
+            source.name,
+            source.collection,
+            str(result["documents"]),
+            str(result["inserted"]),
+            str(result["updated"]),
+            str(result["unchanged"]),
+            f"{result['seconds']:.2f}",
+            f"{result['documents'] / seconds:.0f}",
+            f"{result['bytes'] / seconds / 1024 / 1024:.1f}",
+        )
+    console.print(table)
+
+    if not args.skip_indexes:
+        started = time.perf_counter()
+        report = await index_registry.reconcile(create=True)
+        console.log(
+            f"[green]Built {len(report['created'])} indexes "
+            f"in {time.perf_counter() - started:.2f}s[/green]"
+        )
+
+    if not args.skip_rollup:
+        started = time.perf_counter()
+        report = await refresh_rollups()
+        console.log(
+            f"[green]Rolled up {sum(report.values())} new or changed sales periods "
+            f"in {time.perf_counter() - started:.2f}s[/green]"
+        )
+
+    boundaries = [
+        source.collection
+        for source, result in zip(sources, results)
+        if source.collection in BOUNDARY_COLLECTIONS
+        and not isinstance(result, BaseException)
+    ]
+    if boundaries and not args.skip_levels:
+        started = time.perf_counter()
+        await build_geometry_levels(boundaries)
+        console.log(
+            f"[green]Built geometry levels of {', '.join(boundaries)} "
+            f"in {time.perf_counter() - started:.2f}s[/green]"
+        )
+
+    await mongodb_client.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load boundaries and periods into MongoDB"
+    )
+    parser.add_argument("--lgas", default="nigeria_lga_boundaries.geojson")
+    parser.add_argument("--states", default="nigeria_state_boundaries.geojson")
+    parser.add_argument("--periods", default="periods.json")
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=["lgas", "states", "periods"],
+        help="Sources to load",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=500, help="Documents per bulk write"
+    )
+    parser.add_argument(
+        "--skip-indexes",
+        action="store_true",
+        help="Do not build declared indexes afterward",
+    )
+    parser.add_argument(
+        "--skip-rollup",
+        action="store_true",
+        help="Do not roll up new or changed sales periods afterward",
+    )
+    parser.add_argument(
+        "--skip-levels",
+        action="store_true",
+        help="Do not rebuild simplified boundary geometries afterward",
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
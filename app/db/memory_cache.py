@@ -0,0 +1,122 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+class MemoryCache:
+    """
+    In-process LRU cache bounded by a byte budget, with a TTL per entry.
+    Sits in front of Redis so hot keys skip the network round trip and decoding.
+    Values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int, default_ttl: int, max_entry_bytes: int):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_bytes (int): Total payload bytes the cache may hold
+            default_ttl (int): TTL in seconds for entries stored without one
+            max_entry_bytes (int): Entries larger than this are never stored
+        """
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value and mark it as most recently used.
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            Optional[Any]: The cached value, None if absent or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, _, expires_at = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[int] = None) -> None:
+        """
+        Store a value, evicting least recently used entries to stay in budget.
+
+        Args:
+            key (str): The cache key
+            value (Any): The value to store
+            size (int): Encoded size of the value in bytes
+            ttl (Optional[int]): TTL in seconds. Defaults to default_ttl.
+        """
+        self.delete(key)
+        if size > self.max_entry_bytes or size > self.max_bytes:
+            return
+
+        while self._bytes + size > self.max_bytes and self._entries:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.default_ttl)
+        self._entries[key] = (value, size, expires_at)
+        self._bytes += size
+
+    def delete(self, key: str) -> None:
+        """Remove a key if present."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def delete_prefix(self, prefix: str) -> int:
+        """
+        Remove every key starting with a prefix.
+
+        Returns:
+            int: Number of keys removed
+        """
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            self.delete(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return usage counters for tuning the byte budget."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+memory_cache = MemoryCache(
+    max_bytes=settings.L1_CACHE_MAX_BYTES,
+    default_ttl=settings.L1_CACHE_TTL,
+    max_entry_bytes=settings.L1_CACHE_MAX_ENTRY_BYTES,
+)
@@ -1,38 +1,80 @@
 import asyncio
-from typing import Any, Dict, List, Optional
-
-from pymongo import MongoClient
-from pymongo.collection import Collection
-from pymongo.database import Database
+from typing import Any, Dict, Hashable, Iterator, List, Optional
+
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.read_preferences import (
+    _ServerMode,
+    make_read_preference,
+    read_pref_mode_from_name,
+)
 from rich.console import Console
 
 from app.core.config import settings
+from app.db.pool_metrics import pool_metrics_listener
+from app.db.query_cache import query_cache, query_hash
+from app.db.query_profiler import query_profiler
+from app.db.reference_cache import reference_cache
 
 console = Console()
 
 
+class KeysetMismatchError(ValueError):
+    """Raised when keyset pagination values do not match the sort fields"""
+
+
 class MongoDBClient:
     """
-    MongoDB client singleton for database operations.
-    Provides connection pooling and query execution.
+    Asyncio MongoDB client singleton for database operations.
+    All operations share one connection pool per worker process and are awaited
+    on the event loop, so a slow query only suspends the request waiting on it.
+    Every read is bounded by MONGODB_MAX_TIME_MS on the server and follows
+    MONGODB_READ_PREFERENCE, except analytics aggregations, which use the
+    MONGODB_ANALYTICS_* settings. Pool checkout waits are recorded as metrics.
     """
 
     def __init__(self):
-        """Initialize MongoDB client with configuration."""
+        """Initialize the MongoDB client; connections are opened on first use."""
+        self.client: AsyncMongoClient = AsyncMongoClient(
+            settings.MONGODB_URI,
+            maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+            waitQueueTimeoutMS=settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS or None,
+            compressors=settings.MONGODB_COMPRESSORS or None,
+            readPreference=settings.MONGODB_READ_PREFERENCE,
+            serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            connectTimeoutMS=settings.MONGODB_CONNECT_TIMEOUT_MS,
+            event_listeners=[pool_metrics_listener],
+        )
+        self.db: AsyncDatabase = self.client[settings.MONGODB_DB]
+        self.max_time_ms = settings.MONGODB_MAX_TIME_MS
+        self.analytics_read_preference: _ServerMode = make_read_preference(
+            read_pref_mode_from_name(settings.MONGODB_ANALYTICS_READ_PREFERENCE),
+            None,
+            settings.MONGODB_ANALYTICS_MAX_STALENESS_SECONDS,
+        )
+        self.analytics_max_time_ms = settings.MONGODB_ANALYTICS_MAX_TIME_MS
+
+    async def ping(self) -> None:
+        """
+        Check that the server is reachable.
+
+        Raises:
+            Exception: If no server is selected within the server selection timeout
+        """
         try:
-            self.client: MongoClient = MongoClient(
-                settings.MONGODB_URI,
-                connect=False,  # Defer connection until first operation
-            )
-            self.db: Database = self.client[settings.MONGODB_DB]
-            # Test connection
-            self.client.server_info()
+            await self.client.admin.command("ping")
             console.log("[green]MongoDB connection successful[/green]")
         except Exception as e:
             console.log(f"[red]MongoDB connection failed: {str(e)}[/red]")
             raise
 
-    def get_collection(self, collection_name: str) -> Collection:
+    async def close(self) -> None:
+        """Close every pooled connection."""
+        await self.client.close()
+
+    def get_collection(self, collection_name: str) -> AsyncCollection:
         """
         Get a MongoDB collection by name.
 
@@ -40,7 +82,7 @@ class MongoDBClient:
             collection_name (str): Name of the collection
 
         Returns:
-            Collection: MongoDB collection object
+            AsyncCollection: MongoDB collection object
         """
         return self.db[collection_name]
 
@@ -59,17 +101,20 @@ class MongoDBClient:
         """
         try:
             collection = self.get_collection(collection_name)
-            cursor = collection.find({})
+            cursor = collection.find({}).max_time_ms(self.max_time_ms)
             if limit > 0:
                 cursor = cursor.limit(limit)
-            documents = list(cursor)
+            documents = await cursor.to_list()
             return documents
         except Exception as e:
             console.log(f"[red]Error in retrieve_all: {str(e)}[/red]")
             raise
 
     async def find_one(
-        self, collection_name: str, query: Dict[str, Any]
+        self,
+        collection_name: str,
+        query: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         Find a single document in the specified collection.
@@ -77,13 +122,21 @@ class MongoDBClient:
         Args:
             collection_name (str): Name of the collection
             query (Dict[str, Any]): Query filter
+            projection (Optional[Dict[str, Any]], optional): Fields to return.
+                Defaults to None (all fields).
 
         Returns:
             Optional[Dict[str, Any]]: Found document or None
         """
         try:
             collection = self.get_collection(collection_name)
-            return collection.find_one(query)
+            return await query_profiler.run(
+                self.db,
+                self.find_command(collection_name, query, projection, limit=1),
+                lambda: collection.find_one(
+                    query, projection, max_time_ms=self.max_time_ms
+                ),
+            )
         except Exception as e:
             console.log(f"[red]Error in find_one: {str(e)}[/red]")
             raise
@@ -95,6 +148,8 @@ class MongoDBClient:
         limit: int = 0,
         skip: int = 0,
         sort: Optional[List[tuple]] = None,
+        after: Optional[List[Any]] = None,
+        projection: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Find multiple documents in the specified collection.
@@ -105,13 +160,20 @@ class MongoDBClient:
             limit (int, optional): Maximum number of documents. Defaults to 0 (no limit).
             skip (int, optional): Number of documents to skip. Defaults to 0.
             sort (Optional[List[tuple]], optional): Sort specification. Defaults to None.
+            after (Optional[List[Any]], optional): Sort key values of the last document
+                of the previous page; only documents after it are returned. Requires sort.
+            projection (Optional[Dict[str, Any]], optional): Fields to return.
+                Defaults to None (all fields).
 
         Returns:
             List[Dict[str, Any]]: List of found documents
         """
         try:
+            if after is not None:
+                query = {"$and": [query, self.keyset_filter(sort or [], after)]}
             collection = self.get_collection(collection_name)
-            cursor = collection.find(query).skip(skip)
+            cursor = collection.find(query, projection).skip(skip)
+            cursor = cursor.max_time_ms(self.max_time_ms)
 
             if limit > 0:
                 cursor = cursor.limit(limit)
@@ -119,11 +181,98 @@ class MongoDBClient:
             if sort:
                 cursor = cursor.sort(sort)
 
-            return list(cursor)
+            command = self.find_command(collection_name, query, projection, sort, skip, limit)
+            return await query_profiler.run(self.db, command, cursor.to_list)
         except Exception as e:
             console.log(f"[red]Error in find_many: {str(e)}[/red]")
             raise
 
+    @staticmethod
+    def find_command(
+        collection_name: str,
+        query: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[tuple]] = None,
+        skip: int = 0,
+        limit: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Describe a find as a database command, for explain and the query profiler.
+
+        Args:
+            collection_name (str): Name of the collection
+            query (Dict[str, Any]): Query filter
+            projection (Optional[Dict[str, Any]]): Fields to return
+            sort (Optional[List[tuple]]): Sort specification
+            skip (int): Number of documents to skip
+            limit (int): Maximum number of documents, 0 for no limit
+
+        Returns:
+            Dict[str, Any]: The find command
+        """
+        command: Dict[str, Any] = {"find": collection_name, "filter": query}
+        if projection:
+            command["projection"] = projection
+        if sort:
+            command["sort"] = dict(sort)
+        if skip:
+            command["skip"] = skip
+        if limit:
+            command["limit"] = limit
+        return command
+
+    @staticmethod
+    def keyset_filter(sort: List[tuple], after: List[Any]) -> Dict[str, Any]:
+        """
+        Build a filter matching documents that sort after the given key values.
+        The sort must end in a unique field (usually _id) for pages not to overlap.
+
+        Args:
+            sort (List[tuple]): Sort specification as (field, direction) pairs
+            after (List[Any]): Values of the sort fields, in order
+
+        Returns:
+            Dict[str, Any]: Filter selecting the documents after the key
+
+        Raises:
+            KeysetMismatchError: If the number of values does not match the sort fields
+        """
+        if len(sort) != len(after):
+            raise KeysetMismatchError("Cursor does not match the sort fields")
+
+        clauses = []
+        for index, (field, direction) in enumerate(sort):
+            clause = {sort[i][0]: after[i] for i in range(index)}
+            clause[field] = {"$gt" if direction == 1 else "$lt": after[index]}
+            clauses.append(clause)
+        return {"$or": clauses}
+
+    async def count(
+        self, collection_name: str, query: Dict[str, Any], estimate: bool = False
+    ) -> int:
+        """
+        Count documents matching a query on the server.
+
+        Args:
+            collection_name (str): Name of the collection
+            query (Dict[str, Any]): Query filter
+            estimate (bool, optional): For an empty query, read the count from
+                collection metadata instead of scanning. Defaults to False.
+
+        Returns:
+            int: Number of matching documents
+        """
+        try:
+            collection = self.get_collection(collection_name)
+            if estimate and not query:
+                return await collection.estimated_document_count(
+                    maxTimeMS=self.max_time_ms
+                )
+            return await collection.count_documents(query, maxTimeMS=self.max_time_ms)
+        except Exception as e:
+            console.log(f"[red]Error in count: {str(e)}[/red]")
+            raise
+
     async def insert_one(self, collection_name: str, document: Dict[str, Any]) -> str:
         """
         Insert a single document into the specified collection.
@@ -137,7 +286,7 @@ class MongoDBClient:
         """
         try:
             collection = self.get_collection(collection_name)
-            result = collection.insert_one(document)
+            result = await collection.insert_one(document)
             return str(result.inserted_id)
         except Exception as e:
             console.log(f"[red]Error in insert_one: {str(e)}[/red]")
@@ -164,7 +313,7 @@ class MongoDBClient:
         """
         try:
             collection = self.get_collection(collection_name)
-            result = collection.update_one(query, update, upsert=upsert)
+            result = await collection.update_one(query, update, upsert=upsert)
             return result.modified_count > 0
         except Exception as e:
             console.log(f"[red]Error in update_one: {str(e)}[/red]")
@@ -183,7 +332,7 @@ class MongoDBClient:
         """
         try:
             collection = self.get_collection(collection_name)
-            result = collection.delete_one(query)
+            result = await collection.delete_one(query)
             return result.deleted_count > 0
         except Exception as e:
             console.log(f"[red]Error in delete_one: {str(e)}[/red]")
@@ -212,6 +361,11 @@ class AggregateBuilder:
         self.mongodb_client = mongodb_client
         self.collection = mongodb_client.get_collection(collection_name)
         self.pipeline: List[Dict[str, Any]] = []
+        self._profile = False
+        self._cached = False
+        self._cache_ttl: Optional[int] = None
+        self._read_preference: Optional[_ServerMode] = None
+        self._max_time_ms = mongodb_client.max_time_ms
 
     def match(self, criteria: Dict[str, Any]) -> "AggregateBuilder":
         self.pipeline.append({"$match": criteria})
@@ -244,11 +398,88 @@ class AggregateBuilder:
         self.pipeline.append(stage)
         return self
 
+    def profile(self) -> "AggregateBuilder":
+        """
+        Explain the pipeline after it runs and log its execution stats.
+        The pipeline runs a second time for the explain.
+        """
+        self._profile = True
+        return self
+
+    def analytics(self) -> "AggregateBuilder":
+        """
+        Run as an analytics aggregation, which tolerates replication lag: on
+        MONGODB_ANALYTICS_READ_PREFERENCE, secondaries by default, and bounded
+        by MONGODB_ANALYTICS_MAX_TIME_MS.
+        """
+        self._read_preference = self.mongodb_client.analytics_read_preference
+        self._max_time_ms = self.mongodb_client.analytics_max_time_ms
+        return self
+
+    def cached(self, ttl: Optional[int] = None) -> "AggregateBuilder":
+        """
+        Cache the results under a hash of the collection and the normalized
+        pipeline, so identical pipelines built anywhere share one entry.
+
+        Args:
+            ttl (Optional[int]): Seconds to cache the results. Defaults to
+                MONGODB_QUERY_CACHE_TTL.
+        """
+        self._cached = True
+        self._cache_ttl = ttl
+        return self
+
+    def command(self) -> Dict[str, Any]:
+        return {
+            "aggregate": self.collection.name,
+            "pipeline": self.pipeline,
+            "cursor": {},
+        }
+
+    def query_hash(self) -> str:
+        """
+        Canonical hash of the collection and pipeline, which .cached() keys the
+        results by. Equivalent pipelines share it, so callers may key data they
+        derive from the results by it too.
+        """
+        return query_hash(self.command())
+
+    async def explain(self, verbosity: str = "queryPlanner") -> Dict[str, Any]:
+        """
+        Explain the pipeline without returning its results.
+
+        Args:
+            verbosity (str): queryPlanner, executionStats or allPlansExecution
+
+        Returns:
+            Dict[str, Any]: The explain output
+        """
+        return await self.mongodb_client.db.command(
+            {"explain": self.command(), "verbosity": verbosity}
+        )
+
     async def exec(self) -> List[Dict[str, Any]]:
-        def _aggregate():
-            return list(self.collection.aggregate(self.pipeline))
+        async def run() -> List[Dict[str, Any]]:
+            collection = self.collection
+            if self._read_preference is not None:
+                collection = collection.with_options(
+                    read_preference=self._read_preference
+                )
+            cursor = await collection.aggregate(
+                self.pipeline, maxTimeMS=self._max_time_ms
+            )
+            return await cursor.to_list()
 
-        return await asyncio.to_thread(_aggregate)
+        async def profiled() -> List[Dict[str, Any]]:
+            return await query_profiler.run(
+                self.mongodb_client.db, self.command(), run, explain=self._profile
+            )
+
+        if self._cached:
+            return await query_cache.get_or_compute(
+                self.command(), profiled, self._cache_ttl
+            )
+        return await profiled()
 
 
 class QueryBuilder:
@@ -269,7 +500,11 @@ class QueryBuilder:
         self._limit = 0
         self._skip = 0
         self._sort = None
-        self._populate_fields: List[str] = []
+        self._projection: Optional[Dict[str, Any]] = None
+        self._populate_fields: List["PopulateField"] = []
+        self._profile = False
+        self._cached = False
+        self._cache_ttl: Optional[int] = None
 
     def limit(self, limit: int) -> "QueryBuilder":
         self._limit = limit
@@ -283,103 +518,337 @@ class QueryBuilder:
         self._sort = sort
         return self
 
+    def project(self, projection: Dict[str, Any]) -> "QueryBuilder":
+        """
+        Restrict the fields returned.
+        Populated fields must be included for their references to be resolved.
+        """
+        self._projection = projection
+        return self
+
+    def profile(self) -> "QueryBuilder":
+        """
+        Explain the query after it runs and log its execution stats.
+        The query runs a second time for the explain.
+        """
+        self._profile = True
+        return self
+
+    def cached(self, ttl: Optional[int] = None) -> "QueryBuilder":
+        """
+        Cache the results, populated fields included, under a hash of the
+        collection, the normalized query and its options, so identical queries
+        built anywhere share one entry.
+
+        Args:
+            ttl (Optional[int]): Seconds to cache the results. Defaults to
+                MONGODB_QUERY_CACHE_TTL.
+        """
+        self._cached = True
+        self._cache_ttl = ttl
+        return self
+
+    def command(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        return MongoDBClient.find_command(
+            self.collection.name,
+            self.query,
+            self._projection,
+            self._sort,
+            self._skip,
+            self._limit if limit is None else limit,
+        )
+
+    async def explain(self, verbosity: str = "queryPlanner") -> Dict[str, Any]:
+        """
+        Explain the query without returning its results.
+
+        Args:
+            verbosity (str): queryPlanner, executionStats or allPlansExecution
+
+        Returns:
+            Dict[str, Any]: The explain output
+        """
+        return await self.mongodb_client.db.command(
+            {"explain": self.command(), "verbosity": verbosity}
+        )
+
     def populate(
-        self, field: str, target_collection: Optional[str] = None
+        self,
+        field: str,
+        target_collection: Optional[str] = None,
+        lookup: Optional[bool] = None,
     ) -> "QueryBuilder":
         """
         Specify a field to populate.
         Optionally, provide the target collection name.
-        If target_collection is None, defaults to the field name.
+        If target_collection is None, defaults to the last segment of the field.
+
+        Args:
+            field (str): Path holding references, dotted to reach into embedded
+                documents and arrays, e.g. "items.product_category"
+            target_collection (Optional[str]): Collection the references point to
+            lookup (Optional[bool]): Resolve the references on the server with
+                $lookup in the same round trip, instead of with one batched $in
+                query after the documents arrive. Defaults to $lookup unless the
+                target collection is served from the reference cache. Both give
+                the same documents; references to missing documents become None.
         """
-        self._populate_fields.append((field, target_collection or field))
+        target = target_collection or field.rsplit(".", 1)[-1]
+        if lookup is None:
+            lookup = not reference_cache.cacheable(target)
+        self._populate_fields.append(PopulateField(field, target, lookup))
         return self
 
+    def cache_command(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """The find command extended with the populated fields, to key cached results."""
+        return {
+            **self.command(limit),
+            "populate": [
+                [field.path, field.target, field.lookup]
+                for field in self._populate_fields
+            ],
+        }
+
     async def exec(self) -> List[Dict[str, Any]]:
-        # Wrap the synchronous find operation in asyncio.to_thread
-        def get_documents():
-            cursor = self.collection.find(self.query)
+        if self._cached:
+            return await query_cache.get_or_compute(
+                self.cache_command(), self._exec, self._cache_ttl
+            )
+        return await self._exec()
+
+    async def exec_one(self) -> Optional[Dict[str, Any]]:
+        if self._cached:
+            documents = await query_cache.get_or_compute(
+                self.cache_command(limit=1), self._exec_first, self._cache_ttl
+            )
+            return documents[0] if documents else None
+        return await self._exec_one()
+
+    async def _exec_first(self) -> List[Dict[str, Any]]:
+        doc = await self._exec_one()
+        return [doc] if doc else []
+
+    async def _exec(self) -> List[Dict[str, Any]]:
+        if any(field.lookup for field in self._populate_fields):
+            documents = await self._exec_lookup(self._limit)
+        else:
+            cursor = self.collection.find(self.query, self._projection).max_time_ms(
+                self.mongodb_client.max_time_ms
+            )
             if self._skip:
                 cursor = cursor.skip(self._skip)
             if self._limit:
                 cursor = cursor.limit(self._limit)
             if self._sort:
                 cursor = cursor.sort(self._sort)
-            return list(cursor)
-
-        documents = await asyncio.to_thread(get_documents)
-        if not documents:
-            return documents
 
-        # Batch populate for each specified field.
-        for field, target_coll in self._populate_fields:
-            ref_ids = set()
-            for doc in documents:
-                if field in doc:
-                    value = doc[field]
-                    if isinstance(value, list):
-                        ref_ids.update(value)
-                    else:
-                        ref_ids.add(value)
-            if not ref_ids:
-                continue
-
-            ref_collection = self.mongodb_client.get_collection(target_coll)
-
-            def get_fetched_docs():
-                return list(ref_collection.find({"_id": {"$in": list(ref_ids)}}))
-
-            fetched_docs = await asyncio.to_thread(get_fetched_docs)
-            fetched_mapping = {d["_id"]: d for d in fetched_docs}
-
-            for doc in documents:
-                if field in doc:
-                    value = doc[field]
-                    if isinstance(value, list):
-                        doc[field] = [fetched_mapping.get(v, v) for v in value]
-                    else:
-                        doc[field] = fetched_mapping.get(value, value)
+            documents = await query_profiler.run(
+                self.mongodb_client.db,
+                self.command(),
+                cursor.to_list,
+                explain=self._profile,
+            )
+        if documents:
+            await self._populate(documents)
         return documents
 
-        # Populate each document for every specified field.
-        # for doc in documents:
-        #     for field in self._populate_fields:
-        #         if field in doc:
-        #             ref_id = doc[field]
-        #             ref_collection = self.mongodb_client.get_collection(field)
-        #             populated_doc = ref_collection.find_one({"_id": ref_id})
-        #             doc[field] = populated_doc
-
-        # return documents
-
-    async def exec_one(self) -> Optional[Dict[str, Any]]:
-        doc = await self.collection.find_one(self.query)
-        if not doc:
-            return doc
-
-        for field, target_coll in self._populate_fields:
-            if field in doc:
-                value = doc[field]
-                ref_collection = self.mongodb_client.get_collection(target_coll)
-                if isinstance(value, list):
-                    fetched_docs = await ref_collection.find(
-                        {"_id": {"$in": value}}
-                    ).to_list(length=len(value))
-                    fetched_mapping = {d["_id"]: d for d in fetched_docs}
-                    doc[field] = [fetched_mapping.get(v, v) for v in value]
-                else:
-                    populated_doc = await ref_collection.find_one({"_id": value})
-                    doc[field] = populated_doc if populated_doc else value
+    async def _exec_one(self) -> Optional[Dict[str, Any]]:
+        if any(field.lookup for field in self._populate_fields):
+            documents = await self._exec_lookup(1)
+            doc = documents[0] if documents else None
+        else:
+            doc = await query_profiler.run(
+                self.mongodb_client.db,
+                self.command(limit=1),
+                lambda: self.collection.find_one(
+                    self.query,
+                    self._projection,
+                    max_time_ms=self.mongodb_client.max_time_ms,
+                    skip=self._skip,
+                    sort=self._sort,
+                ),
+                explain=self._profile,
+            )
+        if doc:
+            await self._populate([doc])
         return doc
 
-        # doc = self.collection.find_one(self.query)
-        # if doc:
-        #     for field in self._populate_fields:
-        #         if field in doc:
-        #             ref_id = doc[field]
-        #             ref_collection = self.mongodb_client.get_collection(field)
-        #             populated_doc = ref_collection.find_one({"_id": ref_id})
-        #             doc[field] = populated_doc
-        # return doc
+    async def _exec_lookup(self, limit: int) -> List[Dict[str, Any]]:
+        """Run the query as an aggregation resolving $lookup fields on the server."""
+        builder = self.mongodb_client.aggregate(self.collection.name).match(self.query)
+        if self._sort:
+            builder.sort(dict(self._sort))
+        if self._skip:
+            builder.skip(self._skip)
+        if limit:
+            builder.limit(limit)
+        if self._projection:
+            builder.project(self._projection)
+        for index, field in enumerate(self._populate_fields):
+            if field.lookup:
+                for stage in field.lookup_stages(f"__populate_{index}"):
+                    builder.add_stage(stage)
+        if self._profile:
+            builder.profile()
+        return await builder.exec()
+
+    async def _populate(self, documents: List[Dict[str, Any]]) -> None:
+        """
+        Replace references with documents for every field not resolved by $lookup.
+        Fields are fetched concurrently; a field nested in another populated field
+        waits for that field so its path exists.
+        """
+        pending = [field for field in self._populate_fields if not field.lookup]
+        while pending:
+            ready = [
+                field
+                for field in pending
+                if not any(
+                    field.path.startswith(other.path + ".")
+                    for other in pending
+                    if other is not field
+                )
+            ]
+            await asyncio.gather(
+                *(self._populate_field(documents, field) for field in ready)
+            )
+            pending = [field for field in pending if field not in ready]
+
+    async def _populate_field(
+        self, documents: List[Dict[str, Any]], field: "PopulateField"
+    ) -> None:
+        ref_ids = {
+            value
+            for doc in documents
+            for value in field.references(doc)
+            if isinstance(value, Hashable)
+        }
+        if not ref_ids:
+            return
+
+        fetched, missing = reference_cache.get_many(field.target, ref_ids)
+        if missing:
+            ref_collection = self.mongodb_client.get_collection(field.target)
+            query = {"_id": {"$in": missing}}
+            cursor = ref_collection.find(query).max_time_ms(
+                self.mongodb_client.max_time_ms
+            )
+            fetched_docs = await query_profiler.run(
+                self.mongodb_client.db,
+                MongoDBClient.find_command(field.target, query),
+                cursor.to_list,
+            )
+            reference_cache.put_many(field.target, fetched_docs)
+            fetched.update((doc["_id"], doc) for doc in fetched_docs)
+
+        for doc in documents:
+            field.replace(doc, fetched)
+
+
+class PopulateField:
+    """A reference path to populate, and how to resolve it"""
+
+    def __init__(self, path: str, target: str, lookup: bool):
+        self.path = path
+        self.parts = path.split(".")
+        self.target = target
+        self.lookup = lookup
+
+    def references(self, node: Any, depth: int = 0) -> Iterator[Any]:
+        """Yield the reference values at the path, descending through arrays."""
+        if isinstance(node, list):
+            for item in node:
+                yield from self.references(item, depth)
+        elif depth == len(self.parts):
+            if not isinstance(node, dict):
+                yield node
+        elif isinstance(node, dict) and self.parts[depth] in node:
+            yield from self.references(node[self.parts[depth]], depth + 1)
+
+    def replace(
+        self, node: Any, fetched: Dict[Any, Dict[str, Any]], depth: int = 0
+    ) -> Any:
+        """
+        Replace the reference values at the path with fetched documents, in place.
+        References with no fetched document become None.
+        """
+        if isinstance(node, list):
+            node[:] = [self.replace(item, fetched, depth) for item in node]
+        elif depth == len(self.parts):
+            if isinstance(node, Hashable) and node in fetched:
+                # A copy, so populating a path inside it leaves shared documents intact
+                return dict(fetched[node])
+            return None
+        elif isinstance(node, dict) and self.parts[depth] in node:
+            key = self.parts[depth]
+            node[key] = self.replace(node[key], fetched, depth + 1)
+        return node
+
+    def lookup_stages(self, temp: str) -> List[Dict[str, Any]]:
+        """
+        Compile the field into aggregation stages.
+        $lookup gathers the referenced documents into a temporary array; $set then
+        swaps each reference at the path for its document, keeping field order and
+        arrays, and setting references with no matching document to null, as the
+        batched populate does.
+        """
+
+        def match(value: str) -> Dict[str, Any]:
+            cond = {"$eq": ["$$this._id", value]}
+            found = {"$filter": {"input": f"${temp}", "cond": cond}}
+            return {"$ifNull": [{"$arrayElemAt": [found, 0]}, None]}
+
+        def resolve(value: str, depth: int) -> Dict[str, Any]:
+            var = f"p{depth}"
+            if depth == len(self.parts):
+                each = match(f"$${var}")
+                single = match(value)
+            else:
+                each = descend(f"$${var}", depth)
+                single = descend(value, depth)
+            return {
+                "$switch": {
+                    "branches": [
+                        {
+                            "case": {"$eq": [{"$type": value}, "missing"]},
+                            "then": "$$REMOVE",
+                        },
+                        {
+                            "case": {"$isArray": value},
+                            "then": {"$map": {"input": value, "as": var, "in": each}},
+                        },
+                    ],
+                    "default": single,
+                }
+            }
+
+        def descend(value: str, depth: int) -> Dict[str, Any]:
+            key = self.parts[depth]
+            return {
+                "$cond": [
+                    {"$eq": [{"$type": value}, "object"]},
+                    {
+                        "$mergeObjects": [
+                            value,
+                            {key: resolve(f"{value}.{key}", depth + 1)},
+                        ]
+                    },
+                    value,
+                ]
+            }
+
+        return [
+            {
+                "$lookup": {
+                    "from": self.target,
+                    "localField": self.path,
+                    "foreignField": "_id",
+                    "as": temp,
+                }
+            },
+            {"$set": {self.parts[0]: resolve(f"${self.parts[0]}", 1)}},
+            {"$unset": temp},
+        ]
 
 
 # Create singleton instance
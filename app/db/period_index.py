@@ -0,0 +1,154 @@
+import asyncio
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from rich.console import Console
+
+from app.core.config import settings
+from app.db.mongo_client import MongoDBClient, mongodb_client
+
+console = Console()
+
+
+def as_utc(value: datetime) -> datetime:
+    """Convert an aware datetime to naive UTC, the form MongoDB returns."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class PeriodIndex:
+    """
+    In-memory index of the periods collection, sorted by start date, resolving
+    a date range to period ids by binary search instead of a query per request.
+    The collection is small and rarely changes; it is reloaded periodically so
+    periods added by ingestion are picked up.
+    """
+
+    def __init__(self, client: MongoDBClient, refresh_interval: int):
+        """
+        Initialize an empty index.
+
+        Args:
+            client (MongoDBClient): MongoDB client
+            refresh_interval (int): Seconds between reloads
+        """
+        self.client = client
+        self.refresh_interval = refresh_interval
+        # (start_date, end_date, _id), sorted by start date
+        self._periods: List[Tuple[datetime, datetime, ObjectId]] = []
+        self._starts: List[datetime] = []
+        # Whether every period ends no earlier than it starts, so periods starting
+        # after the end of a range cannot lie within it
+        self._ordered = True
+        self._loaded_at: Optional[float] = None
+        self._loads = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def load(self) -> None:
+        """
+        Replace the index with the current periods.
+        Periods missing a start or end date can match no date range and are skipped.
+        """
+        documents = await self.client.find_many(
+            "periods", {}, projection={"start_date": 1, "end_date": 1}
+        )
+        periods = sorted(
+            (
+                as_utc(document["start_date"]),
+                as_utc(document["end_date"]),
+                document["_id"],
+            )
+            for document in documents
+            if isinstance(document.get("start_date"), datetime)
+            and isinstance(document.get("end_date"), datetime)
+        )
+        if len(periods) < len(documents):
+            console.log(
+                f"[yellow]Skipped {len(documents) - len(periods)} periods "
+                "without start and end dates[/yellow]"
+            )
+        # Swap in whole lists so concurrent readers see the old or new index.
+        self._ordered = all(start <= end for start, end, _ in periods)
+        self._starts = [start for start, _, _ in periods]
+        self._periods = periods
+        self._loaded_at = time.time()
+        self._loads += 1
+
+    async def ensure_loaded(self) -> None:
+        if self._loaded_at is None:
+            async with self._lock:
+                if self._loaded_at is None:
+                    await self.load()
+
+    async def resolve(
+        self, start_date: Optional[datetime], end_date: Optional[datetime]
+    ) -> List[ObjectId]:
+        """
+        Find the periods within a date range, as matched by
+        {"start_date": {"$gte": start_date}, "end_date": {"$lte": end_date}}.
+
+        Args:
+            start_date (Optional[datetime]): Earliest period start, None for no bound
+            end_date (Optional[datetime]): Latest period end, None for no bound
+
+        Returns:
+            List[ObjectId]: Ids of the matching periods, in start date order
+        """
+        await self.ensure_loaded()
+        periods, starts = self._periods, self._starts
+        low = bisect_left(starts, as_utc(start_date)) if start_date else 0
+        high = len(periods)
+        if end_date:
+            end_date = as_utc(end_date)
+            if self._ordered:
+                high = bisect_right(starts, end_date, low)
+        return [
+            period_id
+            for _, end, period_id in periods[low:high]
+            if end_date is None or end <= end_date
+        ]
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.load()
+            except Exception as e:
+                console.log(f"[red]Period index reload failed: {str(e)}[/red]")
+
+    async def start(self) -> None:
+        """Load the index and reload it in the background."""
+        try:
+            await self.ensure_loaded()
+        except Exception as e:
+            # Requests load it on first use instead.
+            console.log(f"[red]Period index load failed: {str(e)}[/red]")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop reloading."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "periods": len(self._periods),
+            "loaded_at": self._loaded_at,
+            "loads": self._loads,
+        }
+
+
+period_index = PeriodIndex(
+    client=mongodb_client, refresh_interval=settings.MONGODB_PERIOD_INDEX_REFRESH
+)
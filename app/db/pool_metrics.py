@@ -0,0 +1,72 @@
+from typing import Any
+
+from pymongo import monitoring
+
+from app.core.metrics import metrics
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Records MongoDB connection pool activity in the shared metrics registry.
+    Checkout waits show whether MONGODB_MAX_POOL_SIZE is too small for the
+    concurrency of a worker: requests queue for a connection before their
+    query is even sent.
+    """
+
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ) -> None:
+        pass
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        metrics.observe(
+            "mongo_pool_checkout_seconds", event.duration, address=_address(event)
+        )
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ) -> None:
+        metrics.observe(
+            "mongo_pool_checkout_seconds", event.duration, address=_address(event)
+        )
+        metrics.increment(
+            "mongo_pool_checkout_failures_total",
+            address=_address(event),
+            reason=event.reason,
+        )
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        pass
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        metrics.increment("mongo_pool_connections_created_total", address=_address(event))
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        metrics.increment(
+            "mongo_pool_connections_closed_total",
+            address=_address(event),
+            reason=event.reason,
+        )
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        metrics.increment("mongo_pool_cleared_total", address=_address(event))
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+
+def _address(event: Any) -> str:
+    host, port = event.address
+    return f"{host}:{port}"
+
+
+pool_metrics_listener = PoolMetricsListener()
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import bson
+from bson import ObjectId
+from rich.console import Console
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.memory_cache import memory_cache
+from app.db.redis_client import redis_client
+from app.db.single_flight import single_flight
+
+console = Console()
+
+KEY_PREFIX = "query"
+
+# Keys whose value is an ordered specification; their key order is significant.
+ORDERED_KEYS = {"$sort", "sort"}
+
+# Query operators whose list argument is a set, so its order is not significant.
+# In aggregation expressions the same names take positional arguments.
+SET_OPERATORS = {"$in", "$nin", "$all"}
+
+# Where a value sits in a command, deciding whether set operands may be sorted:
+# the command itself, a pipeline's stages, a $facet's pipelines, a query filter
+# on fields, or an aggregation expression.
+COMMAND, STAGES, FACET, QUERY, EXPRESSION = (
+    "command",
+    "stages",
+    "facet",
+    "query",
+    "expression",
+)
+
+
+def child_context(context: str, key: str) -> str:
+    """The context of the value under a key, given the dictionary's context."""
+    if context == COMMAND:
+        if key == "pipeline":
+            return STAGES
+        return QUERY if key in ("filter", "query") else EXPRESSION
+    if context == STAGES:
+        if key == "$match":
+            return QUERY
+        if key == "$facet":
+            return FACET
+        # Their sub-pipelines are nested commands
+        return COMMAND if key in ("$lookup", "$unionWith") else EXPRESSION
+    if context == FACET:
+        return STAGES
+    if context == QUERY:
+        return EXPRESSION if key in ("$expr", "$where", "$function") else QUERY
+    return EXPRESSION
+
+
+def canonical(value: Any, ordered: bool = False, context: str = COMMAND) -> Any:
+    """
+    Normalize a query or pipeline so logically identical ones compare equal.
+    Dictionary keys are sorted, except inside ordered specifications such as
+    $sort, the operands of set query operators such as {field: {"$in": [...]}}
+    are sorted, and BSON values are tagged with their type: ObjectIds by hex,
+    datetimes as UTC instants, so a naive datetime matches the aware one for
+    the same instant. Operands of the positional expression operators of the
+    same names, as in $expr or $project, keep their order.
+
+    Args:
+        value (Any): Filter, pipeline, command or value
+        ordered (bool): Keep the key order of dictionaries
+        context (str): Where the value sits in the command, see child_context
+
+    Returns:
+        Any: A JSON-serializable equivalent
+    """
+    if isinstance(value, dict):
+        items = [
+            (
+                str(key),
+                canonical(item, key in ORDERED_KEYS, child_context(context, str(key))),
+            )
+            for key, item in value.items()
+        ]
+        if ordered:
+            # Pairs, so the order survives any later key sorting.
+            return [list(item) for item in items]
+        if context == QUERY:
+            items = [
+                (
+                    key,
+                    sorted(item, key=json_key)
+                    if key in SET_OPERATORS and isinstance(item, list)
+                    else item,
+                )
+                for key, item in items
+            ]
+        return dict(sorted(items))
+    if isinstance(value, (list, tuple)):
+        return [canonical(item, ordered, context) for item in value]
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return {"$date": value.isoformat()}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return {f"${type(value).__name__}": str(value)}
+
+
+def json_key(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+def query_hash(command: Dict[str, Any]) -> str:
+    """
+    Hash a find or aggregate command.
+
+    Args:
+        command (Dict[str, Any]): The command, e.g. {"aggregate": "brands",
+            "pipeline": [...]}
+
+    Returns:
+        str: Hex SHA-256 of the canonical command
+    """
+    return hashlib.sha256(json_key(canonical(command)).encode()).hexdigest()
+
+
+class QueryCache:
+    """
+    Caches query results under a hash of the query itself, so callers need no
+    hand-built keys and logically identical queries share one entry. Results
+    are stored as BSON in Redis and in the in-process cache, keeping ObjectIds
+    and datetimes intact, and are decoded afresh on every hit so callers may
+    modify them.
+    """
+
+    def __init__(self, default_ttl: int):
+        """
+        Initialize the cache.
+
+        Args:
+            default_ttl (int): Seconds results are cached when no TTL is given
+        """
+        self.default_ttl = default_ttl
+        self.codec = redis_client.get_codec("msgpack")
+
+    @staticmethod
+    def key(command: Dict[str, Any]) -> str:
+        """
+        Build the cache key of a command.
+        Keys start with "query:<collection>:", so a collection's results can
+        be invalidated by prefix.
+
+        Args:
+            command (Dict[str, Any]): A find or aggregate command
+
+        Returns:
+            str: The cache key
+        """
+        collection = command[next(iter(command))]
+        return f"{QueryCache.prefix(collection)}{query_hash(command)}"
+
+    @staticmethod
+    def prefix(collection: str) -> str:
+        """Key prefix of every cached result of a collection, for invalidation."""
+        return f"{KEY_PREFIX}:{collection}:"
+
+    async def lookup(self, key: str, collection: str) -> Optional[bytes]:
+        started = time.perf_counter()
+        payload = memory_cache.get(key)
+        result = "memory_hit"
+        if payload is None:
+            entry = await redis_client.get_cached_entry(key)
+            payload = entry[0] if entry else None
+            result = "redis_hit" if isinstance(payload, bytes) else "miss"
+            if result == "redis_hit":
+                memory_cache.set(key, payload, len(payload), settings.L1_CACHE_TTL)
+            else:
+                payload = None
+        metrics.increment("query_cache_lookups_total", collection=collection, result=result)
+        metrics.observe(
+            "query_cache_get_seconds",
+            time.perf_counter() - started,
+            collection=collection,
+            result=result,
+        )
+        return payload
+
+    async def get_or_compute(
+        self,
+        command: Dict[str, Any],
+        compute: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        ttl: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the cached result of a query, running and caching it on a miss.
+        Concurrent misses for the same query, in this worker or any other,
+        run it once.
+
+        Args:
+            command (Dict[str, Any]): The query as a find or aggregate command;
+                everything that affects the result must be in it
+            compute (Callable[[], Awaitable[List[Dict[str, Any]]]]): Runs the query
+            ttl (Optional[int]): Seconds to cache the result. Defaults to default_ttl.
+
+        Returns:
+            List[Dict[str, Any]]: The documents
+        """
+        key = self.key(command)
+        collection = command[next(iter(command))]
+        ttl = ttl or self.default_ttl
+
+        async def compute_and_store() -> bytes:
+            documents = await compute()
+            payload = bson.encode({"documents": documents})
+            size = await redis_client.set_cached_data(
+                key, payload, ttl, codec=self.codec
+            )
+            if size is None:
+                single_flight.not_cached()
+            else:
+                memory_cache.set(
+                    key, payload, len(payload), min(settings.L1_CACHE_TTL, ttl)
+                )
+            return payload
+
+        async def lookup() -> Optional[bytes]:
+            return await self.lookup(key, collection)
+
+        payload = await lookup()
+        if payload is None:
+            payload = await single_flight.do(key, compute_and_store, lookup)
+        try:
+            return bson.decode(payload)["documents"]
+        except Exception as e:
+            console.log(f"[red]Query cache decode failed for {key}: {str(e)}[/red]")
+            memory_cache.delete(key)
+            return await compute()
+
+
+query_cache = QueryCache(default_ttl=settings.MONGODB_QUERY_CACHE_TTL)
@@ -0,0 +1,231 @@
+import json
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from pymongo.asynchronous.database import AsyncDatabase
+from rich.console import Console
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+console = Console()
+
+T = TypeVar("T")
+
+# Operators whose arguments are names or specifications rather than values
+SHAPE_OPERATORS = {
+    "$project",
+    "$sort",
+    "$group",
+    "$lookup",
+    "$unwind",
+    "$count",
+    "$unionWith",
+    "sort",
+    "projection",
+}
+
+# Keys holding sub-pipelines, redacted like a top-level pipeline even inside the
+# specification of a shape operator such as $lookup
+PIPELINE_KEYS = {"pipeline", "$facet"}
+
+
+class QueryStats:
+    """Queries issued while handling one request, collected for the debug header"""
+
+    def __init__(self, explain: bool = False):
+        """
+        Initialize an empty collection.
+
+        Args:
+            explain (bool): Also explain each query to report documents and keys
+                examined and the plan stages; the query runs a second time
+        """
+        self.explain = explain
+        self.queries: List[Dict[str, Any]] = []
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": len(self.queries),
+            "total_ms": round(sum(query["ms"] for query in self.queries), 2),
+            "queries": self.queries,
+        }
+
+
+# Set per request by the query stats middleware; None when stats are not collected.
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "mongo_query_stats", default=None
+)
+
+
+def redact(value: Any, keep: bool = False) -> Any:
+    """
+    Replace literal values in a filter or pipeline with "?", keeping its shape.
+    Sub-pipelines of $lookup, $unionWith and $facet are redacted the same way.
+
+    Args:
+        value (Any): Filter, pipeline or value
+        keep (bool): Keep scalars, for specifications such as $project and $sort
+
+    Returns:
+        Any: The value with field names, operators and field paths kept
+    """
+    if isinstance(value, dict):
+        return {
+            key: redact(
+                item, False if key in PIPELINE_KEYS else keep or key in SHAPE_OPERATORS
+            )
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        if value and not any(isinstance(item, (dict, list)) for item in value):
+            return "?" if not keep else value
+        return [redact(item, keep) for item in value]
+    if keep or (isinstance(value, str) and value.startswith("$")):
+        return value
+    return "?"
+
+
+def plan_stages(explain: Dict[str, Any]) -> List[str]:
+    """
+    List the stages of the winning plan in an explain result.
+
+    Args:
+        explain (Dict[str, Any]): Output of the explain command
+
+    Returns:
+        List[str]: Stage names such as IXSCAN, FETCH or COLLSCAN
+    """
+    stages: List[str] = []
+
+    def walk(node: Any, in_plan: bool) -> None:
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == "rejectedPlans":
+                    continue
+                inside = in_plan or key == "winningPlan"
+                if inside and key == "stage" and isinstance(value, str):
+                    stages.append(value)
+                walk(value, inside)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, in_plan)
+
+    walk(explain, False)
+    return stages
+
+
+def execution_stats(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Summarize an executionStats explain result.
+
+    Args:
+        explain (Dict[str, Any]): Output of the explain command
+
+    Returns:
+        Dict[str, Any]: Documents and index keys examined, and the plan stages
+    """
+    totals = {"docs_examined": 0, "keys_examined": 0}
+
+    def walk(node: Any) -> None:
+        if isinstance(node, dict):
+            stats = node.get("executionStats")
+            if isinstance(stats, dict):
+                totals["docs_examined"] += stats.get("totalDocsExamined", 0)
+                totals["keys_examined"] += stats.get("totalKeysExamined", 0)
+            for key, value in node.items():
+                if key != "executionStats":
+                    walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(explain)
+    return {**totals, "stages": plan_stages(explain)}
+
+
+class QueryProfiler:
+    """
+    Times MongoDB queries, logs slow ones with their literals redacted and
+    reports per-request statistics when the request asked for them.
+    """
+
+    def __init__(self, slow_ms: int):
+        """
+        Initialize the profiler.
+
+        Args:
+            slow_ms (int): Queries slower than this many milliseconds are logged;
+                0 disables the slow-query log
+        """
+        self.slow_ms = slow_ms
+
+    async def run(
+        self,
+        db: AsyncDatabase,
+        command: Dict[str, Any],
+        execute: Callable[[], Awaitable[T]],
+        explain: bool = False,
+    ) -> T:
+        """
+        Execute a query and record how it ran.
+
+        Args:
+            db (AsyncDatabase): Database the query runs against, used for explain
+            command (Dict[str, Any]): The query as a find or aggregate command,
+                e.g. {"find": "brands", "filter": {...}}; it is only read
+            execute (Callable[[], Awaitable[T]]): Runs the query
+            explain (bool): Explain the query and log its execution stats
+
+        Returns:
+            T: The result of execute
+        """
+        started = time.perf_counter()
+        result = await execute()
+        elapsed = time.perf_counter() - started
+
+        op = next(iter(command))
+        collection = command[op]
+        metrics.observe("mongo_query_seconds", elapsed, collection=collection, op=op)
+
+        ms = elapsed * 1000
+        shape = {key: redact(value) for key, value in command.items() if key != op}
+        if self.slow_ms and ms >= self.slow_ms:
+            metrics.increment("mongo_slow_queries_total", collection=collection, op=op)
+            console.log(
+                f"[yellow]Slow MongoDB {op} on {collection} took {ms:.0f}ms: "
+                f"{json.dumps(shape, default=str)}[/yellow]"
+            )
+
+        stats = query_stats.get()
+        if stats is None and not explain:
+            return result
+
+        entry: Dict[str, Any] = {
+            "collection": collection,
+            "op": op,
+            "ms": round(ms, 2),
+            "returned": (
+                len(result) if isinstance(result, list) else int(result is not None)
+            ),
+        }
+        if explain or stats.explain:
+            try:
+                explained = await db.command(
+                    {"explain": command, "verbosity": "executionStats"}
+                )
+                entry.update(execution_stats(explained))
+            except Exception as e:
+                entry["explain_error"] = str(e)
+        if explain:
+            console.log(
+                f"[cyan]MongoDB {op} on {collection}: "
+                f"{json.dumps({**entry, 'shape': shape}, default=str)}[/cyan]"
+            )
+        if stats is not None:
+            stats.queries.append(entry)
+        return result
+
+
+query_profiler = QueryProfiler(slow_ms=settings.MONGODB_SLOW_QUERY_MS)
@@ -1,20 +1,231 @@
+import heapq
 import json
+import re
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
-import redis
+import lz4.frame
+import msgpack
+import zstandard
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from rich.console import Console
 
 from app.core.config import settings
+from app.core.metrics import metrics
+
+console = Console()
+
+# Items pushed per RPUSH command when storing a result set
+LIST_CHUNK_SIZE = 500
+
+# Keys requested per SCAN call by the admin key listing and invalidation
+SCAN_BATCH_SIZE = 1000
+
+# Delete the lock only if the caller still owns it, so an expired lease
+# that was taken over by another worker is never released by mistake.
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Encoded cache values start with a 3-byte header:
+#   [format version][serializer id][compression id]
+# Plain JSON text written before the header existed never starts with this
+# version byte, so it is still decoded as legacy JSON.
+CODEC_FORMAT_VERSION = 1
+
+# name -> (id, encode, decode)
+SERIALIZERS: Dict[str, Tuple[int, Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "json": (
+        0,
+        lambda data: json.dumps(data, separators=(",", ":")).encode(),
+        json.loads,
+    ),
+    "msgpack": (
+        1,
+        lambda data: msgpack.packb(data, use_bin_type=True),
+        lambda body: msgpack.unpackb(body, raw=False),
+    ),
+}
+
+# name -> (id, compress(body, level), decompress)
+COMPRESSORS: Dict[
+    str, Tuple[int, Callable[[bytes, int], bytes], Callable[[bytes], bytes]]
+] = {
+    "none": (0, lambda body, level: body, lambda body: body),
+    "zstd": (
+        1,
+        lambda body, level: zstandard.ZstdCompressor(level=level).compress(body),
+        lambda body: zstandard.ZstdDecompressor().decompress(body),
+    ),
+    "lz4": (
+        2,
+        lambda body, level: lz4.frame.compress(body, compression_level=level),
+        lz4.frame.decompress,
+    ),
+}
+
+SERIALIZERS_BY_ID = {codec[0]: codec for codec in SERIALIZERS.values()}
+COMPRESSORS_BY_ID = {codec[0]: codec for codec in COMPRESSORS.values()}
+
+
+class CacheCodec:
+    """
+    Encodes cache values with a configurable serializer and optional compression.
+    Compression only applies to bodies above the size threshold. Decoding reads
+    the header, so payloads written by any codec can be read by every other.
+    """
+
+    def __init__(
+        self,
+        serializer: str = "msgpack",
+        compression: str = "none",
+        compress_threshold: int = 0,
+        compression_level: int = 3,
+    ):
+        """
+        Initialize the codec.
+
+        Args:
+            serializer (str): Name of a SERIALIZERS entry
+            compression (str): Name of a COMPRESSORS entry
+            compress_threshold (int): Minimum body size in bytes to compress
+            compression_level (int): Compressor level
+
+        Raises:
+            ValueError: If the serializer or compression is unknown
+        """
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown cache serializer: {serializer}")
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unknown cache compression: {compression}")
+        self.serializer = serializer
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self.compression_level = compression_level
+
+    def encode(self, data: Any) -> bytes:
+        """Serialize and, above the threshold, compress data behind a header."""
+        serializer_id, serialize, _ = SERIALIZERS[self.serializer]
+        body = serialize(data)
+
+        compression_id = 0
+        if self.compression != "none" and len(body) >= self.compress_threshold:
+            compression_id, compress, _ = COMPRESSORS[self.compression]
+            body = compress(body, self.compression_level)
+
+        return bytes((CODEC_FORMAT_VERSION, serializer_id, compression_id)) + body
+
+    @staticmethod
+    def decode(payload: bytes) -> Any:
+        """
+        Decode a payload produced by any codec, or legacy JSON text.
+
+        Raises:
+            ValueError: If the header names an unknown serializer or compression
+        """
+        if payload[0] != CODEC_FORMAT_VERSION:
+            return json.loads(payload)
+
+        serializer = SERIALIZERS_BY_ID.get(payload[1])
+        compressor = COMPRESSORS_BY_ID.get(payload[2])
+        if serializer is None or compressor is None:
+            raise ValueError(f"Unknown cache codec header: {payload[:3]!r}")
+        return serializer[2](compressor[2](payload[3:]))
 
 
 class RedisClient:
+    """
+    Asyncio Redis client singleton for cache operations.
+    All commands share one bounded connection pool per worker process, so a
+    slow Redis reply only suspends the awaiting request instead of the event loop.
+    """
+
     def __init__(self):
-        self.redis = redis.Redis(
+        """Initialize the shared connection pool from configuration."""
+        self.pool = aioredis.BlockingConnectionPool(
             host=settings.REDIS_HOST,
             port=settings.REDIS_PORT,
             db=settings.REDIS_DB,
-            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+        )
+        self.redis = aioredis.Redis(connection_pool=self.pool)
+        self.codec = CacheCodec(
+            serializer=settings.CACHE_SERIALIZER,
+            compression=settings.CACHE_COMPRESSION,
+            compress_threshold=settings.CACHE_COMPRESSION_THRESHOLD,
+            compression_level=settings.CACHE_COMPRESSION_LEVEL,
         )
+        self._codecs: Dict[Tuple[str, str], CacheCodec] = {}
+        self.hits = 0
+        self.misses = 0
+        self._release_lock_script = self.redis.register_script(RELEASE_LOCK_SCRIPT)
 
-    async def get_cached_data(self, key: str):
+    def get_codec(
+        self, serializer: Optional[str] = None, compression: Optional[str] = None
+    ) -> CacheCodec:
+        """
+        Get a codec for a serializer/compression pair, defaulting to the client codec.
+
+        Args:
+            serializer (Optional[str]): Name of a SERIALIZERS entry
+            compression (Optional[str]): Name of a COMPRESSORS entry
+
+        Returns:
+            CacheCodec: Shared codec instance for the pair
+        """
+        pair = (
+            serializer or self.codec.serializer,
+            compression or self.codec.compression,
+        )
+        if pair not in self._codecs:
+            self._codecs[pair] = CacheCodec(
+                serializer=pair[0],
+                compression=pair[1],
+                compress_threshold=self.codec.compress_threshold,
+                compression_level=self.codec.compression_level,
+            )
+        return self._codecs[pair]
+
+    async def get_cached_entry(self, key: str) -> Optional[Tuple[Any, int]]:
+        """
+        Get cached data from Redis along with its stored size.
+
+        Args:
+            key (str): The key to retrieve data from
+
+        Returns:
+            Optional[Tuple[Any, int]]: The decoded data and its payload size in bytes,
+                None if the key does not exist
+        """
+        try:
+            with metrics.timer("cache_redis_seconds", op="get"):
+                data = await self.redis.get(key)
+        except RedisError as e:
+            console.log(f"[red]Redis get failed for {key}: {str(e)}[/red]")
+            metrics.increment("cache_redis_errors_total", op="get")
+            data = None
+        if not data:
+            self.misses += 1
+            return None
+        try:
+            with metrics.timer("cache_codec_seconds", op="decode"):
+                decoded = self.codec.decode(data)
+        except Exception as e:
+            console.log(f"[red]Cache decode failed for {key}: {str(e)}[/red]")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return decoded, len(data)
+
+    async def get_cached_data(self, key: str) -> Optional[Any]:
         """
         Get cached data from Redis.
 
@@ -23,21 +234,288 @@ class RedisClient:
         Returns:
             Optional[Dict]: The cached data if it exists, None otherwise
         """
-        data = self.redis.get(key)
-        return json.loads(data) if data else None
+        entry = await self.get_cached_entry(key)
+        return entry[0] if entry else None
 
-    async def set_cached_data(self, key: str, data: dict):
+    async def set_cached_data(
+        self,
+        key: str,
+        data: Any,
+        ttl: Optional[int] = None,
+        codec: Optional[CacheCodec] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Optional[int]:
         """
         Set cached data in Redis.
 
         Args:
             key (str): The key to store the data under
             data (dict): The data to store
+            ttl (Optional[int]): Expiry in seconds. Defaults to REDIS_TTL.
+            codec (Optional[CacheCodec]): Codec to encode with. Defaults to the client codec.
+            max_bytes (Optional[int]): Skip storing payloads larger than this
 
         Returns:
-            None
+            Optional[int]: Size of the stored payload in bytes, None if it was too
+                large or could not be written
+        """
+        with metrics.timer("cache_codec_seconds", op="encode"):
+            payload = (codec or self.codec).encode(data)
+        if max_bytes is not None and len(payload) > max_bytes:
+            console.log(f"[yellow]Not caching {key}: {len(payload)} bytes[/yellow]")
+            return None
+        try:
+            with metrics.timer("cache_redis_seconds", op="set"):
+                await self.redis.setex(key, ttl or settings.REDIS_TTL, payload)
+        except RedisError as e:
+            console.log(f"[red]Redis set failed for {key}: {str(e)}[/red]")
+            metrics.increment("cache_redis_errors_total", op="set")
+            return None
+        return len(payload)
+
+    async def get_cached_range(
+        self, key: str, start: int, stop: int
+    ) -> Optional[Tuple[List[Any], int]]:
         """
-        self.redis.setex(key, settings.REDIS_TTL, json.dumps(data))
+        Read a slice of a cached result set.
+
+        Args:
+            key (str): The key of the result set list
+            start (int): Index of the first item
+            stop (int): Index of the last item, inclusive
+
+        Returns:
+            Optional[Tuple[List[Any], int]]: The decoded items and their payload size
+                in bytes, None if Redis could not be read
+        """
+        try:
+            with metrics.timer("cache_redis_seconds", op="lrange"):
+                payloads = await self.redis.lrange(key, start, stop)
+            with metrics.timer("cache_codec_seconds", op="decode"):
+                items = [self.codec.decode(payload) for payload in payloads]
+        except Exception as e:
+            console.log(f"[red]Redis range read failed for {key}: {str(e)}[/red]")
+            metrics.increment("cache_redis_errors_total", op="lrange")
+            return None
+        return items, sum(len(payload) for payload in payloads)
+
+    async def set_cached_list(
+        self,
+        key: str,
+        items: List[Any],
+        ttl: Optional[int] = None,
+        codec: Optional[CacheCodec] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        Replace a cached result set with the given ordered items.
+        Items are written to a temporary key and renamed into place,
+        so readers never observe a partially written set.
+
+        Args:
+            key (str): The key of the result set list
+            items (List[Any]): The ordered items to store
+            ttl (Optional[int]): Expiry in seconds. Defaults to REDIS_TTL.
+            codec (Optional[CacheCodec]): Codec to encode with. Defaults to the client codec.
+            max_bytes (Optional[int]): Skip storing sets larger than this in total
+
+        Returns:
+            Optional[int]: Total size of the stored payloads in bytes, None if too
+                large or not written
+        """
+        with metrics.timer("cache_codec_seconds", op="encode"):
+            payloads = [(codec or self.codec).encode(item) for item in items]
+        size = sum(len(payload) for payload in payloads)
+        if max_bytes is not None and size > max_bytes:
+            console.log(f"[yellow]Not caching {key}: {size} bytes[/yellow]")
+            return None
+        try:
+            if not payloads:
+                await self.redis.delete(key)
+                return 0
+            tmp_key = f"{key}:tmp:{uuid.uuid4().hex}"
+            with metrics.timer("cache_redis_seconds", op="list_write"):
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    for i in range(0, len(payloads), LIST_CHUNK_SIZE):
+                        pipe.rpush(tmp_key, *payloads[i:i + LIST_CHUNK_SIZE])
+                    pipe.expire(tmp_key, ttl or settings.REDIS_TTL)
+                    pipe.rename(tmp_key, key)
+                    await pipe.execute()
+        except RedisError as e:
+            console.log(f"[red]Redis list write failed for {key}: {str(e)}[/red]")
+            metrics.increment("cache_redis_errors_total", op="list_write")
+            return None
+        return size
+
+    async def acquire_lock(self, key: str, token: str, lease_ms: int) -> bool:
+        """
+        Try to take a lock that expires after its lease.
+
+        Args:
+            key (str): The lock key
+            token (str): Unique value identifying the holder
+            lease_ms (int): Lease duration in milliseconds
+
+        Returns:
+            bool: True if the lock was acquired, or if Redis is unavailable
+                and the caller should proceed on its own. Computations are then
+                not coalesced across workers; each such case is counted in
+                cache_redis_errors_total with op="lock".
+        """
+        try:
+            return bool(await self.redis.set(key, token, nx=True, px=lease_ms))
+        except RedisError as e:
+            console.log(
+                f"[red]Redis lock failed for {key}, computing without it: {str(e)}[/red]"
+            )
+            metrics.increment("cache_redis_errors_total", op="lock")
+            return True
+
+    async def release_lock(self, key: str, token: str) -> None:
+        """
+        Release a lock only if it is still held by the given token.
+
+        Args:
+            key (str): The lock key
+            token (str): The value used to acquire the lock
+        """
+        try:
+            await self._release_lock_script(keys=[key], args=[token])
+        except RedisError as e:
+            console.log(f"[red]Redis unlock failed for {key}: {str(e)}[/red]")
+            metrics.increment("cache_redis_errors_total", op="unlock")
+
+    async def set_marker(self, key: str, ttl_ms: int) -> None:
+        """
+        Set a short-lived flag key.
+
+        Args:
+            key (str): The flag key
+            ttl_ms (int): Milliseconds until the flag expires
+        """
+        try:
+            await self.redis.set(key, 1, px=ttl_ms)
+        except RedisError as e:
+            console.log(f"[red]Redis set failed for {key}: {str(e)}[/red]")
+            metrics.increment("cache_redis_errors_total", op="set")
+
+    async def has_marker(self, key: str) -> bool:
+        """
+        Check whether a flag key set with set_marker exists.
+
+        Args:
+            key (str): The flag key
+
+        Returns:
+            bool: True if the flag is set, False if not or Redis could not be read
+        """
+        try:
+            return bool(await self.redis.exists(key))
+        except RedisError as e:
+            console.log(f"[red]Redis read failed for {key}: {str(e)}[/red]")
+            metrics.increment("cache_redis_errors_total", op="exists")
+            return False
+
+    @staticmethod
+    def prefix_pattern(prefix: str) -> str:
+        """Return a SCAN MATCH pattern for keys starting with prefix, taken literally."""
+        return re.sub(r"([*?\[\]\\])", r"\\\1", prefix) + "*"
+
+    async def scan_batches(self, prefix: str = "") -> AsyncIterator[List[bytes]]:
+        """
+        Iterate over keys starting with a prefix in batches, using SCAN so
+        Redis keeps serving other clients between batches.
+
+        Args:
+            prefix (str): Key prefix; empty for every key
+
+        Yields:
+            List[bytes]: A batch of keys. Keys may repeat across batches.
+        """
+        cursor = 0
+        while True:
+            cursor, keys = await self.redis.scan(
+                cursor, match=self.prefix_pattern(prefix), count=SCAN_BATCH_SIZE
+            )
+            if keys:
+                yield keys
+            if cursor == 0:
+                break
+
+    async def largest_keys(
+        self, prefix: str = "", limit: int = 20, max_keys: int = 100000
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Find the keys using the most memory.
+
+        Args:
+            prefix (str): Only consider keys starting with this prefix
+            limit (int): Number of keys to return
+            max_keys (int): Stop after sampling this many keys
+
+        Returns:
+            Tuple[List[Dict[str, Any]], int]: Keys with their memory usage in bytes
+                and TTL in seconds, largest first, and the number of keys sampled
+        """
+        largest: List[Tuple[int, str, int]] = []
+        seen = set()
+        async for keys in self.scan_batches(prefix):
+            keys = [key for key in keys if key not in seen]
+            seen.update(keys)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.memory_usage(key)
+                    pipe.ttl(key)
+                results = await pipe.execute()
+            for key, usage, ttl in zip(keys, results[::2], results[1::2]):
+                if usage is None:
+                    continue  # Expired between SCAN and MEMORY USAGE
+                entry = (usage, key.decode(errors="replace"), ttl)
+                if len(largest) < limit:
+                    heapq.heappush(largest, entry)
+                else:
+                    heapq.heappushpop(largest, entry)
+            if len(seen) >= max_keys:
+                break
+
+        return (
+            [
+                {"key": key, "bytes": usage, "ttl": ttl}
+                for usage, key, ttl in sorted(largest, reverse=True)
+            ],
+            len(seen),
+        )
+
+    async def delete_by_prefix(self, prefix: str) -> int:
+        """
+        Delete every key starting with a prefix. Keys are unlinked in batches
+        so memory is reclaimed in the background without blocking Redis.
+
+        Args:
+            prefix (str): Key prefix
+
+        Returns:
+            int: Number of keys deleted
+        """
+        deleted = 0
+        async for keys in self.scan_batches(prefix):
+            deleted += await self.redis.unlink(*keys)
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this worker."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "max_connections": self.pool.max_connections,
+        }
+
+    async def close(self) -> None:
+        """Close the client and release every pooled connection."""
+        await self.redis.aclose()
+        await self.pool.disconnect()
 
 
 redis_client = RedisClient()
@@ -0,0 +1,85 @@
+from typing import Any, Dict, Iterable, List, Tuple
+
+import bson
+
+from app.core.config import settings
+from app.db.memory_cache import MemoryCache
+
+
+class ReferenceCache:
+    """
+    In-process cache of small, rarely changing documents that other documents
+    reference by _id, such as brands and product categories, so populating them
+    skips the database. Cached documents are shared and must be treated as
+    read-only.
+    """
+
+    def __init__(self, collections: Iterable[str], ttl: int, max_bytes: int):
+        """
+        Initialize an empty cache.
+
+        Args:
+            collections (Iterable[str]): Collections whose documents are cached
+            ttl (int): Seconds a document is served before it is fetched again
+            max_bytes (int): Total BSON bytes the cache may hold
+        """
+        self.collections = set(collections)
+        self._cache = MemoryCache(
+            max_bytes=max_bytes, default_ttl=ttl, max_entry_bytes=max_bytes
+        )
+
+    def cacheable(self, collection: str) -> bool:
+        return collection in self.collections
+
+    @staticmethod
+    def _key(collection: str, ref_id: Any) -> str:
+        # repr keeps ObjectId("...") and the string "..." apart
+        return f"{collection}:{ref_id!r}"
+
+    def get_many(
+        self, collection: str, ref_ids: Iterable[Any]
+    ) -> Tuple[Dict[Any, Dict[str, Any]], List[Any]]:
+        """
+        Look up referenced documents.
+
+        Args:
+            collection (str): Referenced collection
+            ref_ids (Iterable[Any]): Referenced _id values
+
+        Returns:
+            Tuple[Dict[Any, Dict[str, Any]], List[Any]]: Cached documents by _id,
+                and the ids that must be fetched
+        """
+        if not self.cacheable(collection):
+            return {}, list(ref_ids)
+
+        found: Dict[Any, Dict[str, Any]] = {}
+        missing: List[Any] = []
+        for ref_id in ref_ids:
+            document = self._cache.get(self._key(collection, ref_id))
+            if document is None:
+                missing.append(ref_id)
+            else:
+                found[ref_id] = document
+        return found, missing
+
+    def put_many(self, collection: str, documents: Iterable[Dict[str, Any]]) -> None:
+        """Cache fetched documents of a cacheable collection by their _id."""
+        if not self.cacheable(collection):
+            return
+        for document in documents:
+            key = self._key(collection, document["_id"])
+            self._cache.set(key, document, len(bson.encode(document)))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"collections": sorted(self.collections), **self._cache.stats()}
+
+
+reference_cache = ReferenceCache(
+    collections=settings.MONGODB_REFERENCE_CACHE_COLLECTIONS,
+    ttl=settings.MONGODB_REFERENCE_CACHE_TTL,
+    max_bytes=settings.MONGODB_REFERENCE_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,234 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import bson
+from rich.console import Console
+
+from app.core.config import settings
+from app.db.mongo_client import MongoDBClient, mongodb_client
+
+console = Console()
+
+# Collection -> fields kept in memory; the _id is always kept
+REFERENCE_COLLECTIONS: Dict[str, Dict[str, int]] = {
+    "lga_boundaries": {"lga_name": 1, "geometry": 1},
+    # Simplified LGA geometries, see app.db.geometry_levels
+    "lga_boundaries_levels": {"geometry": 1},
+    "product_categories": {"product_category": 1},
+    "brands": {"brand_name": 1},
+}
+
+# Collection -> when a writer last changed its documents, see mark_changed
+CHANGES_COLLECTION = "reference_changes"
+
+
+class ReferenceRegistry:
+    """
+    Preloaded copy of the documents that sales metrics reference: LGAs with
+    their geometry at every level, product categories and brands. Aggregations return only
+    reference ids and metrics, and the documents are attached in process,
+    so each geometry crosses the wire once per reload instead of once per
+    grouped row. Documents are shared and must be treated as read-only.
+
+    The registry is versioned by a digest of its contents, which is the same
+    in every worker holding the same data, so results built from it can be
+    cached under the version.
+
+    Periodic reloads first compare a cheap fingerprint of the collections, their
+    document counts, greatest _id and the time a writer last marked them
+    changed, and skip reading the documents when it has not moved. Writers
+    editing documents in place, such as ingestion, call mark_changed.
+    """
+
+    def __init__(
+        self,
+        client: MongoDBClient,
+        collections: Dict[str, Dict[str, int]],
+        refresh_interval: int,
+    ):
+        """
+        Initialize an empty registry.
+
+        Args:
+            client (MongoDBClient): MongoDB client
+            collections (Dict[str, Dict[str, int]]): Collections to load, with
+                the projection of the fields to keep
+            refresh_interval (int): Seconds between reloads
+        """
+        self.client = client
+        self.collections = collections
+        self.refresh_interval = refresh_interval
+        self._documents: Dict[str, Dict[Any, Dict[str, Any]]] = {
+            collection: {} for collection in collections
+        }
+        self.version: Optional[str] = None
+        self._fingerprint: Optional[Dict[str, Any]] = None
+        self._loaded_at: Optional[float] = None
+        self._loads = 0
+        self._unchanged = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def load(self) -> None:
+        """Replace the registry with the current documents of every collection."""
+        names = list(self.collections)
+        results = await asyncio.gather(
+            *(
+                self.client.find_many(
+                    name, {}, sort=[("_id", 1)], projection=self.collections[name]
+                )
+                for name in names
+            )
+        )
+        digest = hashlib.sha256()
+        documents: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        for name, found in zip(names, results):
+            digest.update(name.encode())
+            for document in found:
+                digest.update(bson.encode(document))
+            documents[name] = {document["_id"]: document for document in found}
+
+        version = digest.hexdigest()[:16]
+        if version != self.version:
+            sizes = ", ".join(f"{len(documents[name])} {name}" for name in names)
+            console.log(f"[green]Loaded reference registry {version}: {sizes}[/green]")
+        # Swap in whole dictionaries so concurrent readers see the old or new data.
+        self._documents = documents
+        self.version = version
+        self._loaded_at = time.time()
+        self._loads += 1
+
+    async def fingerprint(self) -> Dict[str, Any]:
+        """
+        Summarize every collection without reading its documents.
+
+        Returns:
+            Dict[str, Any]: Estimated count, greatest _id and last change mark
+                per collection
+        """
+
+        async def summary(name: str) -> List[Any]:
+            collection = self.client.get_collection(name)
+            count, last = await asyncio.gather(
+                collection.estimated_document_count(),
+                collection.find_one({}, {"_id": 1}, sort=[("_id", -1)]),
+            )
+            return [count, last["_id"] if last else None]
+
+        names = list(self.collections)
+        summaries, changes = await asyncio.gather(
+            asyncio.gather(*(summary(name) for name in names)),
+            self.client.find_many(CHANGES_COLLECTION, {"_id": {"$in": names}}),
+        )
+        changed_at = {change["_id"]: change.get("changed_at") for change in changes}
+        return {
+            name: [*found, changed_at.get(name)]
+            for name, found in zip(names, summaries)
+        }
+
+    async def reload(self) -> bool:
+        """
+        Load the registry if its collections changed since the last reload.
+
+        Returns:
+            bool: Whether the documents were read
+        """
+        # Taken before reading, so changes made during the load are seen next time
+        fingerprint = await self.fingerprint()
+        if self.version is not None and fingerprint == self._fingerprint:
+            self._unchanged += 1
+            return False
+        await self.load()
+        self._fingerprint = fingerprint
+        return True
+
+    async def ensure_loaded(self) -> str:
+        """
+        Load the registry if it has not been loaded yet.
+
+        Returns:
+            str: The registry version
+        """
+        if self.version is None:
+            async with self._lock:
+                if self.version is None:
+                    await self.load()
+        return self.version
+
+    def get(self, collection: str, ref_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Get a referenced document.
+
+        Args:
+            collection (str): Referenced collection
+            ref_id (Any): Referenced _id
+
+        Returns:
+            Optional[Dict[str, Any]]: The document, None if it does not exist
+        """
+        return self._documents[collection].get(ref_id)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                console.log(f"[red]Reference registry reload failed: {str(e)}[/red]")
+
+    async def start(self) -> None:
+        """Load the registry and reload it in the background."""
+        try:
+            await self.reload()
+        except Exception as e:
+            # Requests load it on first use instead.
+            console.log(f"[red]Reference registry load failed: {str(e)}[/red]")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop reloading."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "documents": {
+                name: len(documents) for name, documents in self._documents.items()
+            },
+            "loaded_at": self._loaded_at,
+            "loads": self._loads,
+            "unchanged_reloads": self._unchanged,
+        }
+
+
+reference_registry = ReferenceRegistry(
+    client=mongodb_client,
+    collections=REFERENCE_COLLECTIONS,
+    refresh_interval=settings.MONGODB_REFERENCE_REGISTRY_REFRESH,
+)
+
+
+async def mark_changed(client: MongoDBClient, collection: str) -> None:
+    """
+    Record that a reference collection's documents changed, so the registry
+    reloads them even if their count and greatest _id stayed the same.
+
+    Args:
+        client (MongoDBClient): MongoDB client
+        collection (str): The changed collection
+    """
+    await client.get_collection(CHANGES_COLLECTION).update_one(
+        {"_id": collection},
+        {"$set": {"changed_at": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
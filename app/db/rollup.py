@@ -0,0 +1,428 @@
+"""
+Materialized rollups of the sales unit collections.
+
+A rollup holds one document per LGA, brand, period and, for the category
+collection, product category, with mergeable partials of every metric: sum,
+count of numeric values, min and max. Sales metrics merge the partials of the
+requested periods instead of scanning the unit collections, which are read only
+to roll up new and changed periods and to rebuild. Undated unit documents,
+with a null date or none, are rolled up too, as the period None.
+
+Each period is rolled up at a watermark of its unit documents, their count and
+greatest _id, kept in a <rollup>_watermarks collection. Periods whose watermark
+moved since, as documents were inserted or deleted, are pending. Documents
+updated in place leave the watermark unchanged; recompute their periods by name.
+
+Usage:
+    python -m app.db.rollup                     # roll up new and changed periods
+    python -m app.db.rollup --periods 2024-01   # recompute named periods
+    python -m app.db.rollup --rebuild           # rebuild every rollup
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from rich.console import Console
+from rich.table import Table
+
+from app.db.mongo_client import MongoDBClient, mongodb_client
+from app.db.query_cache import query_cache
+from app.db.redis_client import redis_client
+
+console = Console()
+
+# Response field -> unit document field holding the metric
+METRICS: Dict[str, str] = {
+    "avgRetailerDensity": "retailer_density",
+    "avgRevenue": "revenue_period_lga",
+    "avgTTV": "ttv_period_lga",
+    "avgTransactionFrequency": "transaction_frequency",
+}
+
+# Prefix of the cached sales metrics result sets, dropped when a rollup changes
+SALES_CACHE_PREFIX = "sales_metrics"
+
+
+class SalesRollup:
+    """A rollup of one sales unit collection"""
+
+    def __init__(
+        self,
+        client: MongoDBClient,
+        source: str,
+        collection: str,
+        items: Optional[str] = None,
+    ):
+        """
+        Declare a rollup.
+
+        Args:
+            client (MongoDBClient): MongoDB client
+            source (str): Unit collection rolled up
+            collection (str): Rollup collection
+            items (Optional[str]): Array field of the unit documents whose
+                elements hold a product_category and the metrics; None when the
+                metrics are top-level fields
+        """
+        self.client = client
+        self.source = source
+        self.collection = collection
+        self.items = items
+
+    @property
+    def keys(self) -> List[str]:
+        """Fields identifying a rollup document."""
+        keys = ["lga", "brand", "period"]
+        if self.items:
+            keys.append("product_category")
+        return keys
+
+    @property
+    def watermarks(self) -> str:
+        """Collection holding the watermark each period was rolled up at."""
+        return f"{self.collection}_watermarks"
+
+    def build_stages(
+        self,
+        periods: Optional[List[Optional[ObjectId]]] = None,
+        batch: Optional[ObjectId] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Build the pipeline rolling unit documents up into rollup documents.
+
+        Args:
+            periods (Optional[List[Optional[ObjectId]]]): Periods to roll up,
+                None among them for undated documents; None for all
+            batch (Optional[ObjectId]): Id of the refresh, stored on every
+                rollup document so documents it did not write can be found
+
+        Returns:
+            List[Dict[str, Any]]: Stages producing rollup documents, _id included
+        """
+        prefix = f"${self.items}." if self.items else "$"
+        stages: List[Dict[str, Any]] = []
+        if periods is not None:
+            stages.append({"$match": {"date": {"$in": periods}}})
+        if self.items:
+            stages.append({"$unwind": f"${self.items}"})
+
+        key = {"lga": "$lga", "brand": "$brand", "period": "$date"}
+        if self.items:
+            key["product_category"] = f"{prefix}product_category"
+        group: Dict[str, Any] = {
+            "_id": key,
+            # An LGA lies in one state; kept for filtering by state.
+            "state": {"$first": "$state"},
+            "count": {"$sum": 1},
+        }
+        partials: Dict[str, Any] = {}
+        for field in METRICS.values():
+            value = f"{prefix}{field}"
+            group[f"{field}_sum"] = {"$sum": value}
+            # $avg skips missing and non-numeric values, so count only numbers.
+            group[f"{field}_count"] = {
+                "$sum": {"$cond": [{"$isNumber": value}, 1, 0]}
+            }
+            group[f"{field}_min"] = {"$min": value}
+            group[f"{field}_max"] = {"$max": value}
+            partials[field] = {
+                partial: f"${field}_{partial}"
+                for partial in ("sum", "count", "min", "max")
+            }
+        stages.append({"$group": group})
+        stages.append(
+            {
+                "$project": {
+                    "_id": 1,
+                    **{field: f"$_id.{field}" for field in self.keys},
+                    "state": 1,
+                    "count": 1,
+                    "metrics": partials,
+                    "batch": {"$literal": batch},
+                }
+            }
+        )
+        return stages
+
+    def query(self, unit_query: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Translate a filter on unit documents into the same filter on the rollup.
+
+        Args:
+            unit_query (Dict[str, Any]): Filter on date, lga, state, brand and,
+                for item rollups, the items' product_category
+
+        Returns:
+            Dict[str, Any]: The filter on rollup fields
+        """
+        renames = {"date": "period"}
+        if self.items:
+            renames[f"{self.items}.product_category"] = "product_category"
+        return {renames.get(field, field): value for field, value in unit_query.items()}
+
+    def merge_stages(
+        self, query: Dict[str, Any], group_id: Dict[str, str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Build the pipeline merging rollup partials into per-group averages.
+        The groups have the same count and average fields as grouping the unit
+        documents directly.
+
+        Args:
+            query (Dict[str, Any]): Filter on rollup fields, e.g. period and lga
+            group_id (Dict[str, str]): Group key over rollup fields, e.g.
+                {"lga": "$lga"}
+
+        Returns:
+            List[Dict[str, Any]]: $match, $group and $set stages
+        """
+        group: Dict[str, Any] = {"_id": group_id, "count": {"$sum": "$count"}}
+        averages: Dict[str, Any] = {}
+        for name, field in METRICS.items():
+            group[f"{field}_sum"] = {"$sum": f"$metrics.{field}.sum"}
+            group[f"{field}_count"] = {"$sum": f"$metrics.{field}.count"}
+            averages[name] = {
+                "$cond": [
+                    {"$gt": [f"${field}_count", 0]},
+                    {"$divide": [f"${field}_sum", f"${field}_count"]},
+                    None,
+                ]
+            }
+        return [{"$match": query}, {"$group": group}, {"$set": averages}]
+
+    async def source_watermarks(
+        self, periods: Optional[List[Optional[ObjectId]]] = None
+    ) -> Dict[Optional[ObjectId], Dict[str, Any]]:
+        """
+        Compute the current watermark of periods of the unit collection.
+
+        Args:
+            periods (Optional[List[Optional[ObjectId]]]): Periods to watermark;
+                None for all
+
+        Returns:
+            Dict[Optional[ObjectId], Dict[str, Any]]: Watermark documents by
+                period, for the periods holding unit documents
+        """
+        pipeline: List[Dict[str, Any]] = []
+        if periods is not None:
+            pipeline.append({"$match": {"date": {"$in": periods}}})
+        pipeline.append(
+            {
+                "$group": {
+                    "_id": "$date",
+                    "count": {"$sum": 1},
+                    "max_id": {"$max": "$_id"},
+                }
+            }
+        )
+        cursor = await self.client.get_collection(self.source).aggregate(pipeline)
+        return {watermark["_id"]: watermark for watermark in await cursor.to_list()}
+
+    async def save_watermarks(
+        self,
+        watermarks: Dict[Optional[ObjectId], Dict[str, Any]],
+        periods: Optional[List[Optional[ObjectId]]] = None,
+    ) -> None:
+        """
+        Record the watermarks periods were rolled up at.
+
+        Args:
+            watermarks (Dict[Optional[ObjectId], Dict[str, Any]]): Watermarks as
+                returned by source_watermarks
+            periods (Optional[List[Optional[ObjectId]]]): Periods rolled up,
+                whose previous watermarks are replaced; None for all
+        """
+        collection = self.client.get_collection(self.watermarks)
+        await collection.delete_many(
+            {} if periods is None else {"_id": {"$in": periods}}
+        )
+        if watermarks:
+            await collection.insert_many(list(watermarks.values()))
+
+    async def pending_periods(self) -> List[Optional[ObjectId]]:
+        """
+        List periods whose unit documents changed since they were rolled up,
+        including new periods and periods whose documents were all deleted.
+        """
+        current = await self.source_watermarks()
+        stored = {
+            watermark["_id"]: watermark
+            for watermark in await self.client.find_many(self.watermarks, {})
+        }
+        return [
+            period for period in current if current[period] != stored.get(period)
+        ] + [period for period in stored if period not in current]
+
+    async def refresh(self, periods: Optional[List[Optional[ObjectId]]] = None) -> int:
+        """
+        Roll up periods into the rollup, replacing their existing documents.
+        New documents are merged in before the period's other documents are
+        deleted, so readers never find a recomputed period empty.
+
+        Args:
+            periods (Optional[List[Optional[ObjectId]]]): Periods to recompute;
+                defaults to the pending periods
+
+        Returns:
+            int: Number of periods rolled up
+        """
+        if periods is None:
+            periods = await self.pending_periods()
+        if not periods:
+            return 0
+
+        # Watermark first, so documents written during the refresh leave the
+        # period pending.
+        watermarks = await self.source_watermarks(periods)
+        batch = ObjectId()
+        pipeline = self.build_stages(periods, batch) + [
+            {
+                "$merge": {
+                    "into": self.collection,
+                    "on": "_id",
+                    "whenMatched": "replace",
+                    "whenNotMatched": "insert",
+                }
+            }
+        ]
+        cursor = await self.client.get_collection(self.source).aggregate(
+            pipeline, allowDiskUse=True
+        )
+        await cursor.to_list()
+        # Groups that no longer exist in a recomputed period must not linger.
+        await self.client.get_collection(self.collection).delete_many(
+            {"period": {"$in": periods}, "batch": {"$ne": batch}}
+        )
+        await self.save_watermarks(watermarks, periods)
+        return len(periods)
+
+    async def rebuild(self) -> None:
+        """
+        Rebuild the rollup from every unit document. $out swaps the new rollup
+        in when it is complete, keeping the collection's indexes, so readers
+        never see a partial rollup.
+        """
+        watermarks = await self.source_watermarks()
+        pipeline = self.build_stages(batch=ObjectId()) + [{"$out": self.collection}]
+        cursor = await self.client.get_collection(self.source).aggregate(
+            pipeline, allowDiskUse=True
+        )
+        await cursor.to_list()
+        await self.save_watermarks(watermarks)
+
+
+brand_rollup = SalesRollup(
+    mongodb_client, "brand_boundaries_unit", "brand_boundaries_rollup"
+)
+brand_category_rollup = SalesRollup(
+    mongodb_client,
+    "brand_category_boundaries_unit",
+    "brand_category_boundaries_rollup",
+    items="items",
+)
+ROLLUPS: List[SalesRollup] = [brand_rollup, brand_category_rollup]
+
+
+async def check_rollups() -> None:
+    """Log rollups with pending periods on startup instead of failing."""
+    for rollup in ROLLUPS:
+        try:
+            pending = await rollup.pending_periods()
+        except Exception as e:
+            console.log(f"[red]Checking {rollup.collection} failed: {str(e)}[/red]")
+            continue
+        if pending:
+            console.log(
+                f"[yellow]{rollup.collection} has {len(pending)} new or changed "
+                f"periods of {rollup.source}; roll them up with "
+                f"python -m app.db.rollup[/yellow]"
+            )
+
+
+async def drop_cached_sales_metrics() -> None:
+    """
+    Drop cached sales metrics, and any query cache entries of the sales
+    collections, so they are recomputed from the changed rollups.
+    """
+    prefixes = [SALES_CACHE_PREFIX] + [
+        query_cache.prefix(collection)
+        for rollup in ROLLUPS
+        for collection in (rollup.collection, rollup.source)
+    ]
+    try:
+        deleted = 0
+        for prefix in prefixes:
+            deleted += await redis_client.delete_by_prefix(prefix)
+        console.log(f"[green]Dropped {deleted} cached sales metrics keys[/green]")
+    except Exception as e:
+        console.log(f"[yellow]Could not drop cached sales metrics: {str(e)}[/yellow]")
+
+
+async def refresh_rollups(periods: Optional[List[ObjectId]] = None) -> Dict[str, int]:
+    """
+    Roll up pending or given periods in every rollup, dropping cached sales
+    metrics if any rollup changed.
+
+    Args:
+        periods (Optional[List[ObjectId]]): Periods to recompute; defaults to
+            the pending periods
+
+    Returns:
+        Dict[str, int]: Periods rolled up per rollup collection
+    """
+    counts = await asyncio.gather(*(rollup.refresh(periods) for rollup in ROLLUPS))
+    report = {rollup.collection: count for rollup, count in zip(ROLLUPS, counts)}
+    if any(counts):
+        await drop_cached_sales_metrics()
+    return report
+
+
+async def main(args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    if args.rebuild:
+        await asyncio.gather(*(rollup.rebuild() for rollup in ROLLUPS))
+        console.log(
+            f"[green]Rebuilt {len(ROLLUPS)} rollups "
+            f"in {time.perf_counter() - started:.2f}s[/green]"
+        )
+        await drop_cached_sales_metrics()
+    else:
+        periods = None
+        if args.periods:
+            found = await mongodb_client.find_many(
+                "periods", {"period_name": {"$in": args.periods}}
+            )
+            unknown = set(args.periods) - {period["period_name"] for period in found}
+            if unknown:
+                console.log(f"[red]Unknown periods: {', '.join(sorted(unknown))}[/red]")
+                return 1
+            periods = [period["_id"] for period in found]
+
+        report = await refresh_rollups(periods)
+        table = Table(
+            title=f"Refreshed rollups in {time.perf_counter() - started:.2f}s"
+        )
+        table.add_column("Rollup")
+        table.add_column("Periods rolled up", justify="right")
+        for collection, count in report.items():
+            table.add_row(collection, str(count))
+        console.print(table)
+
+    await redis_client.close()
+    await mongodb_client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the sales rollups")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--rebuild", action="store_true", help="Rebuild every rollup from scratch"
+    )
+    group.add_argument("--periods", nargs="+", help="Names of periods to recompute")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,131 @@
+import asyncio
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.db.redis_client import RedisClient, redis_client
+
+# Per computation: whether compute stored its result; see SingleFlight.not_cached.
+_stored: ContextVar[Optional[List[bool]]] = ContextVar("single_flight_stored", default=None)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent computations of the same cache key.
+    Within a worker, callers for a key share one in-flight task, which hands
+    them its result. Across workers and hosts, a Redis lock with a lease elects
+    one computing caller while the others poll the cache for its result. When
+    the holder's result is not cached, it flags the key so that waiting workers
+    stop polling and compute it once each instead of waiting out the lease.
+    """
+
+    def __init__(
+        self,
+        client: RedisClient,
+        lease_ms: int,
+        wait_timeout: float,
+        poll_interval: float,
+    ):
+        """
+        Initialize the coordinator.
+
+        Args:
+            client (RedisClient): Redis client used for the distributed lock
+            lease_ms (int): Lock lease; a crashed holder frees the key after this
+            wait_timeout (float): Seconds to wait on another holder before computing anyway
+            poll_interval (float): Seconds between cache checks while waiting
+        """
+        self.client = client
+        self.lease_ms = lease_ms
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        lookup: Callable[[], Awaitable[Optional[Any]]],
+    ) -> Any:
+        """
+        Run compute once per key and share its result with concurrent callers.
+
+        Args:
+            key (str): The cache key being computed
+            compute (Callable): Computes the value and stores it in the cache
+            lookup (Callable): Reads the value from the cache, None on a miss
+
+        Returns:
+            Any: The computed or cached value
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_locked(key, compute, lookup))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # Shield so a cancelled caller does not cancel the shared computation.
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    @staticmethod
+    def not_cached() -> None:
+        """
+        Record that the running compute did not store its result, e.g. because it
+        was too large or Redis failed. Call from within compute.
+        """
+        stored = _stored.get()
+        if stored is not None:
+            stored[0] = False
+
+    async def _run_locked(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        lookup: Callable[[], Awaitable[Optional[Any]]],
+    ) -> Any:
+        lock_key = f"lock:{key}"
+        uncached_key = f"{lock_key}:uncached"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_timeout
+        # Each computation runs in its own task, so this is local to it.
+        stored = [True]
+        _stored.set(stored)
+
+        waited = False
+        while not await self.client.acquire_lock(lock_key, token, self.lease_ms):
+            waited = True
+            await asyncio.sleep(self.poll_interval)
+            value = await lookup()
+            if value is not None:
+                return value
+            if time.monotonic() >= deadline or await self.client.has_marker(
+                uncached_key
+            ):
+                return await compute()
+
+        try:
+            # The previous holder may have filled the cache just before releasing.
+            value = await lookup() if waited else None
+            if value is not None:
+                return value
+            value = await compute()
+            if not stored[0]:
+                # Waiters would poll for a value that never arrives; flag the key
+                # for as long as a holder may hold it.
+                await self.client.set_marker(uncached_key, self.lease_ms)
+            return value
+        finally:
+            await self.client.release_lock(lock_key, token)
+
+
+single_flight = SingleFlight(
+    client=redis_client,
+    lease_ms=settings.CACHE_LOCK_LEASE_MS,
+    wait_timeout=settings.CACHE_LOCK_WAIT_TIMEOUT,
+    poll_interval=settings.CACHE_LOCK_POLL_INTERVAL,
+)
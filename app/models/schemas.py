@@ -147,6 +147,9 @@ class LGAResponse(BaseModel):
     total: int = Field(..., description="Total number of records")
     page: Optional[int] = Field(None, description="Current page number")
     page_size: Optional[int] = Field(None, description="Number of records per page")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page, None on the last page"
+    )
 
     class Config:
         json_schema_extra = {
@@ -175,6 +178,7 @@ class LGAResponse(BaseModel):
                 "total": 1,
                 "page": 1,
                 "page_size": 10,
+                "next_cursor": None,
             }
         }
 
@@ -256,6 +260,7 @@ class SalesMetricsResponse(BaseModel):
     total: int
     page: Optional[int] = None
     page_size: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class State(BaseModel):
@@ -304,6 +309,9 @@ class StateResponse(BaseModel):
     total: int = Field(..., description="Total number of records")
     page: Optional[int] = Field(None, description="Current page number")
     page_size: Optional[int] = Field(None, description="Number of records per page")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page, None on the last page"
+    )
 
     class Config:
         json_schema_extra = {
@@ -330,6 +338,7 @@ class StateResponse(BaseModel):
                 "total": 1,
                 "page": 1,
                 "page_size": 10,
+                "next_cursor": None,
             }
         }
 
@@ -390,6 +399,9 @@ class CategoryResponse(BaseModel):
     total: int = Field(..., description="Total number of records")
     page: int = Field(..., description="Current page number")
     page_size: int = Field(..., description="Number of items per page")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page, None on the last page"
+    )
 
     class Config:
         json_schema_extra = {
@@ -403,6 +415,7 @@ class CategoryResponse(BaseModel):
                 "total": 1,
                 "page": 1,
                 "page_size": 10,
+                "next_cursor": None,
             }
         }
 
@@ -414,6 +427,9 @@ class BrandResponse(BaseModel):
     total: int = Field(..., description="Total number of records")
     page: int = Field(..., description="Current page number")
     page_size: int = Field(..., description="Number of items per page")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page, None on the last page"
+    )
 
     class Config:
         json_schema_extra = {
@@ -422,6 +438,7 @@ class BrandResponse(BaseModel):
                 "total": 1,
                 "page": 1,
                 "page_size": 10,
+                "next_cursor": None,
             }
         }
 
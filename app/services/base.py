@@ -1,23 +1,308 @@
+import asyncio
+import base64
+import binascii
 import json
-from typing import Any, Dict, Optional
+import math
+import os
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 from bson import json_util
+from rich.console import Console
 
-from app.db.redis_client import redis_client
+from app.core.config import CachePolicy, settings
+from app.core.metrics import SIZE_BUCKETS, metrics
+from app.db.geometry_levels import resolve_level
+from app.db.geometry_store import MissingGeometryError, geometry_store
+from app.db.memory_cache import memory_cache
+from app.db.mongo_client import KeysetMismatchError
+from app.db.period_index import period_index
+from app.db.redis_client import CacheCodec, redis_client
+from app.db.reference_cache import reference_cache
+from app.db.reference_registry import reference_registry
+from app.db.single_flight import single_flight
+
+console = Console()
+
+ENVELOPE_KEYS = {"data", "soft_expiry", "delta"}
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a sparse fieldset names fields the resource does not have"""
+
+
+# Seconds ahead of soft expiry at which entries are refreshed inline rather than
+# in the background. Set by the cache warmer so it re-warms keys before they go stale.
+refresh_horizon: ContextVar[float] = ContextVar("cache_refresh_horizon", default=0.0)
 
 
 class BaseService:
     """Base class for all services"""
 
+    # Key namespace used to look up the cache policy in settings.CACHE_POLICIES
+    cache_namespace: str = "default"
+
+    # Top-level document fields clients may select with a sparse fieldset
+    projectable_fields: Set[str] = set()
+
+    # Strong references to background refreshes so they are not garbage collected
+    _refresh_tasks: Set[asyncio.Task] = set()
+
     @staticmethod
     def serialize_mongodb_doc(doc: Dict) -> Dict:
         """Convert MongoDB document to JSON serializable format"""
         return json.loads(json_util.dumps(doc))
 
     @staticmethod
-    async def get_cached_data(key: str) -> Optional[Dict]:
+    def encode_cursor(offset: int, keys: Optional[List[Any]] = None) -> str:
         """
-        Retrieve data from cache using the provided key.
+        Build an opaque pagination cursor.
+
+        Args:
+            offset (int): Position of the next item in the result set
+            keys (Optional[List[Any]]): Sort key values of the last item returned,
+                in serialized (extended JSON) form
+
+        Returns:
+            str: URL-safe cursor
+        """
+        payload = json.dumps({"o": offset, "k": keys}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[int, Optional[List[Any]]]:
+        """
+        Read a cursor built by encode_cursor.
+
+        Args:
+            cursor (str): The cursor
+
+        Returns:
+            Tuple[int, Optional[List[Any]]]: The offset and the sort key values,
+                with extended JSON such as {"$oid": ...} converted back to BSON types
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+            offset, keys = payload["o"], payload["k"]
+        except (binascii.Error, ValueError, TypeError, KeyError) as e:
+            raise InvalidCursorError(f"Invalid cursor: {str(e)}")
+        if not isinstance(offset, int) or offset < 0 or not isinstance(keys, (list, type(None))):
+            raise InvalidCursorError("Invalid cursor")
+        return offset, keys
+
+    @classmethod
+    def parse_fields(
+        cls, fields: Optional[str], required: Optional[List[str]] = None
+    ) -> Optional[List[str]]:
+        """
+        Parse a comma-separated sparse fieldset.
+
+        Args:
+            fields (Optional[str]): Requested fields, e.g. "lga_name,lga_code"
+            required (Optional[List[str]]): Fields always returned alongside the
+                requested ones, such as the sort keys cursors are built from
+
+        Returns:
+            Optional[List[str]]: Sorted, de-duplicated field names to project,
+                or None to return whole documents
+
+        Raises:
+            InvalidFieldsError: If a requested field is not in projectable_fields
+        """
+        if not fields:
+            return None
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        if not requested:
+            return None
+        unknown = requested - cls.projectable_fields
+        if unknown:
+            raise InvalidFieldsError(
+                f"Unknown fields: {', '.join(sorted(unknown))}. "
+                f"Available fields: {', '.join(sorted(cls.projectable_fields))}"
+            )
+        return sorted(requested | set(required or []))
+
+    @staticmethod
+    def projection(selected: Optional[List[str]]) -> Optional[Dict[str, int]]:
+        """Build a MongoDB projection from parse_fields output."""
+        return {field: 1 for field in selected} if selected else None
+
+    @staticmethod
+    def fields_cache_key(cache_key: str, selected: Optional[List[str]]) -> str:
+        """Scope a cache key to a sparse fieldset; whole documents keep the key."""
+        return f"{cache_key}_fields_{','.join(selected)}" if selected else cache_key
+
+    @staticmethod
+    def geometry_level(
+        selected: Optional[List[str]], zoom: Optional[int], tolerance: Optional[float]
+    ) -> Optional[str]:
+        """
+        Resolve the geometry level of a request for boundary documents.
+
+        Args:
+            selected (Optional[List[str]]): parse_fields output
+            zoom (Optional[int]): Map zoom
+            tolerance (Optional[float]): Largest geometry error in degrees
+
+        Returns:
+            Optional[str]: The level, None for full geometry or when the
+                fieldset leaves the geometry out
+        """
+        if selected and "geometry" not in selected:
+            return None
+        return resolve_level(zoom, tolerance)
+
+    @staticmethod
+    def geometry_projection(
+        selected: Optional[List[str]], level: Optional[str]
+    ) -> Optional[Dict[str, int]]:
+        """
+        Build a MongoDB projection from parse_fields output, leaving out the full
+        geometry when a simplified geometry level replaces it.
+        """
+        if not level:
+            return BaseService.projection(selected)
+        if not selected:
+            return {"geometry": 0}
+        return {field: 1 for field in selected if field != "geometry"}
+
+    @staticmethod
+    def level_cache_key(cache_key: str, level: Optional[str]) -> str:
+        """Scope a cache key to a geometry level; full geometry keeps the key."""
+        return f"{cache_key}_level_{level}" if level else cache_key
+
+    @classmethod
+    def cache_policy(cls) -> CachePolicy:
+        """
+        Get the cache policy for this service's namespace.
+
+        Returns:
+            CachePolicy: The namespace policy, or the default policy if none is configured
+        """
+        policies = settings.CACHE_POLICIES
+        return policies.get(cls.cache_namespace) or policies.get("default") or CachePolicy()
+
+    @classmethod
+    def cache_codec(cls) -> CacheCodec:
+        """Get the codec configured by this service's cache policy."""
+        policy = cls.cache_policy()
+        return redis_client.get_codec(policy.serializer, policy.compression)
+
+    @classmethod
+    def cache_ttls(cls, negative: bool = False) -> Tuple[int, int]:
+        """
+        Get the soft and hard cache TTLs for this service's namespace.
+
+        Args:
+            negative (bool): Get the TTLs for a not-found or empty result
+
+        Returns:
+            Tuple[int, int]: Soft TTL (serve fresh) and hard TTL (evict) in seconds
+        """
+        policy = cls.cache_policy()
+        if negative:
+            return policy.negative_ttl, policy.negative_ttl
+        return policy.soft_ttl, max(policy.hard_ttl, policy.soft_ttl)
+
+    @classmethod
+    async def externalize(cls, data: Any) -> Any:
+        """
+        Convert data to the form stored in cache. When the namespace policy
+        dedupes geometry, each GeoJSON geometry is replaced by a reference to
+        a single shared copy in the geometry store.
+
+        Args:
+            data (Any): The data to be cached
+
+        Returns:
+            Any: The data to store
+        """
+        if not cls.cache_policy().dedupe_geometry:
+            return data
+        return await geometry_store.externalize(data)
+
+    @classmethod
+    async def hydrate(cls, data: Any) -> Any:
+        """
+        Convert cached data back to the form returned to callers.
+
+        Args:
+            data (Any): Data read from cache
+
+        Returns:
+            Any: The data with geometry references replaced by the geometries
+
+        Raises:
+            MissingGeometryError: If a referenced geometry is no longer stored
+        """
+        if not cls.cache_policy().dedupe_geometry:
+            return data
+        return await geometry_store.hydrate(data)
+
+    @classmethod
+    async def get_cached_entry(cls, key: str) -> Optional[Dict]:
+        """
+        Retrieve a cache envelope holding the data and its soft expiry.
+        Checks the in-process cache first, then Redis, filling the
+        in-process cache on a Redis hit.
+
+        Args:
+            key (str): The cache key to retrieve data for
+
+        Returns:
+            Optional[Dict]: Envelope with "data", "soft_expiry" and "delta",
+                None if the key is not cached. Cached negative results have
+                falsy data. Data is in stored form; see hydrate.
+        """
+        started = time.perf_counter()
+        entry = memory_cache.get(key)
+        result = "memory_hit"
+        if entry is None:
+            redis_entry = await redis_client.get_cached_entry(key)
+            if redis_entry is None:
+                cls.record_lookup("miss", started)
+                return None
+            result = "redis_hit"
+            entry, size = redis_entry
+            if not (isinstance(entry, dict) and entry.keys() == ENVELOPE_KEYS):
+                # Entries written before TTL envelopes are served once and refreshed.
+                entry = {"data": entry, "soft_expiry": 0, "delta": 0}
+            _, hard_ttl = cls.cache_ttls(negative=not entry["data"])
+            memory_cache.set(key, entry, size, min(settings.L1_CACHE_TTL, hard_ttl))
+        cls.record_lookup(result, started)
+        return entry
+
+    @classmethod
+    def record_lookup(cls, result: str, started: float) -> None:
+        """
+        Record the outcome and latency of a cache read for this namespace.
+
+        Args:
+            result (str): "memory_hit", "redis_hit" or "miss"
+            started (float): time.perf_counter() value when the read began
+        """
+        metrics.increment("cache_lookups_total", namespace=cls.cache_namespace, result=result)
+        metrics.observe(
+            "cache_get_seconds",
+            time.perf_counter() - started,
+            namespace=cls.cache_namespace,
+            result=result,
+        )
+
+    @classmethod
+    async def get_cached_data(cls, key: str) -> Optional[Any]:
+        """
+        Retrieve data from cache using the provided key, fresh or stale.
 
         Args:
             key (str): The cache key to retrieve data for
@@ -25,19 +310,472 @@ class BaseService:
         Returns:
             Optional[Dict]: The cached data if it exists, None otherwise
         """
-        return await redis_client.get_cached_data(key)
+        entry = await cls.get_cached_entry(key)
+        if entry is None:
+            return None
+        try:
+            return await cls.hydrate(entry["data"])
+        except MissingGeometryError:
+            memory_cache.delete(key)
+            return None
 
-    @staticmethod
-    async def set_cached_data(key: str, data: Any) -> None:
+    @classmethod
+    async def set_cached_data(
+        cls, key: str, data: Any, delta: float = 0.0, negative: Optional[bool] = None
+    ) -> Dict:
         """
         Store data in cache with the provided key.
+        The entry is served fresh until the namespace soft TTL and evicted at
+        the hard TTL. Not-found and empty results are cached for the shorter
+        negative TTL so repeated misses do not reach the backend; a TTL of 0
+        disables caching them.
 
         Args:
             key (str): The cache key to store the data under
             data (Any): The data to be cached
+            delta (float): Seconds it took to compute the data
+            negative (Optional[bool]): Cache as a negative result. Defaults to
+                whether data is empty.
+
+        Returns:
+            Dict: The cache envelope, holding data as passed in
+        """
+        if negative is None:
+            negative = not data
+
+        soft_ttl, hard_ttl = cls.cache_ttls(negative)
+        entry = {"data": data, "soft_expiry": time.time() + soft_ttl, "delta": delta}
+        size = None
+        # A TTL of 0 disables caching, e.g. of negative results.
+        if hard_ttl > 0:
+            with metrics.timer("cache_set_seconds", namespace=cls.cache_namespace):
+                stored = {**entry, "data": await cls.externalize(data)}
+                size = await redis_client.set_cached_data(
+                    key,
+                    stored,
+                    hard_ttl,
+                    codec=cls.cache_codec(),
+                    max_bytes=cls.cache_policy().max_entry_bytes,
+                )
+        cls.record_store(size, negative)
+        if size is None:
+            single_flight.not_cached()
+        else:
+            memory_cache.set(key, stored, size, min(settings.L1_CACHE_TTL, hard_ttl))
+        return entry
+
+    @classmethod
+    def record_store(cls, size: Optional[int], negative: bool) -> None:
+        """
+        Record a cache write and its encoded size for this namespace.
+
+        Args:
+            size (Optional[int]): Stored size in bytes, None if it was too large to
+                cache or the write failed
+            negative (bool): Whether a negative result was stored
+        """
+        if size is None:
+            result = "skipped"
+        else:
+            result = "negative" if negative else "stored"
+            metrics.observe(
+                "cache_entry_bytes", size, SIZE_BUCKETS, namespace=cls.cache_namespace
+            )
+        metrics.increment("cache_sets_total", namespace=cls.cache_namespace, result=result)
+
+    @classmethod
+    async def run_backend(cls, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, float]:
+        """
+        Run a backend computation guarded by the cache, recording its latency.
+
+        Args:
+            compute (Callable[[], Awaitable[Any]]): Loads the data from the backend
+
+        Returns:
+            Tuple[Any, float]: The data and the seconds it took to compute
+        """
+        started = time.monotonic()
+        try:
+            data = await compute()
+        except Exception:
+            metrics.increment("cache_backend_errors_total", namespace=cls.cache_namespace)
+            raise
+        delta = time.monotonic() - started
+        metrics.observe("cache_backend_seconds", delta, namespace=cls.cache_namespace)
+        return data, delta
+
+    @staticmethod
+    def should_refresh(entry: Dict) -> bool:
+        """
+        Decide whether a cached entry should be recomputed now.
+        Uses XFetch probabilistic early expiration: the closer an entry is to
+        its soft expiry and the longer it took to compute, the more likely a
+        refresh, which spreads refreshes of keys written together over time.
+
+        Args:
+            entry (Dict): Cache envelope
+
+        Returns:
+            bool: True if the entry is stale, within the refresh horizon, or
+                chosen for early refresh
+        """
+        jitter = entry["delta"] * settings.CACHE_XFETCH_BETA * -math.log(
+            1.0 - random.random()
+        )
+        return time.time() + refresh_horizon.get() + jitter >= entry["soft_expiry"]
+
+    @classmethod
+    async def get_or_compute(
+        cls, key: str, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Return cached data for a key, computing and caching it on a miss.
+        Stale entries (past the soft TTL but within the hard TTL) are returned
+        immediately while a background task refreshes them. Concurrent
+        computations of the same key, in this worker or any other, are shared.
+
+        Args:
+            key (str): The cache key
+            compute (Callable[[], Awaitable[Any]]): Loads the data from the backend
+
+        Returns:
+            Any: The cached or freshly computed data
+        """
+
+        async def compute_and_store() -> Dict:
+            data, delta = await cls.run_backend(compute)
+            return await cls.set_cached_data(key, data, delta)
+
+        async def lookup() -> Optional[Dict]:
+            return await cls.get_cached_entry(key)
+
+        entry = await lookup()
+        if entry is not None:
+            try:
+                data = await cls.hydrate(entry["data"])
+            except MissingGeometryError:
+                # A referenced geometry was evicted; the entry is unusable.
+                memory_cache.delete(key)
+                return (await compute_and_store())["data"]
+            if cls.should_refresh(entry):
+                await cls.refresh(key, compute_and_store, lookup)
+            return data
+
+        entry = await single_flight.do(key, compute_and_store, lookup)
+        try:
+            return await cls.hydrate(entry["data"])
+        except MissingGeometryError:
+            return (await compute_and_store())["data"]
+
+    @classmethod
+    async def get_cached_page(
+        cls, key: str, skip: int, limit: int
+    ) -> Optional[Tuple[List[Any], int, Dict]]:
+        """
+        Read one page of a cached result set.
+
+        Args:
+            key (str): The result set key
+            skip (int): Number of items to skip
+            limit (int): Number of items to return
+
+        Returns:
+            Optional[Tuple[List[Any], int, Dict]]: The page items in stored form,
+                the result set total and its metadata envelope, None if the set
+                is not cached
+        """
+        meta = await cls.get_cached_entry(f"{key}:meta")
+        if meta is None:
+            return None
+
+        total = meta["data"]["total"]
+        page_key = f"{key}:{skip}:{limit}"
+        items = memory_cache.get(page_key)
+        if items is None:
+            page = await redis_client.get_cached_range(key, skip, skip + limit - 1)
+            if page is None:
+                return None
+            items, size = page
+            # The list expired or was evicted while its metadata survived.
+            if not items and skip < total:
+                return None
+            _, hard_ttl = cls.cache_ttls()
+            memory_cache.set(page_key, items, size, min(settings.L1_CACHE_TTL, hard_ttl))
+        return items, total, meta
+
+    @classmethod
+    async def get_or_compute_page(
+        cls,
+        key: str,
+        compute_all: Callable[[], Awaitable[List[Any]]],
+        skip: int,
+        limit: int,
+        compute_page: Optional[
+            Callable[[int, int, Optional[List[Any]]], Awaitable[List[Any]]]
+        ] = None,
+        compute_count: Optional[Callable[[], Awaitable[int]]] = None,
+        cursor: Optional[str] = None,
+        sort_key: Optional[Callable[[Any], List[Any]]] = None,
+        present: Optional[Callable[[List[Any]], List[Any]]] = None,
+    ) -> Dict:
+        """
+        Return one page of a result set that is computed and cached once per key.
+        The full ordered result is stored as a Redis list, so every page size and
+        offset is served by a range read instead of a new backend query.
+        Staleness, refresh and negative caching follow the same rules as get_or_compute.
+
+        When compute_page and compute_count are given, a request that finds the set
+        uncached does not wait for it: the page and the total are fetched from the
+        backend concurrently, the total is cached for the following pages, and the
+        full set is filled in the background.
+
+        Every result carries a next_cursor holding the offset of the next page and,
+        when sort_key is given, the sort key of the last item. A cursor takes the
+        place of skip: cached pages are read at its offset, and backend page fetches
+        seek past its sort key instead of skipping documents.
+
+        When present is given, the result set is stored and paginated in a compact
+        form and only the returned page is expanded, e.g. by joining the documents
+        its items reference. It must return one item per stored item, since totals
+        and cursors count stored items.
+
+        Args:
+            key (str): The result set key; must not include pagination parameters
+            compute_all (Callable[[], Awaitable[List[Any]]]): Loads the full ordered result
+            skip (int): Number of items to skip
+            limit (int): Number of items to return
+            compute_page (Optional[Callable]): Loads one page given skip, limit and
+                the sort key to start after (or None), in the same order as compute_all
+            compute_count (Optional[Callable[[], Awaitable[int]]]): Counts the full result
+            cursor (Optional[str]): A next_cursor from a previous page; overrides skip
+            sort_key (Optional[Callable[[Any], List[Any]]]): Extracts the values of
+                the sort fields from an item
+            present (Optional[Callable[[List[Any]], List[Any]]]): Builds the returned
+                items from one page of stored items
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed or does not match the sort
+
+        Returns:
+            Dict: Paginated result with data, total, page, page_size and next_cursor
+        """
+        after = None
+        if cursor:
+            skip, after = cls.decode_cursor(cursor)
+            if after is not None and sort_key is None:
+                # A keyset cursor from another endpoint; this set pages by offset
+                raise InvalidCursorError("Invalid cursor: not an offset cursor")
+
+        async def compute_and_store() -> Dict:
+            items, delta = await cls.run_backend(compute_all)
+            policy = cls.cache_policy()
+            _, hard_ttl = cls.cache_ttls(negative=not items)
+            stored = None
+            if hard_ttl > 0:
+                with metrics.timer("cache_set_seconds", namespace=cls.cache_namespace):
+                    stored = await redis_client.set_cached_list(
+                        key,
+                        await cls.externalize(items),
+                        hard_ttl,
+                        codec=cls.cache_codec(),
+                        max_bytes=policy.max_entry_bytes,
+                    )
+            cls.record_store(stored, negative=not items)
+            if stored is None:
+                single_flight.not_cached()
+            else:
+                await cls.set_cached_data(
+                    f"{key}:meta", {"total": len(items)}, delta, negative=not items
+                )
+            return {"total": len(items), "items": items}
+
+        async def lookup() -> Optional[Dict]:
+            return await cls.get_cached_entry(f"{key}:meta")
+
+        page = await cls.get_cached_page(key, skip, limit)
+        if page is not None:
+            items, total, meta = page
+            if cls.should_refresh(meta):
+                await cls.refresh(key, compute_and_store, lookup)
+        elif compute_page and compute_count and not refresh_horizon.get():
+            try:
+                items, total = await asyncio.gather(
+                    compute_page(skip, limit, after),
+                    cls.get_or_compute(f"{key}:count", compute_count),
+                )
+            except KeysetMismatchError as e:
+                # A cursor from another endpoint or an older sort
+                raise InvalidCursorError(f"Invalid cursor: {str(e)}")
+            cls.refresh_in_background(key, compute_and_store, lookup)
+        else:
+            result = await single_flight.do(key, compute_and_store, lookup)
+            if "items" in result:
+                items, total = result["items"][skip:skip + limit], result["total"]
+            else:
+                # Another worker computed the set; read our page from it.
+                page = await cls.get_cached_page(key, skip, limit)
+                if page is not None:
+                    items, total, _ = page
+                else:
+                    # The set was evicted or expired before it could be read.
+                    result = await compute_and_store()
+                    items = result["items"][skip:skip + limit]
+                    total = result["total"]
+
+        if page is not None:
+            try:
+                items = await cls.hydrate(items)
+            except MissingGeometryError:
+                # A referenced geometry was evicted; rebuild the result set.
+                memory_cache.delete(f"{key}:{skip}:{limit}")
+                result = await compute_and_store()
+                items, total = result["items"][skip:skip + limit], result["total"]
+
+        next_cursor = None
+        if items and skip + len(items) < total:
+            next_cursor = cls.encode_cursor(
+                skip + len(items), sort_key(items[-1]) if sort_key else None
+            )
+
+        return {
+            "data": present(items) if present else items,
+            "total": total,
+            "page": skip // limit + 1 if limit > 0 else 1,
+            "page_size": limit,
+            "next_cursor": next_cursor,
+        }
+
+    @classmethod
+    async def refresh(
+        cls,
+        key: str,
+        compute_and_store: Callable[[], Awaitable[Any]],
+        lookup: Callable[[], Awaitable[Optional[Any]]],
+    ) -> None:
+        """
+        Refresh a cached key that is due for recomputation. Requests schedule the
+        refresh in the background; the cache warmer, which sets refresh_horizon,
+        waits for it so its concurrency limit and timings cover the work.
+
+        Args:
+            key (str): The cache key
+            compute_and_store (Callable[[], Awaitable[Any]]): Recomputes and stores the data
+            lookup (Callable[[], Awaitable[Optional[Any]]]): Reads the cached entry
+        """
+        if refresh_horizon.get():
+            metrics.increment("cache_refreshes_total", namespace=cls.cache_namespace, mode="inline")
+            await single_flight.do(key, compute_and_store, lookup)
+        else:
+            metrics.increment(
+                "cache_refreshes_total", namespace=cls.cache_namespace, mode="background"
+            )
+            cls.refresh_in_background(key, compute_and_store, lookup)
+
+    @classmethod
+    def refresh_in_background(
+        cls,
+        key: str,
+        compute_and_store: Callable[[], Awaitable[Any]],
+        lookup: Callable[[], Awaitable[Optional[Any]]],
+    ) -> None:
+        """
+        Schedule a single-flight refresh of a key without waiting for it.
+        If another worker is already refreshing, the waiting loop ends on the
+        first cache read since the stale entry is still present.
+
+        Args:
+            key (str): The cache key
+            compute_and_store (Callable[[], Awaitable[Any]]): Recomputes and stores the data
+            lookup (Callable[[], Awaitable[Optional[Any]]]): Reads the cached entry
+        """
+
+        async def refresh():
+            try:
+                await single_flight.do(key, compute_and_store, lookup)
+            except Exception as e:
+                console.log(f"[red]Background refresh failed for {key}: {str(e)}[/red]")
+
+        task = asyncio.create_task(refresh())
+        cls._refresh_tasks.add(task)
+        task.add_done_callback(cls._refresh_tasks.discard)
+
+    @staticmethod
+    def cache_stats() -> Dict[str, Any]:
+        """
+        Get hit/miss counters for each cache layer of the current worker.
+
+        Returns:
+            Dict[str, Any]: Counters keyed by cache layer
+        """
+        return {
+            "pid": os.getpid(),
+            "memory": memory_cache.stats(),
+            "redis": redis_client.stats(),
+            "geometry": geometry_store.stats(),
+            "references": reference_cache.stats(),
+            "periods": period_index.stats(),
+            "registry": reference_registry.stats(),
+            "refreshing": len(BaseService._refresh_tasks),
+        }
+
+    @staticmethod
+    def cache_metrics() -> Dict[str, Any]:
+        """
+        Get cache metrics of the current worker, with a hit ratio summary per namespace.
+
+        Returns:
+            Dict[str, Any]: Per-namespace summary plus every counter and histogram
+        """
+        snapshot = metrics.snapshot()
+        namespaces: Dict[str, Dict[str, Any]] = {}
+        for series in snapshot["counters"].get("cache_lookups_total", []):
+            summary = namespaces.setdefault(
+                series["labels"]["namespace"],
+                {"memory_hit": 0, "redis_hit": 0, "miss": 0},
+            )
+            summary[series["labels"]["result"]] += series["value"]
+        for summary in namespaces.values():
+            lookups = summary["memory_hit"] + summary["redis_hit"] + summary["miss"]
+            hits = summary["memory_hit"] + summary["redis_hit"]
+            summary["hit_ratio"] = hits / lookups if lookups else 0.0
+
+        return {"pid": os.getpid(), "namespaces": namespaces, **snapshot}
+
+    @staticmethod
+    async def largest_cache_keys(
+        prefix: str = "", limit: int = 20, max_keys: int = 100000
+    ) -> Dict[str, Any]:
+        """
+        Find the Redis keys using the most memory.
+
+        Args:
+            prefix (str): Only consider keys starting with this prefix
+            limit (int): Number of keys to return
+            max_keys (int): Stop after sampling this many keys
+
+        Returns:
+            Dict[str, Any]: The largest keys and the number of keys sampled
+        """
+        try:
+            keys, scanned = await redis_client.largest_keys(prefix, limit, max_keys)
+        except Exception as e:
+            raise Exception(f"Error fetching largest cache keys: {str(e)}")
+        return {"keys": keys, "scanned": scanned}
+
+    @staticmethod
+    async def invalidate_prefix(prefix: str) -> Dict[str, int]:
+        """
+        Delete cached keys starting with a prefix from Redis and this worker's
+        in-process cache. Other workers drop their copies within L1_CACHE_TTL.
+
+        Args:
+            prefix (str): Key prefix
 
         Returns:
-            None
+            Dict[str, int]: Number of keys deleted from each layer
         """
-        if data:
-            await redis_client.set_cached_data(key, data)
+        try:
+            deleted = await redis_client.delete_by_prefix(prefix)
+        except Exception as e:
+            raise Exception(f"Error invalidating cache keys: {str(e)}")
+        return {"redis": deleted, "memory": memory_cache.delete_prefix(prefix)}
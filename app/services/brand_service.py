@@ -1,15 +1,25 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from app.db.mongo_client import mongodb_client
-from app.services.base import BaseService
+from app.services.base import BaseService, InvalidCursorError, InvalidFieldsError
+from app.services.cache_warmer import cache_warmer
 
 
 class BrandService(BaseService):
     """Service for handling Brand operations"""
 
+    cache_namespace = "brands"
+
+    projectable_fields = {"_id", "brand_name"}
+
     @staticmethod
+    @cache_warmer.warmable
     async def get_brands(
-        skip: int = 0, limit: int = 10, brand_name: Optional[str] = None
+        skip: int = 0,
+        limit: int = 10,
+        brand_name: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
     ) -> Dict:
         """
         Get a paginated list of brands with optional brand name filter.
@@ -18,81 +28,95 @@ class BrandService(BaseService):
             skip (int): Number of records to skip
             limit (int): Number of records to return
             brand_name (Optional[str]): Filter by brand name
+            cursor (Optional[str]): next_cursor of the previous page; overrides skip
+            fields (Optional[str]): Comma-separated fields to return; sort keys are
+                always included. Defaults to every field
 
         Returns:
             Dict: Paginated list of LGAs and total count
         """
         try:
-            # Build cache key based on parameters
-            cache_key = f"brands_list_{skip}_{limit}_{brand_name}"
-            cached_data = await BrandService.get_cached_data(cache_key)
-            if cached_data:
-                return cached_data
-
             # Build query
             query = {}
             query["brand_name"] = {"$nin": [None, "-"]}
             if brand_name:
                 query["brand_name"] = brand_name
 
-            # Get total count
-            total = len(await mongodb_client.find_many("brands", query))
-
-            # Get paginated results
-            brands = await mongodb_client.find_many(
-                collection_name="brands",
-                query=query,
-                skip=skip,
-                limit=limit,
-                sort=[("brand_name", 1)],
+            # _id breaks ties so the sort, and every cursor, is unique
+            sort = [("brand_name", 1), ("_id", 1)]
+            selected = BrandService.parse_fields(
+                fields, required=[field for field, _ in sort]
             )
 
-            # Serialize MongoDB documents
-            serialized_brands = [
-                BrandService.serialize_mongodb_doc(brand) for brand in brands
-            ]
-
-            result = {
-                "data": serialized_brands,
-                "total": total,
-                "page": skip // limit + 1 if limit > 0 else 1,
-                "page_size": limit,
-            }
+            # Build cache key from the filters and fieldset only; pages are sliced
+            # from one result set
+            cache_key = BrandService.fields_cache_key(
+                f"brands_list_{brand_name}", selected
+            )
 
-            # Cache the results
-            await BrandService.set_cached_data(cache_key, result)
-            return result
+            async def fetch_brands(
+                skip: int = 0, limit: int = 0, after: Optional[List] = None
+            ) -> List[Dict]:
+                brands = await mongodb_client.find_many(
+                    collection_name="brands",
+                    query=query,
+                    skip=0 if after else skip,
+                    limit=limit,
+                    sort=sort,
+                    after=after,
+                    projection=BrandService.projection(selected),
+                )
+                return [BrandService.serialize_mongodb_doc(brand) for brand in brands]
+
+            async def count_brands() -> int:
+                return await mongodb_client.count("brands", query)
+
+            return await BrandService.get_or_compute_page(
+                cache_key,
+                fetch_brands,
+                skip,
+                limit,
+                compute_page=fetch_brands,
+                compute_count=count_brands,
+                cursor=cursor,
+                sort_key=lambda item: [item.get(field) for field, _ in sort],
+            )
 
+        except (InvalidCursorError, InvalidFieldsError):
+            raise
         except Exception as e:
             raise Exception(f"Error fetching brands: {str(e)}")
 
     @staticmethod
-    async def get_brand_by_name(brand_name: str) -> Optional[Dict]:
+    async def get_brand_by_name(
+        brand_name: str, fields: Optional[str] = None
+    ) -> Optional[Dict]:
         """
         Get a single brand by its name.
 
         Args:
             brand_name (str): The unique name of the brand
+            fields (Optional[str]): Comma-separated fields to return. Defaults to
+                every field
 
         Returns:
             Optional[Dict]: Brand data if found, None otherwise
         """
         try:
-            # Check cache first
-            cache_key = f"brand_{brand_name}"
-            cached_data = await BrandService.get_cached_data(cache_key)
-            if cached_data:
-                return cached_data
-
-            brand = await mongodb_client.find_one(
-                collection_name="brands", query={"brand_name": brand_name}
-            )
-            if brand:
-                serialized_brand = BrandService.serialize_mongodb_doc(brand)
-                # Cache the result
-                await BrandService.set_cached_data(cache_key, serialized_brand)
-                return serialized_brand
-            return None
+            selected = BrandService.parse_fields(fields)
+            cache_key = BrandService.fields_cache_key(f"brand_{brand_name}", selected)
+
+            async def fetch_brand() -> Optional[Dict]:
+                brand = await mongodb_client.find_one(
+                    collection_name="brands",
+                    query={"brand_name": brand_name},
+                    projection=BrandService.projection(selected),
+                )
+                return BrandService.serialize_mongodb_doc(brand) if brand else None
+
+            return await BrandService.get_or_compute(cache_key, fetch_brand)
+        except InvalidFieldsError:
+            raise
         except Exception as e:
             raise Exception(f"Error fetching brand: {str(e)}")
 
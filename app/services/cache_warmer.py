@@ -0,0 +1,309 @@
+import asyncio
+import functools
+import inspect
+import time
+import uuid
+from collections import Counter
+from datetime import timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import json_util
+from redis.exceptions import RedisError
+from rich.console import Console
+
+from app.core.config import WarmQuery, settings
+from app.db.redis_client import RedisClient, redis_client
+from app.services.base import refresh_horizon
+
+console = Console()
+
+HITS_KEY = "cache_warm:hits"
+LOCK_KEY = "lock:cache_warmer"
+PROGRESS_KEY = "cache_warm:progress"
+BUCKET_SECONDS = 3600
+
+# Datetimes are stored as UTC instants; replay them as aware UTC datetimes.
+JSON_OPTIONS = json_util.JSONOptions(tz_aware=True, tzinfo=timezone.utc)
+
+# Pagination arguments of the warmable methods. Their pages, of any size, are
+# sliced from one result set per filter set, so calls differing only in these
+# warm the same key and are counted and replayed as the default first page.
+PAGE_ARGUMENTS = {"skip", "limit", "cursor"}
+
+
+class CacheWarmer:
+    """
+    Keeps frequently requested service calls cached.
+    Service methods decorated with warmable count their calls per worker, with
+    pagination arguments reset to their defaults; the counts are flushed to
+    hourly Redis sorted sets. Every interval one worker recomputes the configured
+    queries plus the most requested ones, with bounded concurrency, refreshing
+    entries that would go stale before the next cycle.
+    """
+
+    def __init__(
+        self,
+        client: RedisClient,
+        interval: int,
+        concurrency: int,
+        top_n: int,
+        window: int,
+        queries: List[WarmQuery],
+    ):
+        """
+        Initialize the warmer.
+
+        Args:
+            client (RedisClient): Redis client holding access counts and the cycle lock
+            interval (int): Seconds between warm cycles
+            concurrency (int): Queries computed at once
+            top_n (int): Number of most requested queries to warm
+            window (int): Seconds of access history used to rank queries
+            queries (List[WarmQuery]): Queries warmed every cycle regardless of traffic
+        """
+        self.client = client
+        self.interval = interval
+        self.concurrency = concurrency
+        self.top_n = top_n
+        self.window = window
+        self.queries = queries
+        self._registry: Dict[str, Callable[..., Awaitable[Any]]] = {}
+        self._signatures: Dict[str, inspect.Signature] = {}
+        self._counts: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+        self.progress: Dict[str, Any] = {
+            "state": "idle",
+            "cycles": 0,
+            "started_at": None,
+            "finished_at": None,
+            "duration": None,
+            "total": 0,
+            "warmed": 0,
+            "failed": 0,
+            "slowest": [],
+        }
+
+    def warmable(self, fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """
+        Register a service method the warmer can replay and count its calls.
+        Apply beneath @staticmethod; the method is registered by its qualified name.
+
+        Args:
+            fn (Callable[..., Awaitable[Any]]): The service method
+
+        Returns:
+            Callable[..., Awaitable[Any]]: The method, recording each call
+        """
+        name = fn.__qualname__
+        self._registry[name] = fn
+        self._signatures[name] = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                self.record(name, self._bind(name, *args, **kwargs))
+            except TypeError:
+                pass  # Invalid arguments; let the call itself raise
+            return await fn(*args, **kwargs)
+
+        return wrapper
+
+    def _bind(self, name: str, *args, **kwargs) -> Dict[str, Any]:
+        signature = self._signatures[name]
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return {
+            argument: (
+                signature.parameters[argument].default
+                if argument in PAGE_ARGUMENTS
+                else value
+            )
+            for argument, value in bound.arguments.items()
+        }
+
+    @staticmethod
+    def _member(name: str, kwargs: Dict[str, Any]) -> str:
+        return json_util.dumps(
+            {"name": name, "kwargs": kwargs}, sort_keys=True, json_options=JSON_OPTIONS
+        )
+
+    def record(self, name: str, kwargs: Dict[str, Any]) -> None:
+        """Count one call of a warmable service method in this worker."""
+        self._counts[self._member(name, kwargs)] += 1
+
+    async def flush(self) -> None:
+        """Add this worker's call counts to the current hourly bucket in Redis."""
+        counts, self._counts = self._counts, Counter()
+        if not counts:
+            return
+
+        key = f"{HITS_KEY}:{int(time.time() // BUCKET_SECONDS)}"
+        try:
+            async with self.client.redis.pipeline(transaction=False) as pipe:
+                for member, count in counts.items():
+                    pipe.zincrby(key, count, member)
+                pipe.expire(key, self.window + BUCKET_SECONDS)
+                await pipe.execute()
+        except RedisError as e:
+            console.log(f"[red]Cache warmer could not flush access counts: {str(e)}[/red]")
+
+    async def plan(self) -> List[WarmQuery]:
+        """
+        Build the list of queries to warm this cycle.
+
+        Returns:
+            List[WarmQuery]: Configured queries followed by the most requested ones
+        """
+        planned: Dict[str, WarmQuery] = {}
+        for query in self.queries:
+            if query.name not in self._registry:
+                console.log(f"[yellow]Cache warmer skipping unknown query {query.name}[/yellow]")
+                continue
+            kwargs = self._bind(query.name, **query.kwargs)
+            planned.setdefault(self._member(query.name, kwargs), query)
+
+        current = int(time.time() // BUCKET_SECONDS)
+        keys = [
+            f"{HITS_KEY}:{bucket}"
+            for bucket in range(current - self.window // BUCKET_SECONDS, current + 1)
+        ]
+        try:
+            ranked = await self.client.redis.zunion(keys, withscores=True)
+        except RedisError as e:
+            console.log(f"[red]Cache warmer could not read access counts: {str(e)}[/red]")
+            ranked = []
+
+        learned = sorted(ranked, key=lambda item: item[1], reverse=True)[: self.top_n]
+        for member, _ in learned:
+            member = member.decode() if isinstance(member, bytes) else member
+            query = WarmQuery(**json_util.loads(member, json_options=JSON_OPTIONS))
+            if query.name in self._registry:
+                planned.setdefault(member, query)
+        return list(planned.values())
+
+    async def run_cycle(self) -> None:
+        """Flush access counts and, if no other worker holds this interval, warm the plan."""
+        await self.flush()
+        # The lock is left to expire so each interval is warmed by one worker.
+        if not await self.client.acquire_lock(
+            LOCK_KEY, uuid.uuid4().hex, self.interval * 1000
+        ):
+            return
+
+        queries = await self.plan()
+        started = time.monotonic()
+        timings: List[Dict[str, Any]] = []
+        self.progress.update(
+            state="warming",
+            started_at=time.time(),
+            finished_at=None,
+            duration=None,
+            total=len(queries),
+            warmed=0,
+            failed=0,
+        )
+        await self._publish()
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def warm(query: WarmQuery) -> None:
+            async with semaphore:
+                query_started = time.monotonic()
+                try:
+                    await self._registry[query.name](**query.kwargs)
+                    self.progress["warmed"] += 1
+                except Exception as e:
+                    self.progress["failed"] += 1
+                    console.log(f"[red]Cache warmer failed on {query.name}: {str(e)}[/red]")
+                timings.append(
+                    {
+                        "name": query.name,
+                        "kwargs": query.kwargs,
+                        "seconds": time.monotonic() - query_started,
+                    }
+                )
+                await self._publish()
+
+        # Refresh anything that would go stale before the cycle after next.
+        token = refresh_horizon.set(self.interval * 2)
+        try:
+            await asyncio.gather(*(warm(query) for query in queries))
+        finally:
+            refresh_horizon.reset(token)
+
+        duration = time.monotonic() - started
+        self.progress.update(
+            state="idle",
+            cycles=self.progress["cycles"] + 1,
+            finished_at=time.time(),
+            duration=duration,
+            slowest=sorted(timings, key=lambda t: t["seconds"], reverse=True)[:5],
+        )
+        await self._publish()
+        console.log(
+            f"[green]Cache warmer warmed {self.progress['warmed']}/{len(queries)} "
+            f"queries in {duration:.2f}s[/green]"
+        )
+
+    async def _publish(self) -> None:
+        # Any worker may serve the stats endpoint, but only one warms each cycle.
+        try:
+            await self.client.redis.set(
+                PROGRESS_KEY,
+                json_util.dumps(self.progress, json_options=JSON_OPTIONS),
+                ex=self.interval * 2,
+            )
+        except RedisError as e:
+            console.log(f"[red]Cache warmer could not publish progress: {str(e)}[/red]")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_cycle()
+            except Exception as e:
+                self.progress["state"] = "idle"
+                console.log(f"[red]Cache warm cycle failed: {str(e)}[/red]")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start warming in the background, beginning with an immediate cycle."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background loop and flush remaining access counts."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def stats(self) -> Dict[str, Any]:
+        """
+        Get warm-up progress and timing of the current or last cycle.
+
+        Returns:
+            Dict[str, Any]: Progress published by the warming worker, or this
+                worker's own if none is published
+        """
+        progress = self.progress
+        try:
+            published = await self.client.redis.get(PROGRESS_KEY)
+            if published is not None:
+                progress = json_util.loads(published, json_options=JSON_OPTIONS)
+        except RedisError as e:
+            console.log(f"[red]Cache warmer could not read progress: {str(e)}[/red]")
+        return {**progress, "pending_hits": sum(self._counts.values())}
+
+
+cache_warmer = CacheWarmer(
+    client=redis_client,
+    interval=settings.CACHE_WARM_INTERVAL,
+    concurrency=settings.CACHE_WARM_CONCURRENCY,
+    top_n=settings.CACHE_WARM_TOP_N,
+    window=settings.CACHE_WARM_WINDOW,
+    queries=settings.CACHE_WARM_QUERIES,
+)
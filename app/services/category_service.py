@@ -1,28 +1,34 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from app.db.mongo_client import mongodb_client
-from app.services.base import BaseService
+from app.services.base import BaseService, InvalidCursorError, InvalidFieldsError
+from app.services.cache_warmer import cache_warmer
 
 
 class CategoryService(BaseService):
     """Service for handling Category operations"""
 
+    cache_namespace = "categories"
+
+    projectable_fields = {"_id", "product_category"}
+
     @staticmethod
+    @cache_warmer.warmable
     async def get_categories(
-        skip: int = 0, limit: int = 10, product_category: Optional[str] = None
+        skip: int = 0,
+        limit: int = 10,
+        product_category: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
     ) -> Dict:
         """
         Get a paginated list of categories with an optional partial product_category filter.
-        Uses a single aggregation pipeline with $facet to get both the total count
-        and paginated results in one DB call.
+        The sorted categories matching the filter are fetched in one DB call and cached
+        as a single result set that every page is sliced from. A cursor from the
+        previous page's next_cursor overrides skip. fields is a comma-separated
+        sparse fieldset, projected in the pipeline; sort keys are always included.
         """
         try:
-            # Build cache key based on parameters
-            cache_key = f"categories_list_{skip}_{limit}_{product_category}"
-            cached_data = await CategoryService.get_cached_data(cache_key)
-            if cached_data:
-                return cached_data
-
             # Build query.
             # If a specific product_category is provided, filter by a partial match (case-insensitive);
             # otherwise, exclude documents where product_category is None or "-"
@@ -35,84 +41,91 @@ class CategoryService(BaseService):
             else:
                 query["product_category"] = {"$nin": [None, "-"]}
 
-            # Build the aggregation pipeline with $facet.
-            pipeline = [
-                {"$match": query},
-                {
-                    "$facet": {
-                        "data": [
-                            {"$sort": {"product_category": 1}},
-                            {"$skip": skip},
-                            {"$limit": limit},
-                        ],
-                        "total": [{"$count": "count"}],
-                    }
-                },
-            ]
-
-            # Use the existing AggregateBuilder.
-            agg_builder = mongodb_client.aggregate("product_categories")
-            for stage in pipeline:
-                agg_builder.add_stage(stage)
-            agg_result = await agg_builder.exec()
-
-            # agg_result is expected to be a list with one document.
-            result_doc = agg_result[0] if agg_result and len(agg_result) > 0 else {}
-            total = (
-                result_doc.get("total", [{}])[0].get("count", 0)
-                if result_doc.get("total")
-                else 0
+            # _id breaks ties so the sort, and every cursor, is unique
+            sort = [("product_category", 1), ("_id", 1)]
+            selected = CategoryService.parse_fields(
+                fields, required=[field for field, _ in sort]
             )
-            categories = result_doc.get("data", [])
-
-            # Serialize MongoDB documents.
-            serialized_categories = [
-                CategoryService.serialize_mongodb_doc(category)
-                for category in categories
-            ]
 
-            result = {
-                "data": serialized_categories,
-                "total": total,
-                "page": skip // limit + 1 if limit > 0 else 1,
-                "page_size": limit,
-            }
+            # Build cache key from the filters and fieldset only; pages are sliced
+            # from one result set
+            cache_key = CategoryService.fields_cache_key(
+                f"categories_list_{product_category}", selected
+            )
 
-            # Cache the results.
-            await CategoryService.set_cached_data(cache_key, result)
-            return result
+            async def fetch_categories(
+                skip: int = 0, limit: int = 0, after: Optional[List] = None
+            ) -> List[Dict]:
+                # Use the existing AggregateBuilder.
+                builder = mongodb_client.aggregate("product_categories").match(query)
+                if after:
+                    builder = builder.match(mongodb_client.keyset_filter(sort, after))
+                builder = builder.sort(dict(sort))
+                if skip and not after:
+                    builder = builder.skip(skip)
+                if limit:
+                    builder = builder.limit(limit)
+                if selected:
+                    builder = builder.project(CategoryService.projection(selected))
+                categories = await builder.exec()
+
+                # Serialize MongoDB documents.
+                return [
+                    CategoryService.serialize_mongodb_doc(category)
+                    for category in categories
+                ]
+
+            async def count_categories() -> int:
+                return await mongodb_client.count("product_categories", query)
+
+            return await CategoryService.get_or_compute_page(
+                cache_key,
+                fetch_categories,
+                skip,
+                limit,
+                compute_page=fetch_categories,
+                compute_count=count_categories,
+                cursor=cursor,
+                sort_key=lambda item: [item.get(field) for field, _ in sort],
+            )
 
+        except (InvalidCursorError, InvalidFieldsError):
+            raise
         except Exception as e:
             raise Exception(f"Error fetching categories: {str(e)}")
 
     @staticmethod
-    async def get_category_by_name(product_category: str) -> Optional[Dict]:
+    async def get_category_by_name(
+        product_category: str, fields: Optional[str] = None
+    ) -> Optional[Dict]:
         """
         Get a single category by its product_category.
 
         Args:
             product_category (str): The unique name of the category.
+            fields (Optional[str]): Comma-separated fields to return. Defaults to
+                every field.
 
         Returns:
             Optional[Dict]: Category data if found, None otherwise.
         """
         try:
-            # Check cache first
-            cache_key = f"category_{product_category}"
-            cached_data = await CategoryService.get_cached_data(cache_key)
-            if cached_data:
-                return cached_data
-
-            category = await mongodb_client.find_one(
-                collection_name="product_categories",
-                query={"product_category": product_category},
+            selected = CategoryService.parse_fields(fields)
+            cache_key = CategoryService.fields_cache_key(
+                f"category_{product_category}", selected
             )
-            if category:
-                serialized_category = CategoryService.serialize_mongodb_doc(category)
-                # Cache the result
-                await CategoryService.set_cached_data(cache_key, serialized_category)
-                return serialized_category
-            return None
+
+            async def fetch_category() -> Optional[Dict]:
+                category = await mongodb_client.find_one(
+                    collection_name="product_categories",
+                    query={"product_category": product_category},
+                    projection=CategoryService.projection(selected),
+                )
+                return CategoryService.serialize_mongodb_doc(category) if category else None
+
+            return await CategoryService.get_or_compute(cache_key, fetch_category)
+        except InvalidFieldsError:
+            raise
         except Exception as e:
             raise Exception(f"Error fetching category: {str(e)}")
 
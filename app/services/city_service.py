@@ -2,10 +2,14 @@ from typing import Dict, List
 
 from app.db.bigquery import bigquery_client
 from app.services.base import BaseService
+from app.services.cache_warmer import cache_warmer
 
 
 class CityService(BaseService):
+    cache_namespace = "cities"
+
     @staticmethod
+    @cache_warmer.warmable
     async def get_cities() -> List[Dict[str, str]]:
         """
         Retrieve a list of all available cities.
@@ -17,13 +21,7 @@ class CityService(BaseService):
             Results are cached to improve performance
         """
         cache_key = "cities_list"
-        cached_data = await CityService.get_cached_data(cache_key)
-        if cached_data:
-            return cached_data
-
-        cities = await bigquery_client.get_cities()
-        await CityService.set_cached_data(cache_key, cities)
-        return cities
+        return await CityService.get_or_compute(cache_key, bigquery_client.get_cities)
 
     @staticmethod
     async def get_city_metrics(city_name: str) -> Dict:
@@ -40,13 +38,9 @@ class CityService(BaseService):
             Results are cached to improve performance
         """
         cache_key = f"city_metrics_{city_name}"
-        cached_data = await CityService.get_cached_data(cache_key)
-        if cached_data:
-            return cached_data
-
-        metrics = await bigquery_client.get_city_metrics(city_name)
-        await CityService.set_cached_data(cache_key, metrics)
-        return metrics
+        return await CityService.get_or_compute(
+            cache_key, lambda: bigquery_client.get_city_metrics(city_name)
+        )
 
 
 city_service = CityService()
@@ -1,15 +1,36 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
+from app.db.geometry_levels import geometry_levels
 from app.db.mongo_client import mongodb_client
-from app.services.base import BaseService
+from app.services.base import BaseService, InvalidCursorError, InvalidFieldsError
+from app.services.cache_warmer import cache_warmer
 
 
 class LGAService(BaseService):
     """Service for handling Local Government Area (LGA) operations"""
 
+    cache_namespace = "lgas"
+
+    projectable_fields = {
+        "_id",
+        "lga_name",
+        "lga_code",
+        "state_name",
+        "state_code",
+        "country_name",
+        "geometry",
+    }
+
     @staticmethod
+    @cache_warmer.warmable
     async def get_lgas(
-        skip: int = 0, limit: int = 10, state_code: Optional[str] = None
+        skip: int = 0,
+        limit: int = 10,
+        state_code: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        zoom: Optional[int] = None,
+        tolerance: Optional[float] = None,
     ) -> Dict:
         """
         Get a paginated list of LGAs with optional state filter.
@@ -18,78 +39,102 @@ class LGAService(BaseService):
             skip (int): Number of records to skip
             limit (int): Number of records to return
             state_code (Optional[str]): Filter by state code
+            cursor (Optional[str]): next_cursor of the previous page; overrides skip
+            fields (Optional[str]): Comma-separated fields to return; sort keys are
+                always included. Defaults to every field
+            zoom (Optional[int]): Map zoom; returns geometry simplified for it
+            tolerance (Optional[float]): Largest geometry error in degrees; returns
+                geometry simplified within it. Overrides zoom
 
         Returns:
             Dict: Paginated list of LGAs and total count
         """
         try:
-            # Build cache key based on parameters
-            cache_key = f"lgas_list_{skip}_{limit}_{state_code}"
-            cached_data = await LGAService.get_cached_data(cache_key)
-            if cached_data:
-                return cached_data
-
             # Build query
             query = {}
             if state_code:
                 query["state_code"] = state_code
 
-            # Get total count
-            total = len(await mongodb_client.find_many("lga_boundaries", query))
-
-            # Get paginated results
-            lgas = await mongodb_client.find_many(
-                collection_name="lga_boundaries",
-                query=query,
-                skip=skip,
-                limit=limit,
-                sort=[("state_name", 1), ("lga_name", 1)],
+            # _id breaks ties so the sort, and every cursor, is unique
+            sort = [("state_name", 1), ("lga_name", 1), ("_id", 1)]
+            selected = LGAService.parse_fields(
+                fields, required=[field for field, _ in sort]
             )
 
-            # Serialize MongoDB documents
-            serialized_lgas = [LGAService.serialize_mongodb_doc(lga) for lga in lgas]
+            level = LGAService.geometry_level(selected, zoom, tolerance)
 
-            result = {
-                "data": serialized_lgas,
-                "total": total,
-                "page": skip // limit + 1 if limit > 0 else 1,
-                "page_size": limit,
-            }
+            # Build cache key from the filters, fieldset and geometry level only;
+            # pages are sliced from one result set
+            cache_key = LGAService.level_cache_key(
+                LGAService.fields_cache_key(f"lgas_list_{state_code}", selected),
+                level,
+            )
 
-            # Cache the results
-            await LGAService.set_cached_data(cache_key, result)
-            return result
+            async def fetch_lgas(
+                skip: int = 0, limit: int = 0, after: Optional[List] = None
+            ) -> List[Dict]:
+                lgas = await mongodb_client.find_many(
+                    collection_name="lga_boundaries",
+                    query=query,
+                    skip=0 if after else skip,
+                    limit=limit,
+                    sort=sort,
+                    after=after,
+                    projection=LGAService.geometry_projection(selected, level),
+                )
+                if level:
+                    await geometry_levels.attach(lgas, "lga_boundaries", level)
+                return [LGAService.serialize_mongodb_doc(lga) for lga in lgas]
+
+            async def count_lgas() -> int:
+                return await mongodb_client.count("lga_boundaries", query, estimate=True)
+
+            return await LGAService.get_or_compute_page(
+                cache_key,
+                fetch_lgas,
+                skip,
+                limit,
+                compute_page=fetch_lgas,
+                compute_count=count_lgas,
+                cursor=cursor,
+                sort_key=lambda item: [item.get(field) for field, _ in sort],
+            )
 
+        except (InvalidCursorError, InvalidFieldsError):
+            raise
         except Exception as e:
             raise Exception(f"Error fetching LGAs: {str(e)}")
 
     @staticmethod
-    async def get_lga_by_code(lga_code: str) -> Optional[Dict]:
+    async def get_lga_by_code(
+        lga_code: str, fields: Optional[str] = None
+    ) -> Optional[Dict]:
         """
         Get a single LGA by its code.
 
         Args:
             lga_code (str): The unique code of the LGA
+            fields (Optional[str]): Comma-separated fields to return. Defaults to
+                every field
 
         Returns:
             Optional[Dict]: LGA data if found, None otherwise
         """
         try:
-            # Check cache first
-            cache_key = f"lga_{lga_code}"
-            cached_data = await LGAService.get_cached_data(cache_key)
-            if cached_data:
-                return cached_data
-
-            lga = await mongodb_client.find_one(
-                collection_name="lga_boundaries", query={"lga_code": lga_code}
-            )
-            if lga:
-                serialized_lga = LGAService.serialize_mongodb_doc(lga)
-                # Cache the result
-                await LGAService.set_cached_data(cache_key, serialized_lga)
-                return serialized_lga
-            return None
+            selected = LGAService.parse_fields(fields)
+            cache_key = LGAService.fields_cache_key(f"lga_{lga_code}", selected)
+
+            async def fetch_lga() -> Optional[Dict]:
+                lga = await mongodb_client.find_one(
+                    collection_name="lga_boundaries",
+                    query={"lga_code": lga_code},
+                    projection=LGAService.projection(selected),
+                )
+                return LGAService.serialize_mongodb_doc(lga) if lga else None
+
+            return await LGAService.get_or_compute(cache_key, fetch_lga)
+        except InvalidFieldsError:
+            raise
         except Exception as e:
             raise Exception(f"Error fetching LGA: {str(e)}")
 
@@ -5,6 +5,8 @@ from app.services.base import BaseService
 
 
 class NeighborhoodService(BaseService):
+    cache_namespace = "neighborhoods"
+
     @staticmethod
     async def get_neighborhood_metrics(city_name: str, neighborhood_name: str) -> Dict:
         """
@@ -22,15 +24,12 @@ class NeighborhoodService(BaseService):
             Results are cached to improve performance
         """
         cache_key = f"neighborhood_metrics_{city_name}_{neighborhood_name}"
-        cached_data = await NeighborhoodService.get_cached_data(cache_key)
-        if cached_data:
-            return cached_data
-
-        metrics = await bigquery_client.get_neighborhood_metrics(
-            city_name, neighborhood_name
+        return await NeighborhoodService.get_or_compute(
+            cache_key,
+            lambda: bigquery_client.get_neighborhood_metrics(
+                city_name, neighborhood_name
+            ),
         )
-        await NeighborhoodService.set_cached_data(cache_key, metrics)
-        return metrics
 
 
 neighborhood_service = NeighborhoodService()
@@ -5,6 +5,8 @@ from app.services.base import BaseService
 
 
 class RetailerService(BaseService):
+    cache_namespace = "retailers"
+
     @staticmethod
     async def get_retailer_metrics(seller_id: int) -> Dict:
         """
@@ -20,13 +22,9 @@ class RetailerService(BaseService):
             Results are cached to improve performance
         """
         cache_key = f"retailer_metrics_{seller_id}"
-        cached_data = await RetailerService.get_cached_data(cache_key)
-        if cached_data:
-            return cached_data
-
-        metrics = await bigquery_client.get_retailer_metrics(seller_id)
-        await RetailerService.set_cached_data(cache_key, metrics)
-        return metrics
+        return await RetailerService.get_or_compute(
+            cache_key, lambda: bigquery_client.get_retailer_metrics(seller_id)
+        )
 
     @staticmethod
     async def search_retailers(query: str, city: str = None) -> List[Dict]:
@@ -45,13 +43,9 @@ class RetailerService(BaseService):
             Search is case-insensitive and uses partial matching
         """
         cache_key = f"retailer_search_{city}_{query}"
-        cached_data = await RetailerService.get_cached_data(cache_key)
-        if cached_data:
-            return cached_data
-
-        results = await bigquery_client.search_retailers(query, city)
-        await RetailerService.set_cached_data(cache_key, results)
-        return results
+        return await RetailerService.get_or_compute(
+            cache_key, lambda: bigquery_client.search_retailers(query, city)
+        )
 
 
 retailer_service = RetailerService()
@@ -1,23 +1,39 @@
+import json
 from datetime import datetime
 from typing import Dict, List, Optional
 
-from bson import ObjectId
+from bson import ObjectId, json_util
 
+from app.core.config import settings
+from app.db.geometry_levels import level_id, resolve_level
 from app.db.mongo_client import mongodb_client
-from app.services.base import BaseService
+from app.db.period_index import period_index
+from app.db.reference_registry import reference_registry
+from app.db.rollup import METRICS, brand_category_rollup, brand_rollup
+from app.services.base import BaseService, InvalidCursorError
+from app.services.cache_warmer import cache_warmer
+
+# Group key field -> collection its ids reference
+REFERENCE_FIELDS = {
+    "lga": "lga_boundaries",
+    "product_category": "product_categories",
+    "brand": "brands",
+}
 
 
 class SalesService(BaseService):
     """Service for handling sales metrics operations"""
 
+    cache_namespace = "sales"
+
     @staticmethod
     def transform_aggregated_to_geojson(agg_doc: dict) -> dict:
         """
         Transforms an aggregated document (grouped by LGA and product_category,
         and optionally brand) into a GeoJSON Feature.
-        Expects that the aggregation has looked up the corresponding LGA document
-        (from 'lga_boundaries') in the 'lga' field and product category details
-        in the 'product_category' field.
+        Expects the corresponding LGA document (from 'lga_boundaries') in the
+        'lga' field and product category details in the 'product_category'
+        field, as attached by join_references.
         Optionally includes "brand_name" if brand data is present.
         """
         lga = agg_doc.get("lga", {})
@@ -41,8 +57,91 @@ class SalesService(BaseService):
             "geometry": lga.get("geometry"),
         }
         return BaseService.serialize_mongodb_doc(feature)
-    
-    
+
+    @staticmethod
+    def metrics_projection() -> Dict[str, int]:
+        """Projection keeping the group key and metrics of a grouped row."""
+        return {"_id": 1, "count": 1, **{name: 1 for name in METRICS}}
+
+    @staticmethod
+    def join_references(rows: List[Dict], fields: List[str]) -> List[Dict]:
+        """
+        Attach the documents referenced by each grouped row's key from the
+        reference registry, in place of a $lookup and $unwind per reference.
+        Rows referencing a missing document are dropped, as $unwind dropped them.
+
+        Args:
+            rows: Grouped rows whose _id holds the reference ids
+            fields: Reference fields of the group key: lga, product_category
+                and brand
+
+        Returns:
+            Rows with the key replaced by the referenced documents
+        """
+        joined = []
+        for row in rows:
+            key = row.pop("_id")
+            for field in fields:
+                document = reference_registry.get(REFERENCE_FIELDS[field], key.get(field))
+                if document is None:
+                    break
+                row[field] = document
+            else:
+                joined.append(row)
+        return joined
+
+    @staticmethod
+    def referenced_rows(rows: List[Dict], fields: List[str]) -> List[Dict]:
+        """
+        Keep the grouped rows whose references all exist, in the stored form of
+        the sales result sets: group keys and metrics, with ids as extended JSON.
+        Filtering before pagination keeps totals equal to joining every row.
+
+        Args:
+            rows: Grouped rows whose _id holds the reference ids
+            fields: Reference fields of the group key
+
+        Returns:
+            The rows that join_references would keep, serialized
+        """
+        return [
+            BaseService.serialize_mongodb_doc(row)
+            for row in rows
+            if all(
+                reference_registry.get(REFERENCE_FIELDS[field], row["_id"].get(field))
+                is not None
+                for field in fields
+            )
+        ]
+
+    @staticmethod
+    def to_features(
+        rows: List[Dict], fields: List[str], level: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Join one page of stored rows to their references and build its Features.
+
+        Args:
+            rows: Rows as returned by referenced_rows
+            fields: Reference fields of the group key
+            level: Geometry level of the LGA boundaries, None for full geometry.
+                LGAs whose level has not been built keep their full geometry.
+
+        Returns:
+            GeoJSON Features, in row order
+        """
+        rows = json_util.loads(json.dumps(rows))
+        joined = SalesService.join_references(rows, fields)
+        if level:
+            for doc in joined:
+                simplified = reference_registry.get(
+                    "lga_boundaries_levels", level_id(level, doc["lga"]["_id"])
+                )
+                if simplified:
+                    # Registry documents are shared; attach a copy.
+                    doc["lga"] = {**doc["lga"], "geometry": simplified["geometry"]}
+        return [SalesService.transform_aggregated_to_geojson(doc) for doc in joined]
+
     @staticmethod
     async def get_sales_metrics(
         skip: int = 0,
@@ -69,32 +168,18 @@ class SalesService(BaseService):
             Dict containing paginated sales metrics
         """
         try:
-            # Build cache key
-            cache_key = f"sales_metrics_{skip}_{limit}_{start_date}_{end_date}_{lga_id}_{state_id}_{brand_id}"
-            cached_data = await SalesService.get_cached_data(cache_key)
-            if cached_data:
-                return cached_data
+            references = await reference_registry.ensure_loaded()
+            fields = ["lga", "brand"] if brand_id else ["lga"]
 
             # Get period IDs matching date range
-            period_query = {}
-            if start_date:
-                period_query["start_date"] = {"$gte": start_date}
-            if end_date:
-                period_query["end_date"] = {"$lte": end_date}
-
-            if period_query:
-                periods = await mongodb_client.find_many(
-                    collection_name="periods", query=period_query
-                )
-
-                period_ids = [str(period["_id"]) for period in periods]
-            else:
-                period_ids = []
+            period_ids = []
+            if start_date or end_date:
+                period_ids = await period_index.resolve(start_date, end_date)
 
             # Build metrics query
             metrics_query = {}
             if period_ids:
-                metrics_query["date"] = {"$in": [ObjectId(pid) for pid in period_ids]}
+                metrics_query["date"] = {"$in": period_ids}
             else:
                 metrics_query["date"] = {"$exists": False}
             if lga_id:
@@ -110,114 +195,69 @@ class SalesService(BaseService):
             if brand_id:
                 group_id["brand"] = "$brand"
 
-            pipeline_base: List[Dict] = [
-                {"$match": metrics_query},
-                {
-                    "$group": {
-                        "_id": group_id,
-                        "count": {"$sum": 1},
-                        "avgRetailerDensity": {"$avg": "$retailer_density"},
-                        "avgRevenue": {"$avg": "$revenue_period_lga"},
-                        "avgTTV": {"$avg": "$ttv_period_lga"},
-                        "avgTransactionFrequency": {"$avg": "$transaction_frequency"},
-                    }
-                },
-                {
-                    "$lookup": {
-                        "from": "lga_boundaries",
-                        "localField": "_id.lga",
-                        "foreignField": "_id",
-                        "as": "lga",
-                    }
-                },
-                {"$unwind": "$lga"},
-            ]
-
-            # Append brand-related stages if a brand_id is provided.
-            if brand_id:
-                pipeline_base.extend(
-                    [
-                        {
-                            "$lookup": {
-                                "from": "brands",
-                                "localField": "_id.brand",
-                                "foreignField": "_id",
-                                "as": "brand",
-                            }
-                        },
-                        {"$unwind": "$brand"},
-                    ]
+            # Without periods, only documents lacking a date match, which the unit
+            # collection tells apart from those dated null; keep that query on it.
+            if settings.MONGODB_SALES_ROLLUP and period_ids:
+                # Merge per-period partials instead of scanning unit documents.
+                collection = brand_rollup.collection
+                pipeline_base: List[Dict] = brand_rollup.merge_stages(
+                    brand_rollup.query(metrics_query), group_id
                 )
-
-            # Build the project stage dynamically.
-            project_stage = {
-                "$project": {
-                    "_id": 0,
-                    "lga": 1,
-                    "count": 1,
-                    "avgRetailerDensity": 1,
-                    "avgRevenue": 1,
-                    "avgTTV": 1,
-                    "avgTransactionFrequency": 1,
-                }
-            }
-            if brand_id:
-                project_stage["$project"]["brand"] = 1
-
-            pipeline_base.append(project_stage)
-
-            # Define the $facet stage for pagination.
-            facet_stage = {
-                "$facet": {
-                    "data": [{"$skip": skip}, {"$limit": limit}],
-                    "total": [{"$count": "total"}],
-                }
-            }
-
-            # Combine pipeline base with facet.
-            full_pipeline = pipeline_base + [facet_stage]
+            else:
+                collection = "brand_boundaries_unit"
+                pipeline_base = [
+                    {"$match": metrics_query},
+                    {
+                        "$group": {
+                            "_id": group_id,
+                            "count": {"$sum": 1},
+                            "avgRetailerDensity": {"$avg": "$retailer_density"},
+                            "avgRevenue": {"$avg": "$revenue_period_lga"},
+                            "avgTTV": {"$avg": "$ttv_period_lga"},
+                            "avgTransactionFrequency": {
+                                "$avg": "$transaction_frequency"
+                            },
+                        }
+                    },
+                ]
+
+            pipeline_base += [
+                # Order groups by key so the cached result set has a stable order.
+                {"$sort": {"_id": 1}},
+                # Return group keys and metrics only; references are joined below.
+                {"$project": SalesService.metrics_projection()},
+            ]
 
             # Build the aggregation using the AggregateBuilder.
-            # (Assuming AggregateBuilder supports add_stage(stage) and exec() to run the pipeline.)
-            agg_builder = mongodb_client.aggregate("brand_boundaries_unit")
-            for stage in full_pipeline:
+            agg_builder = mongodb_client.aggregate(collection).analytics()
+            for stage in pipeline_base:
                 agg_builder.add_stage(stage)
 
-            agg_result = await agg_builder.exec()
-
-            # agg_result is a list; extract the first document.
-            result_doc = (
-                agg_result[0] if agg_result and isinstance(agg_result, list) else {}
-            )
-            
-       
-            total = (
-                result_doc.get("total", [{}])[0].get("total", 0)
-                if result_doc.get("total")
-                else 0
-            )
-            aggregated_results = result_doc.get("data", [])
+            # Key the result set by the hash of the aggregation, so equivalent
+            # filters share it; pages are sliced from one result set. The set holds
+            # only rows whose references exist, so the key includes the reference
+            # registry version.
+            cache_key = f"sales_metrics_rows_{agg_builder.query_hash()}_{references}"
 
-            # Transform each aggregated document into a GeoJSON Feature.
-            aggregated_features = [
-                SalesService.transform_aggregated_to_geojson(doc)
-                for doc in aggregated_results
-            ]
+            async def fetch_sales_metrics() -> List[Dict]:
+                aggregated_results = await agg_builder.exec()
 
-            result = {
-                "data": aggregated_features,
-                "total": total,
-                "page": skip // limit + 1 if limit > 0 else 1,
-                "page_size": limit,
-            }
+                # Cache group keys and metrics; only the returned page is joined.
+                return SalesService.referenced_rows(aggregated_results, fields)
 
-            await SalesService.set_cached_data(cache_key, result)
-            return result
+            return await SalesService.get_or_compute_page(
+                cache_key,
+                fetch_sales_metrics,
+                skip,
+                limit,
+                present=lambda rows: SalesService.to_features(rows, fields),
+            )
 
         except Exception as e:
             raise Exception(f"Error fetching sales metrics: {str(e)}")
 
     @staticmethod
+    @cache_warmer.warmable
     async def get_sales_metricsv2(
         skip: int = 0,
         limit: int = 10,
@@ -227,6 +267,9 @@ class SalesService(BaseService):
         state_id: Optional[str] = None,
         brand_id: Optional[str] = None,
         product_category: Optional[str] = None,
+        cursor: Optional[str] = None,
+        zoom: Optional[int] = None,
+        tolerance: Optional[float] = None,
     ) -> Dict:
         """
         Get sales metrics from the 'brand_categories_boundaries_unit' collection filtered by date range,
@@ -239,42 +282,39 @@ class SalesService(BaseService):
           3. Optionally filters on items.product_category if a product_category filter is provided.
           4. Groups by a composite key (lga and items.product_category, and brand if provided),
              aggregating metrics from each item.
-          5. Looks up LGA details from 'lga_boundaries'.
-          6. Looks up product category details from 'product_categories'.
-          7. Optionally, if a brand filter is provided, looks up brand details from 'brands'.
-          8. Projects only the required fields.
-          9. Uses $facet to return both paginated data and the total count in a single DB call.
+          5. Projects the group key and metrics only.
+          6. Attaches LGA details from 'lga_boundaries', product category details from
+             'product_categories' and, if a brand filter is provided, brand details
+             from 'brands', all held in the in-process reference registry.
+        With MONGODB_SALES_ROLLUP, steps 1-4 instead merge the per-period partials of
+        the brand_category_boundaries_rollup collection (see app.db.rollup).
+        The group keys and metrics are cached once, under a hash of the pipeline
+        (see AggregateBuilder.query_hash), so filters resolving to the same periods
+        share them, and every page is sliced from them; step 6 runs only for the
+        rows of the returned page.
+        Groups are computed in full on every backend query, so the cursor (the
+        previous page's next_cursor, overriding skip) holds the position in the
+        cached set, which is ordered by group key.
+        A zoom or tolerance (in degrees, overriding zoom) swaps the LGA boundaries
+        for a simplified geometry level (see app.db.geometry_levels).
         """
         try:
-            cache_key = ( 
-                f"sales_metrics_v2_{skip}_{limit}_{start_date}_{end_date}_"
-                f"{lga_id}_{state_id}_{brand_id}_{product_category}"
-            )
-            cached_data = await SalesService.get_cached_data(cache_key)
-            if cached_data:
-                return cached_data
-
-            # Build period query
-            period_query = {}
-            if start_date:
-                period_query["start_date"] = {"$gte": start_date}
-
-            if end_date:
-                period_query["end_date"] = {"$lte": end_date}
+            references = await reference_registry.ensure_loaded()
+            fields = ["lga", "product_category"]
+            if brand_id:
+                fields.append("brand")
+            # Geometry is attached per page, so the level is not part of the key.
+            level = resolve_level(zoom, tolerance)
 
-            if period_query:
-                periods = await mongodb_client.find_many(
-                    collection_name="periods", query=period_query
-                )
-                period_ids = [str(p["_id"]) for p in periods]
-            else:
-                period_ids = []
+            # Resolve the date range to period ids
+            period_ids = []
+            if start_date or end_date:
+                period_ids = await period_index.resolve(start_date, end_date)
 
             # Build top-level query for the new collection.
             metrics_query = {}
             if period_ids:
-                metrics_query["date"] = {"$in": [ObjectId(pid) for pid in period_ids]}
-
+                metrics_query["date"] = {"$in": period_ids}
 
             if lga_id:
                 metrics_query["lga"] = ObjectId(lga_id)
@@ -285,140 +325,105 @@ class SalesService(BaseService):
             if brand_id:
                 metrics_query["brand"] = ObjectId(brand_id)
 
-            pipeline: List[Dict] = []
-
-            # Stage 1: Match top-level fields.
-            pipeline.append({"$match": metrics_query})
+            # Keep only documents holding the category before unwinding, so the
+            # match can use the items.product_category index.
+            if product_category:
+                metrics_query["items.product_category"] = ObjectId(product_category)
 
-            # Stage 2: Unwind the items array.
-            pipeline.append({"$unwind": "$items"})
+            pipeline: List[Dict] = []
 
-            # Stage 3: If product_category filter is provided, match items.product_category.
-            if product_category:
-                pipeline.append(
-                    {"$match": {"items.product_category": ObjectId(product_category)}}
+            if settings.MONGODB_SALES_ROLLUP:
+                # Stages 1-4: Merge per-period partials, which the rollup keeps
+                # per product category, instead of unwinding unit documents.
+                collection = brand_category_rollup.collection
+                group_id = {"lga": "$lga", "product_category": "$product_category"}
+                if brand_id:
+                    group_id["brand"] = "$brand"
+                pipeline.extend(
+                    brand_category_rollup.merge_stages(
+                        brand_category_rollup.query(metrics_query), group_id
+                    )
                 )
+            else:
+                collection = "brand_category_boundaries_unit"
 
-            # Stage 4: Group by composite key.
-            # Always group by lga and items.product_category.
-            group_id = {"lga": "$lga", "product_category": "$items.product_category"}
-            if brand_id:
-                group_id["brand"] = "$brand"
+                # Stage 1: Match top-level fields.
+                pipeline.append({"$match": metrics_query})
 
-            pipeline.append(
-                {
-                    "$group": {
-                        "_id": group_id,
-                        "count": {"$sum": 1},
-                        "avgRetailerDensity": {"$avg": "$items.retailer_density"},
-                        "avgRevenue": {"$avg": "$items.revenue_period_lga"},
-                        "avgTTV": {"$avg": "$items.ttv_period_lga"},
-                        "avgTransactionFrequency": {
-                            "$avg": "$items.transaction_frequency"
-                        },
-                    }
-                }
-            )
+                # Stage 2: Unwind the items array.
+                pipeline.append({"$unwind": "$items"})
 
-            # Stage 5: Lookup LGA details.
-            pipeline.append(
-                {
-                    "$lookup": {
-                        "from": "lga_boundaries",
-                        "localField": "_id.lga",
-                        "foreignField": "_id",
-                        "as": "lga",
-                    }
-                }
-            )
-            pipeline.append({"$unwind": "$lga"})
-
-            # Stage 6: Lookup product category details.
-            pipeline.append(
-                {
-                    "$lookup": {
-                        "from": "product_categories",
-                        "localField": "_id.product_category",
-                        "foreignField": "_id",
-                        "as": "product_category",
-                    }
+                # Stage 3: If product_category filter is provided, keep only its items.
+                if product_category:
+                    pipeline.append(
+                        {
+                            "$match": {
+                                "items.product_category": ObjectId(product_category)
+                            }
+                        }
+                    )
+
+                # Stage 4: Group by composite key.
+                # Always group by lga and items.product_category.
+                group_id = {
+                    "lga": "$lga",
+                    "product_category": "$items.product_category",
                 }
-            )
-            pipeline.append({"$unwind": "$product_category"})
+                if brand_id:
+                    group_id["brand"] = "$brand"
 
-            # Stage 7: If brand filter provided, lookup brand details.
-            if brand_id:
                 pipeline.append(
                     {
-                        "$lookup": {
-                            "from": "brands",
-                            "localField": "_id.brand",
-                            "foreignField": "_id",
-                            "as": "brand",
+                        "$group": {
+                            "_id": group_id,
+                            "count": {"$sum": 1},
+                            "avgRetailerDensity": {
+                                "$avg": "$items.retailer_density"
+                            },
+                            "avgRevenue": {"$avg": "$items.revenue_period_lga"},
+                            "avgTTV": {"$avg": "$items.ttv_period_lga"},
+                            "avgTransactionFrequency": {
+                                "$avg": "$items.transaction_frequency"
+                            },
                         }
                     }
                 )
-                pipeline.append({"$unwind": "$brand"})
-
-            # Stage 8: Project the required fields.
-            proj = {
-                "$project": {
-                    "_id": 0,
-                    "lga": 1,
-                    "product_category": 1,
-                    "count": 1,
-                    "avgRetailerDensity": 1,
-                    "avgRevenue": 1,
-                    "avgTTV": 1,
-                    "avgTransactionFrequency": 1,
-                }
-            }
-            if brand_id:
-                proj["$project"]["brand"] = 1
-            pipeline.append(proj)
-
-            # Stage 9: Facet for pagination.
-            pipeline.append(
-                {
-                    "$facet": {
-                        "data": [{"$skip": skip}, {"$limit": limit}],
-                        "total": [{"$count": "total"}],
-                    }
-                }
-            )
+
+            # Order groups by key so the cached result set has a stable order.
+            pipeline.append({"$sort": {"_id": 1}})
+
+            # Stage 5: Return group keys and metrics only. LGA, product category
+            # and brand details are joined from the reference registry below.
+            pipeline.append({"$project": SalesService.metrics_projection()})
 
             # Execute the aggregation using the existing AggregateBuilder.
-            agg_builder = mongodb_client.aggregate("brand_category_boundaries_unit")
+            agg_builder = mongodb_client.aggregate(collection).analytics()
             for stage in pipeline:
                 agg_builder.add_stage(stage)
-                
-            agg_result = await agg_builder.exec() 
-            
-          
-            
-            # agg_result is expected to be a list with one document.
-            result_doc = agg_result[0] if agg_result and len(agg_result) > 0 else {}
-            total = (result_doc.get("total", [{}])[0].get("total", 0)
-                     if result_doc.get("total") else 0)
-            aggregated_results = result_doc.get("data", [])
-
-            # Transform each aggregated document into a GeoJSON Feature.
-            aggregated_features = [
-                SalesService.transform_aggregated_to_geojson(doc)
-                for doc in aggregated_results
-            ]
-            
-            result = {
-                "data": aggregated_features,
-                "total": total,
-                "page": skip // limit + 1 if limit > 0 else 1,
-                "page_size": limit,
-            }
-
-            await SalesService.set_cached_data(cache_key, result)
-            return result
 
+            # Key the result set by the hash of the aggregation, so equivalent
+            # filters share it; pages are sliced from one result set. The set holds
+            # only rows whose references exist, so the key includes the reference
+            # registry version.
+            cache_key = f"sales_metrics_v2_rows_{agg_builder.query_hash()}_{references}"
+
+            async def fetch_sales_metrics() -> List[Dict]:
+                aggregated_results = await agg_builder.exec()
+
+                # Cache group keys and metrics; only the returned page is joined.
+                return SalesService.referenced_rows(aggregated_results, fields)
+
+            return await SalesService.get_or_compute_page(
+                cache_key,
+                fetch_sales_metrics,
+                skip,
+                limit,
+                cursor=cursor,
+                present=lambda rows: SalesService.to_features(rows, fields, level),
+            )
 
+        except InvalidCursorError:
+            raise
         except Exception as e:
             raise Exception(f"Error fetching sales metrics v2: {str(e)}")
 
@@ -1,15 +1,28 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
+from app.db.geometry_levels import geometry_levels
 from app.db.mongo_client import mongodb_client
-from app.services.base import BaseService
+from app.services.base import BaseService, InvalidCursorError, InvalidFieldsError
+from app.services.cache_warmer import cache_warmer
 
 
 class StateService(BaseService):
     """Service for handling State operations"""
 
+    cache_namespace = "states"
+
+    projectable_fields = {"_id", "state_name", "state_code", "country_name", "geometry"}
+
     @staticmethod
+    @cache_warmer.warmable
     async def get_states(
-        skip: int = 0, limit: int = 10, state_code: Optional[str] = None
+        skip: int = 0,
+        limit: int = 10,
+        state_code: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        zoom: Optional[int] = None,
+        tolerance: Optional[float] = None,
     ) -> Dict:
         """
         Get a paginated list of states with optional state code filter.
@@ -18,78 +31,102 @@ class StateService(BaseService):
             skip (int): Number of records to skip
             limit (int): Number of records to return
             state_code (Optional[str]): Filter by state code
+            cursor (Optional[str]): next_cursor of the previous page; overrides skip
+            fields (Optional[str]): Comma-separated fields to return; sort keys are
+                always included. Defaults to every field
+            zoom (Optional[int]): Map zoom; returns geometry simplified for it
+            tolerance (Optional[float]): Largest geometry error in degrees; returns
+                geometry simplified within it. Overrides zoom
 
         Returns:
             Dict: Paginated list of LGAs and total count
         """
         try:
-            # Build cache key based on parameters
-            cache_key = f"states_list_{skip}_{limit}_{state_code}"
-            cached_data = await StateService.get_cached_data(cache_key)
-            if cached_data:
-                return cached_data
-
             # Build query
             query = {}
             if state_code:
                 query["state_code"] = state_code
 
-            # Get total count
-            total = len(await mongodb_client.find_many("state_boundaries", query))
-
-            # Get paginated results
-            states = await mongodb_client.find_many(
-                collection_name="state_boundaries",
-                query=query,
-                skip=skip,
-                limit=limit,
-                sort=[("state_name", 1)],
+            # _id breaks ties so the sort, and every cursor, is unique
+            sort = [("state_name", 1), ("_id", 1)]
+            selected = StateService.parse_fields(
+                fields, required=[field for field, _ in sort]
             )
 
-            # Serialize MongoDB documents
-            serialized_states = [StateService.serialize_mongodb_doc(state) for state in states]
+            level = StateService.geometry_level(selected, zoom, tolerance)
 
-            result = {
-                "data": serialized_states,
-                "total": total,
-                "page": skip // limit + 1 if limit > 0 else 1,
-                "page_size": limit,
-            }
+            # Build cache key from the filters, fieldset and geometry level only;
+            # pages are sliced from one result set
+            cache_key = StateService.level_cache_key(
+                StateService.fields_cache_key(f"states_list_{state_code}", selected),
+                level,
+            )
 
-            # Cache the results
-            await StateService.set_cached_data(cache_key, result)
-            return result
+            async def fetch_states(
+                skip: int = 0, limit: int = 0, after: Optional[List] = None
+            ) -> List[Dict]:
+                states = await mongodb_client.find_many(
+                    collection_name="state_boundaries",
+                    query=query,
+                    skip=0 if after else skip,
+                    limit=limit,
+                    sort=sort,
+                    after=after,
+                    projection=StateService.geometry_projection(selected, level),
+                )
+                if level:
+                    await geometry_levels.attach(states, "state_boundaries", level)
+                return [StateService.serialize_mongodb_doc(state) for state in states]
+
+            async def count_states() -> int:
+                return await mongodb_client.count("state_boundaries", query, estimate=True)
+
+            return await StateService.get_or_compute_page(
+                cache_key,
+                fetch_states,
+                skip,
+                limit,
+                compute_page=fetch_states,
+                compute_count=count_states,
+                cursor=cursor,
+                sort_key=lambda item: [item.get(field) for field, _ in sort],
+            )
 
+        except (InvalidCursorError, InvalidFieldsError):
+            raise
         except Exception as e:
             raise Exception(f"Error fetching states: {str(e)}")
 
     @staticmethod
-    async def get_state_by_code(state_code: str) -> Optional[Dict]:
+    async def get_state_by_code(
+        state_code: str, fields: Optional[str] = None
+    ) -> Optional[Dict]:
         """
         Get a single state by its code.
 
         Args:
             state_code (str): The unique code of the state
+            fields (Optional[str]): Comma-separated fields to return. Defaults to
+                every field
 
         Returns:
             Optional[Dict]: State data if found, None otherwise
         """
         try:
-            # Check cache first
-            cache_key = f"state_{state_code}"
-            cached_data = await StateService.get_cached_data(cache_key)
-            if cached_data:
-                return cached_data
-
-            state = await mongodb_client.find_one(
-                collection_name="state_boundaries", query={"state_code": state_code}
-            )
-            if state:
-                serialized_state = StateService.serialize_mongodb_doc(state)
-                # Cache the result
-                await StateService.set_cached_data(cache_key, serialized_state)
-                return serialized_state
-            return None
+            selected = StateService.parse_fields(fields)
+            cache_key = StateService.fields_cache_key(f"state_{state_code}", selected)
+
+            async def fetch_state() -> Optional[Dict]:
+                state = await mongodb_client.find_one(
+                    collection_name="state_boundaries",
+                    query={"state_code": state_code},
+                    projection=StateService.projection(selected),
+                )
+                return StateService.serialize_mongodb_doc(state) if state else None
+
+            return await StateService.get_or_compute(cache_key, fetch_state)
+        except InvalidFieldsError:
+            raise
         except Exception as e:
             raise Exception(f"Error fetching state: {str(e)}")
 
@@ -0,0 +1,122 @@
+"""
+Report stored size and encode/decode time per cache codec on real boundary payloads.
+
+Payloads are shaped like the cached results of StateService.get_states and
+LGAService.get_lgas, built from the GeoJSON boundary files.
+
+Usage:
+    python -m benchmarks.cache_codecs
+    python -m benchmarks.cache_codecs --lga-file nigeria_lga_boundaries.geojson
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List
+
+from bson import ObjectId
+from rich.console import Console
+from rich.table import Table
+
+from app.db.redis_client import COMPRESSORS, SERIALIZERS, CacheCodec
+
+console = Console()
+
+
+def load_payload(path: str, properties: Dict[str, str]) -> Dict[str, Any]:
+    """Build a paginated service result from every feature of a GeoJSON file."""
+    with open(path, "r", encoding="utf-8") as file:
+        features = json.load(file)["features"]
+
+    documents = [
+        {
+            "_id": {"$oid": str(ObjectId())},
+            **{
+                field: feature["properties"].get(source)
+                for field, source in properties.items()
+            },
+            "country_name": feature["properties"].get("admin0Name", "Nigeria"),
+            "geometry": feature["geometry"],
+        }
+        for feature in features
+    ]
+    return {"data": documents, "total": len(documents), "page": 1, "page_size": 1000}
+
+
+def best_of(runs: int, fn: Callable[[], Any]) -> float:
+    """Return the fastest of several runs in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def main(args: argparse.Namespace):
+    payloads = {
+        "states": load_payload(
+            args.state_file, {"state_name": "admin1Name", "state_code": "admin1Pcod"}
+        )
+    }
+    if args.lga_file and os.path.exists(args.lga_file):
+        payloads["lgas"] = load_payload(
+            args.lga_file,
+            {
+                "lga_name": "admin2Name",
+                "lga_code": "admin2Pcod",
+                "state_name": "admin1Name",
+                "state_code": "admin1Pcod",
+            },
+        )
+    else:
+        console.log("[yellow]LGA file not found, benchmarking states only[/yellow]")
+
+    for name, payload in payloads.items():
+        legacy = json.dumps(payload)
+        table = Table(title=f"{name}: {payload['total']} features")
+        table.add_column("Codec")
+        table.add_column("Stored (KB)", justify="right")
+        table.add_column("Ratio", justify="right")
+        table.add_column("Encode (ms)", justify="right")
+        table.add_column("Decode (ms)", justify="right")
+
+        rows: List[tuple] = [
+            (
+                "legacy json text",
+                len(legacy),
+                best_of(args.runs, lambda: json.dumps(payload)),
+                best_of(args.runs, lambda: json.loads(legacy)),
+            )
+        ]
+        for serializer in SERIALIZERS:
+            for compression in COMPRESSORS:
+                codec = CacheCodec(serializer, compression, compress_threshold=0)
+                encoded = codec.encode(payload)
+                rows.append(
+                    (
+                        f"{serializer}+{compression}",
+                        len(encoded),
+                        best_of(args.runs, lambda: codec.encode(payload)),
+                        best_of(args.runs, lambda: codec.decode(encoded)),
+                    )
+                )
+
+        for label, size, encode_ms, decode_ms in rows:
+            table.add_row(
+                label,
+                f"{size / 1024:,.0f}",
+                f"{len(legacy) / size:.1f}x",
+                f"{encode_ms:.1f}",
+                f"{decode_ms:.1f}",
+            )
+        console.print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--state-file", default="nigeria_state_boundaries.geojson")
+    parser.add_argument("--lga-file", default="nigeria_lga_boundaries.geojson")
+    parser.add_argument("--runs", type=int, default=5)
+    main(parser.parse_args())
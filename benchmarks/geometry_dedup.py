@@ -0,0 +1,127 @@
+"""
+Compare Redis bytes for a realistic cache key mix with and without geometry deduplication.
+
+The key mix mirrors what the boundary and sales services cache: one list
+result set per boundary level, one entry per boundary, and a number of
+sales result sets whose features each embed a boundary geometry. Sizes are
+the encoded payloads written to Redis with the configured codec.
+
+Usage:
+    python -m benchmarks.geometry_dedup
+    python -m benchmarks.geometry_dedup --sales-sets 100 --categories 8
+"""
+
+import argparse
+import json
+import os
+from typing import Any, Dict, List, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+from app.db.geometry_store import GeometryStore
+from app.db.redis_client import redis_client
+
+console = Console()
+
+
+def load_documents(path: str, code_field: str) -> List[Dict[str, Any]]:
+    """Build boundary documents shaped like the cached service results."""
+    with open(path, "r", encoding="utf-8") as file:
+        features = json.load(file)["features"]
+    return [
+        {
+            "code": feature["properties"].get(code_field),
+            "name": feature["properties"].get(code_field.replace("Pcod", "Name")),
+            "geometry": feature["geometry"],
+        }
+        for feature in features
+    ]
+
+
+def key_mix(
+    documents: List[Dict[str, Any]], sales_sets: int, categories: int
+) -> List[Tuple[str, Any]]:
+    """Return (kind, value) pairs for every value the services would cache."""
+    values: List[Tuple[str, Any]] = [("list item", doc) for doc in documents]
+    values += [("entry", {"data": doc}) for doc in documents]
+    for index in range(sales_sets):
+        for category in range(categories):
+            values += [
+                (
+                    "sales item",
+                    {
+                        "type": "Feature",
+                        "id": doc["code"],
+                        "properties": {
+                            "name": doc["name"],
+                            "product_category": f"category-{category}",
+                            "count": index,
+                            "avgRevenue": 1000.0 + index,
+                        },
+                        "geometry": doc["geometry"],
+                    },
+                )
+                for doc in documents
+            ]
+    return values
+
+
+def measure(values: List[Tuple[str, Any]]) -> Dict[str, Tuple[int, int]]:
+    """Return stored bytes per kind without and with deduplication."""
+    sizes: Dict[str, List[int]] = {}
+    geometries: Dict[str, Dict] = {}
+    for kind, value in values:
+        stripped, referenced = GeometryStore.strip(value)
+        geometries.update(referenced)
+        plain, deduped = sizes.setdefault(kind, [0, 0])
+        sizes[kind] = [
+            plain + len(redis_client.codec.encode(value)),
+            deduped + len(redis_client.codec.encode(stripped)),
+        ]
+    sizes["geometry store"] = [
+        0,
+        sum(len(redis_client.codec.encode(g)) for g in geometries.values()),
+    ]
+    return {kind: (plain, deduped) for kind, (plain, deduped) in sizes.items()}
+
+
+def main(args: argparse.Namespace):
+    levels = {"states": (args.state_file, "admin1Pcod")}
+    if args.lga_file and os.path.exists(args.lga_file):
+        levels["lgas"] = (args.lga_file, "admin2Pcod")
+    else:
+        console.log("[yellow]LGA file not found, benchmarking states only[/yellow]")
+
+    for name, (path, code_field) in levels.items():
+        documents = load_documents(path, code_field)
+        values = key_mix(documents, args.sales_sets, args.categories)
+        sizes = measure(values)
+
+        table = Table(
+            title=f"{name}: {len(documents)} boundaries, {args.sales_sets} sales sets "
+            f"x {args.categories} categories"
+        )
+        table.add_column("Values")
+        table.add_column("Without dedup (KB)", justify="right")
+        table.add_column("With dedup (KB)", justify="right")
+        for kind, (plain, deduped) in sizes.items():
+            table.add_row(kind, f"{plain / 1024:,.0f}", f"{deduped / 1024:,.0f}")
+
+        plain_total = sum(plain for plain, _ in sizes.values())
+        deduped_total = sum(deduped for _, deduped in sizes.values())
+        table.add_row(
+            "total",
+            f"{plain_total / 1024:,.0f}",
+            f"{deduped_total / 1024:,.0f} ({plain_total / deduped_total:.1f}x smaller)",
+        )
+        console.print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--state-file", default="nigeria_state_boundaries.geojson")
+    parser.add_argument("--lga-file", default="nigeria_lga_boundaries.geojson")
+    parser.add_argument("--sales-sets", type=int, default=20)
+    parser.add_argument("--categories", type=int, default=5)
+    main(parser.parse_args())
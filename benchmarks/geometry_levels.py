@@ -0,0 +1,99 @@
+"""
+Compare vertices, payload size and border consistency of the simplified geometry levels.
+
+Simplifies the boundaries of a GeoJSON file at every level of
+settings.GEOMETRY_LEVELS, once as a topology, as app.db.geometry_levels
+builds them, and once boundary by boundary. Borders are consistent when every
+edge inside the country is traced by the boundaries on both sides of it; edges
+traced by one side only are gaps or overlaps between neighbours.
+
+Usage:
+    python -m benchmarks.geometry_levels
+    python -m benchmarks.geometry_levels --path nigeria_lga_boundaries.geojson
+"""
+
+import argparse
+import json
+import time
+from collections import Counter
+from typing import Any, Dict
+
+from rich.console import Console
+from rich.table import Table
+
+from app.core.config import settings
+from app.db.geometry_levels import count_vertices, simplify_topology
+from app.db.ingest import stream_features
+
+console = Console()
+
+
+def one_sided_edges(geometries: Dict[Any, Dict[str, Any]]) -> int:
+    """Count edges traced by a single ring, the outer border included."""
+    edges: Counter = Counter()
+    for geometry in geometries.values():
+        polygons = geometry["coordinates"]
+        if geometry["type"] == "Polygon":
+            polygons = [polygons]
+        for polygon in polygons:
+            for ring in polygon:
+                for a, b in zip(ring, ring[1:]):
+                    edges[frozenset((tuple(a), tuple(b)))] += 1
+    return sum(1 for count in edges.values() if count == 1)
+
+
+def main(args: argparse.Namespace):
+    geometries = {
+        index: feature["geometry"]
+        for index, feature in enumerate(stream_features(args.path))
+        if feature.get("geometry")
+    }
+    table = Table(title=f"{len(geometries)} boundaries from {args.path}")
+    table.add_column("Level")
+    table.add_column("Simplified")
+    table.add_column("Vertices", justify="right")
+    table.add_column("GeoJSON (KB)", justify="right")
+    table.add_column("One-sided edges", justify="right")
+    table.add_column("Build (s)", justify="right")
+    table.add_row(
+        "full",
+        "-",
+        str(sum(map(count_vertices, geometries.values()))),
+        f"{len(json.dumps(geometries)) / 1024:.0f}",
+        str(one_sided_edges(geometries)),
+        "-",
+    )
+
+    for name, level in settings.GEOMETRY_LEVELS.items():
+        console.log(f"[cyan]Simplifying {name}...[/cyan]")
+        for mode in ("as a topology", "per boundary"):
+            started = time.perf_counter()
+            if mode == "as a topology":
+                simplified = simplify_topology(
+                    geometries, level.tolerance, level.quantum
+                )
+            else:
+                simplified = {}
+                for index, geometry in geometries.items():
+                    simplified.update(
+                        simplify_topology(
+                            {index: geometry}, level.tolerance, level.quantum
+                        )
+                    )
+            elapsed = time.perf_counter() - started
+            table.add_row(
+                name,
+                mode,
+                str(sum(map(count_vertices, simplified.values()))),
+                f"{len(json.dumps(simplified)) / 1024:.0f}",
+                str(one_sided_edges(simplified)),
+                f"{elapsed:.2f}",
+            )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--path", default="nigeria_state_boundaries.geojson")
+    main(parser.parse_args())
@@ -0,0 +1,119 @@
+"""
+Compare request throughput and latency under concurrency for blocking and asyncio MongoDB access.
+
+Each simulated request runs one unindexed find_one against a seeded
+collection, so the server does real work per query. The blocking variant
+calls synchronous PyMongo from a coroutine, as the old client did, which
+serializes every request on the event loop. The asyncio variant goes
+through mongodb_client, so requests overlap up to the pool size.
+
+Requires a running mongod at MONGODB_URI. Not yet run: no before/after
+numbers have been recorded, as no mongod was available when the client moved
+to asyncio.
+
+Usage:
+    python -m benchmarks.mongo_concurrency --requests 2000 --concurrency 1 10 50 100
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from pymongo import MongoClient
+from rich.console import Console
+from rich.table import Table
+
+from app.core.config import settings
+from app.db.mongo_client import mongodb_client
+from benchmarks.redis_latency import percentile
+
+console = Console()
+
+BENCH_COLLECTION = "bench_mongo_concurrency"
+
+
+async def run_load(
+    query: Callable[[], Awaitable[None]], total_requests: int, concurrency: int
+) -> dict:
+    """Fire total_requests queries with at most concurrency in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one_request():
+        async with semaphore:
+            started = time.perf_counter()
+            await query()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "mean": statistics.mean(latencies),
+        "throughput": total_requests / elapsed,
+    }
+
+
+async def main(args: argparse.Namespace):
+    sync_client = MongoClient(settings.MONGODB_URI)
+    sync_collection = sync_client[settings.MONGODB_DB][BENCH_COLLECTION]
+    sync_collection.drop()
+    sync_collection.insert_many(
+        [{"value": i, "payload": "x" * 100} for i in range(args.documents)]
+    )
+
+    async def blocking_query():
+        sync_collection.find_one({"value": random.randrange(args.documents)})
+
+    async def async_query():
+        await mongodb_client.find_one(
+            BENCH_COLLECTION, {"value": random.randrange(args.documents)}
+        )
+
+    await mongodb_client.ping()
+    table = Table(
+        title=f"{args.requests} unindexed find_one over {args.documents} documents"
+    )
+    table.add_column("Client")
+    table.add_column("Concurrency", justify="right")
+    table.add_column("p50 (ms)", justify="right")
+    table.add_column("p99 (ms)", justify="right")
+    table.add_column("mean (ms)", justify="right")
+    table.add_column("req/s", justify="right")
+
+    for name, query in (
+        ("blocking pymongo (before)", blocking_query),
+        ("asyncio pymongo (after)", async_query),
+    ):
+        for concurrency in args.concurrency:
+            console.log(f"[cyan]Running {name} at concurrency {concurrency}...[/cyan]")
+            stats = await run_load(query, args.requests, concurrency)
+            table.add_row(
+                name,
+                str(concurrency),
+                f"{stats['p50']:.2f}",
+                f"{stats['p99']:.2f}",
+                f"{stats['mean']:.2f}",
+                f"{stats['throughput']:.0f}",
+            )
+
+    sync_collection.drop()
+    sync_client.close()
+    await mongodb_client.close()
+    console.print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument(
+        "--documents", type=int, default=20000, help="Documents scanned per query"
+    )
+    asyncio.run(main(parser.parse_args()))
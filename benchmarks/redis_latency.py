@@ -0,0 +1,122 @@
+"""
+Compare request latency under concurrent load for the blocking and asyncio Redis clients.
+
+Each simulated request performs one cache read followed by an awaitable
+"backend" delay, mirroring a service call that checks the cache before doing
+other I/O. With the blocking client every cache read stalls the event loop, so
+tail latency grows with concurrency; with the pooled asyncio client it does not.
+
+Usage:
+    python -m benchmarks.redis_latency --requests 5000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+import redis
+from rich.console import Console
+from rich.table import Table
+
+from app.core.config import settings
+from app.db.redis_client import redis_client
+
+console = Console()
+
+BENCH_KEY = "bench:redis_latency"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the pct-th percentile of samples (nearest-rank)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_load(
+    read: Callable[[], Awaitable[None]],
+    total_requests: int,
+    concurrency: int,
+    backend_ms: float,
+) -> dict:
+    """Fire total_requests simulated requests with at most concurrency in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one_request():
+        async with semaphore:
+            started = time.perf_counter()
+            await read()
+            await asyncio.sleep(backend_ms / 1000)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "mean": statistics.mean(latencies),
+        "throughput": total_requests / elapsed,
+    }
+
+
+async def main(args: argparse.Namespace):
+    payload = json.dumps({"data": "x" * args.payload_bytes})
+    sync_redis = redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        decode_responses=True,
+    )
+    sync_redis.set(BENCH_KEY, payload)
+
+    async def blocking_read():
+        json.loads(sync_redis.get(BENCH_KEY))
+
+    async def async_read():
+        await redis_client.get_cached_data(BENCH_KEY)
+
+    results = {}
+    for name, read in (("blocking (before)", blocking_read), ("asyncio pool (after)", async_read)):
+        console.log(f"[cyan]Running {name}...[/cyan]")
+        results[name] = await run_load(
+            read, args.requests, args.concurrency, args.backend_ms
+        )
+
+    sync_redis.delete(BENCH_KEY)
+    await redis_client.close()
+
+    table = Table(
+        title=f"{args.requests} requests, concurrency {args.concurrency}, "
+        f"{args.payload_bytes} byte payload"
+    )
+    table.add_column("Client")
+    table.add_column("p50 (ms)", justify="right")
+    table.add_column("p99 (ms)", justify="right")
+    table.add_column("mean (ms)", justify="right")
+    table.add_column("req/s", justify="right")
+    for name, stats in results.items():
+        table.add_row(
+            name,
+            f"{stats['p50']:.2f}",
+            f"{stats['p99']:.2f}",
+            f"{stats['mean']:.2f}",
+            f"{stats['throughput']:.0f}",
+        )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--payload-bytes", type=int, default=20_000)
+    parser.add_argument(
+        "--backend-ms", type=float, default=5.0, help="Simulated awaitable backend time"
+    )
+    asyncio.run(main(parser.parse_args()))
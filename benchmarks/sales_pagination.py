@@ -0,0 +1,176 @@
+"""
+Check that paginating sales group keys before joining references returns the same pages, and compare latency.
+
+Builds synthetic grouped rows, as the sales aggregations return them, for
+every LGA and product category, with a few rows referencing a deleted
+category. Before, every row was joined to its references and turned into a
+GeoJSON Feature when the result set was computed, and the Features were
+cached and sliced into pages. After, the result set holds the bare group keys
+and metrics of the rows whose references exist, and only the sliced page is
+joined. The totals and a sweep of pages are compared before timing.
+
+The reference registry is loaded from a stand-in client serving the
+synthetic LGAs and categories; no database is needed.
+
+Usage:
+    python -m benchmarks.sales_pagination --lgas 774 --categories 150 --vertices 100
+"""
+
+import argparse
+import asyncio
+import copy
+import math
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+from bson import ObjectId
+from rich.console import Console
+from rich.table import Table
+
+from app.db.redis_client import CacheCodec
+from app.db.reference_registry import reference_registry
+from app.db.rollup import METRICS
+from app.services.sales_service import SalesService
+
+console = Console()
+
+FIELDS = ["lga", "product_category"]
+
+
+class SyntheticReferences:
+    """Serves synthetic reference documents in place of mongodb_client.find_many."""
+
+    def __init__(self, documents: Dict[str, List[Dict[str, Any]]]):
+        self.documents = documents
+
+    async def find_many(self, collection: str, query: Dict, **kwargs) -> List[Dict]:
+        return self.documents.get(collection, [])
+
+
+def polygon(index: int, vertices: int) -> Dict[str, Any]:
+    center_x, center_y = 3 + index % 30, 4 + index // 30
+    ring = [
+        [
+            center_x + 0.1 * math.cos(2 * math.pi * i / vertices),
+            center_y + 0.1 * math.sin(2 * math.pi * i / vertices),
+        ]
+        for i in range(vertices)
+    ]
+    return {"type": "MultiPolygon", "coordinates": [[ring + [ring[0]]]]}
+
+
+def join_all(rows: List[Dict]) -> List[Dict]:
+    """Join and transform every row, as the result set was computed before."""
+    return [
+        SalesService.transform_aggregated_to_geojson(doc)
+        for doc in SalesService.join_references(copy.deepcopy(rows), FIELDS)
+    ]
+
+
+def timed(run, repeat: int) -> float:
+    """Mean milliseconds of repeated runs."""
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return statistics.mean(latencies)
+
+
+async def main(args: argparse.Namespace) -> int:
+    random.seed(args.seed)
+    lgas = [
+        {
+            "_id": ObjectId(),
+            "lga_name": f"LGA {i}",
+            "geometry": polygon(i, args.vertices),
+        }
+        for i in range(args.lgas)
+    ]
+    categories = [
+        {"_id": ObjectId(), "product_category": f"Category {i}"}
+        for i in range(args.categories)
+    ]
+    reference_registry.client = SyntheticReferences(
+        {"lga_boundaries": lgas, "product_categories": categories}
+    )
+    await reference_registry.load()
+
+    # Rows ordered by group key, as $sort on _id returns them; the last category
+    # is deleted from the registry's view, so its rows must be dropped.
+    deleted = ObjectId()
+    rows = sorted(
+        (
+            {
+                "_id": {"lga": lga["_id"], "product_category": category_id},
+                "count": random.randint(1, 50),
+                **{name: random.random() * 100 for name in METRICS},
+            }
+            for lga in lgas
+            for category_id in [category["_id"] for category in categories] + [deleted]
+        ),
+        key=lambda row: (row["_id"]["lga"], row["_id"]["product_category"]),
+    )
+    console.log(f"[cyan]{len(rows)} grouped rows[/cyan]")
+
+    console.log("[cyan]Joining every row (before)...[/cyan]")
+    started = time.perf_counter()
+    features = join_all(rows)
+    join_all_ms = (time.perf_counter() - started) * 1000
+    stored = SalesService.referenced_rows(rows, FIELDS)
+
+    if len(stored) != len(features):
+        console.log(
+            f"[red]Totals differ: {len(features)} before, {len(stored)} after[/red]"
+        )
+        return 1
+    total = len(stored)
+    pages = [(0, 10), (10, 10), (0, 100), (total // 2, 25), (total - 5, 10)]
+    pages += [
+        (random.randrange(total), random.choice([1, 10, 50])) for _ in range(200)
+    ]
+    for skip, limit in pages:
+        page = SalesService.to_features(stored[skip:skip + limit], FIELDS)
+        if page != features[skip:skip + limit]:
+            console.log(f"[red]Page skip={skip} limit={limit} differs[/red]")
+            return 1
+    console.log(f"[green]{len(pages)} pages identical before and after[/green]")
+
+    codec = CacheCodec("msgpack")
+    table = Table(title=f"{len(rows)} grouped rows, {args.vertices}-vertex boundaries")
+    table.add_column("Pagination")
+    table.add_column("Result set (ms)", justify="right")
+    table.add_column("Cached set (MB)", justify="right")
+    table.add_column("Page of 10 (ms)", justify="right")
+    table.add_row(
+        "join, then paginate (before)",
+        f"{join_all_ms:.0f}",
+        f"{len(codec.encode(features)) / 1e6:.1f}",
+        f"{timed(lambda: features[:10], args.repeat):.3f}",
+    )
+    compute_ms = timed(lambda: SalesService.referenced_rows(rows, FIELDS), 3)
+    page_ms = timed(lambda: SalesService.to_features(stored[:10], FIELDS), args.repeat)
+    table.add_row(
+        "paginate, then join (after)",
+        f"{compute_ms:.0f}",
+        f"{len(codec.encode(stored)) / 1e6:.1f}",
+        f"{page_ms:.3f}",
+    )
+
+    console.print(table)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lgas", type=int, default=774)
+    parser.add_argument("--categories", type=int, default=150, help="Categories per LGA")
+    parser.add_argument(
+        "--vertices", type=int, default=100, help="Vertices per LGA boundary"
+    )
+    parser.add_argument("--repeat", type=int, default=100, help="Page reads timed")
+    parser.add_argument("--seed", type=int, default=0)
+    sys.exit(asyncio.run(main(parser.parse_args())))
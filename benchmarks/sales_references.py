@@ -0,0 +1,240 @@
+"""
+Compare bytes transferred and latency of joining sales references with $lookup and from the in-memory registry.
+
+Seeds synthetic LGAs with polygon boundaries, product categories and unit
+documents with per-category items, then groups them by LGA and category as
+get_sales_metricsv2 does. The $lookup variant joins every grouped row to its
+LGA and category on the server, shipping each LGA's geometry once per
+category. The registry variant returns group keys and metrics only and
+attaches the documents from a ReferenceRegistry loaded from the bench
+collections.
+
+Requires a running mongod at MONGODB_URI.
+
+Usage:
+    python -m benchmarks.sales_references --lgas 774 --categories 20 --vertices 500
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+import bson
+from pymongo import MongoClient
+from rich.console import Console
+from rich.table import Table
+
+from app.core.config import settings
+from app.db.mongo_client import mongodb_client
+from app.db.reference_registry import ReferenceRegistry
+from app.db.rollup import METRICS
+from benchmarks.redis_latency import percentile
+
+console = Console()
+
+BENCH_LGAS = "bench_references_lgas"
+BENCH_CATEGORIES = "bench_references_categories"
+BENCH_UNITS = "bench_references_units"
+
+
+def polygon(center_x: float, center_y: float, vertices: int) -> Dict[str, Any]:
+    """A closed ring of vertices around a center, jittered like a real boundary."""
+    ring = []
+    for i in range(vertices):
+        angle = 2 * math.pi * i / vertices
+        radius = 0.1 + random.uniform(-0.01, 0.01)
+        ring.append(
+            [center_x + radius * math.cos(angle), center_y + radius * math.sin(angle)]
+        )
+    ring.append(ring[0])
+    return {"type": "Polygon", "coordinates": [ring]}
+
+
+def seed(db, args: argparse.Namespace) -> None:
+    for name in (BENCH_LGAS, BENCH_CATEGORIES, BENCH_UNITS):
+        db[name].drop()
+    lgas = db[BENCH_LGAS].insert_many(
+        [
+            {
+                "lga_name": f"LGA {i}",
+                "geometry": polygon(3 + i % 30, 4 + i // 30, args.vertices),
+            }
+            for i in range(args.lgas)
+        ]
+    ).inserted_ids
+    categories = db[BENCH_CATEGORIES].insert_many(
+        [{"product_category": f"Category {i}"} for i in range(args.categories)]
+    ).inserted_ids
+    db[BENCH_UNITS].insert_many(
+        [
+            {
+                "lga": lga,
+                "items": [
+                    {
+                        "product_category": category,
+                        **{field: random.random() * 100 for field in METRICS.values()},
+                    }
+                    for category in categories
+                ],
+            }
+            for lga in lgas
+            for _ in range(args.units)
+        ]
+    )
+
+
+def group_stages() -> List[Dict[str, Any]]:
+    group: Dict[str, Any] = {
+        "_id": {"lga": "$lga", "product_category": "$items.product_category"},
+        "count": {"$sum": 1},
+    }
+    for name, field in METRICS.items():
+        group[name] = {"$avg": f"$items.{field}"}
+    return [{"$unwind": "$items"}, {"$group": group}, {"$sort": {"_id": 1}}]
+
+
+async def run(
+    query: Callable[[], Awaitable[Tuple[List[Dict[str, Any]], int]]],
+    iterations: int,
+) -> Dict[str, float]:
+    """Run a query repeatedly, recording its latency and the bytes it returned."""
+    latencies: List[float] = []
+    transferred = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        results, transferred = await query()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {
+        "rows": len(results),
+        "bytes": transferred,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "mean": statistics.mean(latencies),
+    }
+
+
+async def main(args: argparse.Namespace):
+    sync_client = MongoClient(settings.MONGODB_URI)
+    db = sync_client[settings.MONGODB_DB]
+    console.log("[cyan]Seeding bench collections...[/cyan]")
+    seed(db, args)
+
+    registry = ReferenceRegistry(
+        client=mongodb_client,
+        collections={
+            BENCH_LGAS: {"lga_name": 1, "geometry": 1},
+            BENCH_CATEGORIES: {"product_category": 1},
+        },
+        refresh_interval=0,
+    )
+    started = time.perf_counter()
+    await registry.load()
+    load_ms = (time.perf_counter() - started) * 1000
+    registry_bytes = sum(
+        len(bson.encode(document))
+        for name in registry.collections
+        for document in registry._documents[name].values()
+    )
+
+    async def lookup_query():
+        pipeline = group_stages() + [
+            {
+                "$lookup": {
+                    "from": BENCH_LGAS,
+                    "localField": "_id.lga",
+                    "foreignField": "_id",
+                    "as": "lga",
+                }
+            },
+            {"$unwind": "$lga"},
+            {
+                "$lookup": {
+                    "from": BENCH_CATEGORIES,
+                    "localField": "_id.product_category",
+                    "foreignField": "_id",
+                    "as": "product_category",
+                }
+            },
+            {"$unwind": "$product_category"},
+            {
+                "$project": {
+                    "_id": 0,
+                    "lga": 1,
+                    "product_category": 1,
+                    "count": 1,
+                    **{name: 1 for name in METRICS},
+                }
+            },
+        ]
+        cursor = await mongodb_client.get_collection(BENCH_UNITS).aggregate(pipeline)
+        rows = await cursor.to_list()
+        return rows, sum(len(bson.encode(row)) for row in rows)
+
+    async def registry_query():
+        pipeline = group_stages() + [
+            {"$project": {"_id": 1, "count": 1, **{name: 1 for name in METRICS}}}
+        ]
+        cursor = await mongodb_client.get_collection(BENCH_UNITS).aggregate(pipeline)
+        rows = await cursor.to_list()
+        transferred = sum(len(bson.encode(row)) for row in rows)
+        for row in rows:
+            key = row.pop("_id")
+            row["lga"] = registry.get(BENCH_LGAS, key["lga"])
+            row["product_category"] = registry.get(
+                BENCH_CATEGORIES, key["product_category"]
+            )
+        return rows, transferred
+
+    table = Table(
+        title=(
+            f"{args.lgas} LGAs x {args.categories} categories, "
+            f"{args.vertices}-vertex boundaries, {args.iterations} iterations"
+        )
+    )
+    table.add_column("Join")
+    table.add_column("Rows", justify="right")
+    table.add_column("MB per request", justify="right")
+    table.add_column("p50 (ms)", justify="right")
+    table.add_column("p99 (ms)", justify="right")
+    table.add_column("mean (ms)", justify="right")
+
+    for name, query in (
+        ("$lookup (before)", lookup_query),
+        ("registry (after)", registry_query),
+    ):
+        console.log(f"[cyan]Running {name}...[/cyan]")
+        stats = await run(query, args.iterations)
+        table.add_row(
+            name,
+            str(stats["rows"]),
+            f"{stats['bytes'] / 1e6:.2f}",
+            f"{stats['p50']:.1f}",
+            f"{stats['p99']:.1f}",
+            f"{stats['mean']:.1f}",
+        )
+
+    for name in (BENCH_LGAS, BENCH_CATEGORIES, BENCH_UNITS):
+        db[name].drop()
+    sync_client.close()
+    await mongodb_client.close()
+    console.print(table)
+    console.print(
+        f"Registry load: {registry_bytes / 1e6:.2f} MB in {load_ms:.1f} ms, "
+        "once per reload rather than per request"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lgas", type=int, default=774)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument(
+        "--vertices", type=int, default=500, help="Vertices per LGA boundary"
+    )
+    parser.add_argument("--units", type=int, default=2, help="Unit documents per LGA")
+    parser.add_argument("--iterations", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
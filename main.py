@@ -1,9 +1,48 @@
+import json
+from contextlib import asynccontextmanager
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import base_router
+from app.api.cache import is_admin
 from app.core.config import settings
+from app.db.geometry_levels import check_geometry_levels
+from app.db.indexes import index_registry
+from app.db.mongo_client import mongodb_client
+from app.db.period_index import period_index
+from app.db.query_profiler import QueryStats, query_stats
+from app.db.redis_client import redis_client
+from app.db.reference_registry import reference_registry
+from app.db.rollup import check_rollups
+from app.services.cache_warmer import cache_warmer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Check MongoDB, its indexes, the sales rollups and the geometry levels, load
+    the period index and reference registry, warm the cache in the background
+    and release shared pools on shutdown.
+    """
+    await mongodb_client.ping()
+    if settings.MONGODB_INDEX_RECONCILE != "off":
+        await index_registry.check(create=settings.MONGODB_INDEX_RECONCILE == "create")
+    if settings.MONGODB_SALES_ROLLUP:
+        await check_rollups()
+    await check_geometry_levels()
+    await period_index.start()
+    await reference_registry.start()
+    if settings.CACHE_WARM_ENABLED:
+        cache_warmer.start()
+    yield
+    await cache_warmer.stop()
+    await period_index.stop()
+    await reference_registry.stop()
+    await redis_client.close()
+    await mongodb_client.close()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -11,6 +50,7 @@ app = FastAPI(
     version="0.0.1",
     description="Nigeria Retail Economics API helps you find marketing opportunities for your products. 🚀",
     swagger_ui_parameters={"syntaxHighlight": False},
+    lifespan=lifespan,
     summary="Find marketing opportunities for your products. 🚀",
     terms_of_service="https://whitespace.ai/terms/",
     contact={
@@ -31,8 +71,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Query-Stats"],
 )
 
+# Largest X-Query-Stats header sent; per-query details are dropped beyond it
+QUERY_STATS_HEADER_BYTES = 8192
+
+
+@app.middleware("http")
+async def report_query_stats(request: Request, call_next):
+    """
+    Return the MongoDB queries run for a request in the X-Query-Stats header.
+    Admins opt in per request with X-Query-Stats: 1, or X-Query-Stats: explain to
+    also report documents and keys examined and plan stages.
+    """
+    mode = request.headers.get("x-query-stats")
+    if not mode or not is_admin(request.headers.get("x-admin-token")):
+        return await call_next(request)
+
+    stats = QueryStats(explain=mode.lower() == "explain")
+    token = query_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        query_stats.reset(token)
+
+    summary = stats.summary()
+    header = json.dumps(summary, separators=(",", ":"), default=str)
+    if len(header) > QUERY_STATS_HEADER_BYTES:
+        summary = {**summary, "queries": [], "truncated": True}
+        header = json.dumps(summary, separators=(",", ":"), default=str)
+    response.headers["X-Query-Stats"] = header
+    return response
+
 # Include routers
 app.include_router(base_router, prefix=settings.API_V1_STR)
 
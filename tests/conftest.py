@@ -0,0 +1,178 @@
+"""
+Shared fixtures.
+
+Settings are read from the environment when app.core.config is imported, so
+the required ones get test defaults here first. Async tests run on asyncio
+through the anyio plugin. Redis is replaced by fakeredis. Tests using the
+mongo fixture need a MongoDB server at TEST_MONGODB_URI and are skipped when
+none is reachable.
+"""
+
+import os
+import random
+import uuid
+from datetime import datetime
+
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "test")
+os.environ.setdefault("BIGQUERY_DATASET", "test")
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "test")
+
+import fakeredis
+import pytest
+from bson import ObjectId
+from pymongo import AsyncMongoClient, MongoClient
+from pymongo.errors import PyMongoError
+
+from app.db.memory_cache import memory_cache
+from app.db.mongo_client import mongodb_client
+from app.db.period_index import period_index
+from app.db.redis_client import RELEASE_LOCK_SCRIPT, redis_client
+from app.db.reference_registry import reference_registry
+
+TEST_MONGODB_URI = os.environ.get("TEST_MONGODB_URI", os.environ["MONGODB_URI"])
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def redis():
+    """Point the shared Redis client at an empty fakeredis server."""
+    original = redis_client.redis, redis_client._release_lock_script
+    redis_client.redis = fakeredis.aioredis.FakeRedis()
+    redis_client._release_lock_script = redis_client.redis.register_script(
+        RELEASE_LOCK_SCRIPT
+    )
+    memory_cache.clear()
+    yield redis_client.redis
+    memory_cache.clear()
+    redis_client.redis, redis_client._release_lock_script = original
+
+
+@pytest.fixture(scope="session")
+def mongo_server():
+    """Check once whether a MongoDB server is reachable."""
+    client = MongoClient(TEST_MONGODB_URI, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip(f"No MongoDB server at {TEST_MONGODB_URI}")
+    finally:
+        client.close()
+    return TEST_MONGODB_URI
+
+
+@pytest.fixture
+async def mongo(mongo_server, redis):
+    """
+    Point the shared MongoDB client at a fresh database, dropped afterwards.
+
+    Yields:
+        AsyncDatabase: The test database
+    """
+    original = mongodb_client.client, mongodb_client.db
+    mongodb_client.client = AsyncMongoClient(mongo_server)
+    mongodb_client.db = mongodb_client.client[f"test_{uuid.uuid4().hex[:12]}"]
+    yield mongodb_client.db
+    await mongodb_client.client.drop_database(mongodb_client.db.name)
+    await mongodb_client.client.close()
+    mongodb_client.client, mongodb_client.db = original
+
+
+def sales_metrics(rng: random.Random) -> dict:
+    """Unit metrics, some missing or not numeric as in the loaded data."""
+    metrics = {
+        "retailer_density": rng.uniform(0, 5),
+        "revenue_period_lga": rng.uniform(1000, 90000),
+        "ttv_period_lga": rng.choice([rng.uniform(100, 9000), "n/a"]),
+        "transaction_frequency": rng.randint(1, 40),
+    }
+    if rng.random() < 0.2:
+        del metrics["retailer_density"]
+    return metrics
+
+
+@pytest.fixture
+async def sales(mongo):
+    """
+    Seed periods, references and both sales unit collections, and load the
+    period index and reference registry from them. Unit documents cover three
+    periods and undated documents, without a date or with a null one, and
+    reference a deleted product category.
+
+    Yields:
+        Dict[str, Any]: Ids of the seeded periods, LGAs, states, brands and
+            product categories
+    """
+    rng = random.Random(21)
+    ids = {
+        "periods": [ObjectId() for _ in range(3)],
+        "lgas": [ObjectId() for _ in range(3)],
+        "states": [ObjectId() for _ in range(2)],
+        "brands": [ObjectId() for _ in range(2)],
+        "categories": [ObjectId() for _ in range(2)],
+        "deleted_category": ObjectId(),
+    }
+    await mongo.periods.insert_many(
+        [
+            {
+                "_id": period,
+                "period_name": f"2024-{month:02d}",
+                "start_date": datetime(2024, month, 1),
+                "end_date": datetime(2024, month, 28),
+            }
+            for month, period in enumerate(ids["periods"], start=1)
+        ]
+    )
+    await mongo.lga_boundaries.insert_many(
+        [
+            {
+                "_id": lga,
+                "lga_name": f"LGA {i}",
+                "geometry": {"type": "Point", "coordinates": [3 + i, 6 + i]},
+            }
+            for i, lga in enumerate(ids["lgas"])
+        ]
+    )
+    await mongo.brands.insert_many(
+        [
+            {"_id": brand, "brand_name": f"Brand {i}"}
+            for i, brand in enumerate(ids["brands"])
+        ]
+    )
+    await mongo.product_categories.insert_many(
+        [
+            {"_id": category, "product_category": f"Category {i}"}
+            for i, category in enumerate(ids["categories"])
+        ]
+    )
+
+    brand_units, category_units = [], []
+    for i, lga in enumerate(ids["lgas"]):
+        state = ids["states"][min(i, 1)]
+        for brand in ids["brands"]:
+            # Undated documents have a null date or none
+            for date in [{"date": period} for period in ids["periods"]] + [
+                {"date": None},
+                {},
+            ]:
+                for _ in range(2):
+                    unit = {"lga": lga, "state": state, "brand": brand, **date}
+                    brand_units.append({**unit, **sales_metrics(rng)})
+                    categories = ids["categories"] + [ids["deleted_category"]]
+                    items = [
+                        {"product_category": category, **sales_metrics(rng)}
+                        for category in rng.sample(categories, rng.randint(1, 3))
+                    ]
+                    category_units.append({**unit, "items": items})
+    await mongo.brand_boundaries_unit.insert_many(brand_units)
+    await mongo.brand_category_boundaries_unit.insert_many(category_units)
+
+    await period_index.load()
+    await reference_registry.load()
+    yield ids
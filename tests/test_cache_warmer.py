@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import pytest
+
+from app.db.redis_client import redis_client
+from app.services.cache_warmer import CacheWarmer
+
+pytestmark = pytest.mark.anyio
+
+calls = []
+
+
+@pytest.fixture
+def warmer(redis):
+    calls.clear()
+    warmer = CacheWarmer(
+        client=redis_client,
+        interval=60,
+        concurrency=2,
+        top_n=10,
+        window=3600,
+        queries=[],
+    )
+
+    @warmer.warmable
+    async def get_sales(
+        skip: int = 0,
+        limit: int = 10,
+        start_date: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+    ):
+        calls.append(
+            {"skip": skip, "limit": limit, "start_date": start_date, "cursor": cursor}
+        )
+
+    warmer.get_sales = get_sales
+    return warmer
+
+
+async def test_pages_of_one_result_set_are_warmed_once(warmer):
+    await warmer.get_sales(skip=0, limit=10)
+    await warmer.get_sales(skip=10, limit=10)
+    await warmer.get_sales(limit=10, cursor="b2Zmc2V0")
+    await warmer.get_sales(skip=20, limit=50)
+    await warmer.flush()
+
+    (planned,) = await warmer.plan()
+
+    assert planned.kwargs["skip"] == 0
+    assert planned.kwargs["limit"] == 10
+    assert planned.kwargs["cursor"] is None
+
+
+async def test_page_sizes_of_one_result_set_are_warmed_once(warmer):
+    await warmer.get_sales(limit=10)
+    await warmer.get_sales(limit=50)
+    await warmer.flush()
+
+    (planned,) = await warmer.plan()
+
+    assert planned.kwargs["limit"] == 10
+
+
+async def test_replayed_datetimes_are_the_same_aware_utc_instant(warmer):
+    lagos = datetime(2024, 1, 1, 1, 0, tzinfo=timezone(timedelta(hours=1)))
+    await warmer.get_sales(start_date=lagos)
+    await warmer.flush()
+    calls.clear()
+
+    await warmer.run_cycle()
+
+    (replayed,) = calls
+    assert replayed["start_date"] == lagos
+    assert replayed["start_date"].tzinfo == timezone.utc
+
+
+async def test_naive_datetimes_replay_as_utc(warmer):
+    await warmer.get_sales(start_date=datetime(2024, 1, 1))
+    await warmer.flush()
+    calls.clear()
+
+    await warmer.run_cycle()
+
+    assert calls[0]["start_date"] == datetime(2024, 1, 1, tzinfo=timezone.utc)
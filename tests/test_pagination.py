@@ -0,0 +1,83 @@
+import pytest
+
+from app.db.mongo_client import MongoDBClient
+from app.db.single_flight import single_flight
+from app.services.base import BaseService, InvalidCursorError
+
+pytestmark = pytest.mark.anyio
+
+SORT = [("name", 1), ("_id", 1)]
+ITEMS = [{"_id": i, "name": f"item {i // 2}"} for i in range(10)]
+
+
+async def compute_all():
+    return ITEMS
+
+
+async def compute_page(skip, limit, after):
+    if after is not None:
+        MongoDBClient.keyset_filter(SORT, after)
+    return ITEMS[skip:skip + limit]
+
+
+async def compute_count():
+    return len(ITEMS)
+
+
+async def get_page(cursor=None, skip=0):
+    return await BaseService.get_or_compute_page(
+        "items",
+        compute_all,
+        skip,
+        3,
+        compute_page=compute_page,
+        compute_count=compute_count,
+        cursor=cursor,
+        sort_key=lambda item: [item[field] for field, _ in SORT],
+    )
+
+
+async def test_cursor_continues_the_previous_page(redis):
+    first = await get_page()
+    second = await get_page(cursor=first["next_cursor"])
+
+    assert first["data"] == ITEMS[:3]
+    assert second["data"] == ITEMS[3:6]
+    assert second["total"] == len(ITEMS)
+
+
+async def test_keyset_cursor_is_rejected_by_offset_pages(redis):
+    cursor = BaseService.encode_cursor(3, ["item 1", 3])
+
+    with pytest.raises(InvalidCursorError):
+        await BaseService.get_or_compute_page("items", compute_all, 0, 3, cursor=cursor)
+
+
+async def test_set_gone_after_another_worker_computed_it_is_recomputed(
+    redis, monkeypatch
+):
+    async def computed_by_another_worker(key, compute, lookup):
+        # Its metadata, while the list itself has already been evicted
+        return {"data": {"total": len(ITEMS)}}
+
+    monkeypatch.setattr(single_flight, "do", computed_by_another_worker)
+
+    page = await BaseService.get_or_compute_page("items", compute_all, 3, 3)
+
+    assert page["data"] == ITEMS[3:6]
+    assert page["total"] == len(ITEMS)
+    assert page["next_cursor"] is not None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        BaseService.encode_cursor(-1, None),
+        # A cursor built for a sort on one field, e.g. by another endpoint
+        BaseService.encode_cursor(3, ["item 1"]),
+    ],
+)
+async def test_invalid_cursor_is_rejected(redis, cursor):
+    with pytest.raises(InvalidCursorError):
+        await get_page(cursor=cursor)
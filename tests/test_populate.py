@@ -0,0 +1,160 @@
+import bson
+import pytest
+from bson import ObjectId
+
+from app.db.mongo_client import PopulateField, mongodb_client
+from app.db.reference_cache import reference_cache
+
+pytestmark = pytest.mark.anyio
+
+B1, B2, C1, C2 = (ObjectId() for _ in range(4))
+MISSING = ObjectId()
+
+BRANDS = [
+    {"_id": B1, "name": "Brand 1", "country": "NG"},
+    {"_id": B2, "name": "Brand 2", "country": "GH"},
+]
+CATEGORIES = [
+    {"_id": C1, "name": "Drinks", "rank": 2},
+    {"_id": C2, "name": "Snacks", "rank": 1},
+]
+ORDERS = [
+    {
+        "_id": 1,
+        "name": "first",
+        "brand": B1,
+        "tags": [B2, MISSING, B1],
+        "items": [
+            {"product_category": C1, "qty": 2},
+            {"qty": 1},
+            {"product_category": MISSING, "qty": 3},
+        ],
+        "total": 10,
+    },
+    {"_id": 2, "brand": MISSING, "items": {"product_category": C2, "qty": 1}, "tags": []},
+    {"_id": 3, "name": "no references"},
+    {"_id": 4, "brand": None, "items": [{"product_category": C2}, {"product_category": C1}]},
+]
+
+brand = {doc["_id"]: doc for doc in BRANDS}
+category = {doc["_id"]: doc for doc in CATEGORIES}
+
+POPULATED = [
+    {
+        "_id": 1,
+        "name": "first",
+        "brand": brand[B1],
+        "tags": [brand[B2], None, brand[B1]],
+        "items": [
+            {"product_category": category[C1], "qty": 2},
+            {"qty": 1},
+            {"product_category": None, "qty": 3},
+        ],
+        "total": 10,
+    },
+    {
+        "_id": 2,
+        "brand": None,
+        "items": {"product_category": category[C2], "qty": 1},
+        "tags": [],
+    },
+    {"_id": 3, "name": "no references"},
+    {
+        "_id": 4,
+        "brand": None,
+        "items": [{"product_category": category[C2]}, {"product_category": category[C1]}],
+    },
+]
+
+
+@pytest.fixture(autouse=True)
+def empty_reference_cache():
+    reference_cache.clear()
+    yield
+    reference_cache.clear()
+
+
+def ordered(documents):
+    """BSON bytes, so comparisons also check field order."""
+    return [bson.encode(doc) for doc in documents]
+
+
+def copy(documents):
+    return bson.decode_all(b"".join(ordered(documents)))
+
+
+def populate_in_memory(documents):
+    fetched = {doc["_id"]: doc for doc in BRANDS + CATEGORIES}
+    for path in ("brand", "tags", "items.product_category"):
+        for doc in documents:
+            PopulateField(path, "", lookup=False).replace(doc, fetched)
+    return documents
+
+
+def test_replace_resolves_nested_and_array_paths_in_order():
+    documents = populate_in_memory(copy(ORDERS))
+
+    assert ordered(documents) == ordered(POPULATED)
+
+
+def test_replace_copies_shared_documents():
+    documents = populate_in_memory(copy(ORDERS[:1]))
+    documents[0]["brand"]["name"] = "changed"
+
+    assert brand[B1]["name"] == "Brand 1"
+
+
+def test_lookup_defaults_to_batched_for_reference_cached_collections():
+    query = (
+        mongodb_client.query("orders")
+        .populate("brand", "brands")
+        .populate("items.product_category", "product_categories")
+        .populate("owner", "users")
+    )
+
+    assert query.cache_command()["populate"] == [
+        ["brand", "brands", False],
+        ["items.product_category", "product_categories", False],
+        ["owner", "users", True],
+    ]
+
+
+@pytest.fixture
+async def orders(mongo):
+    await mongo.brands.insert_many(copy(BRANDS))
+    await mongo.product_categories.insert_many(copy(CATEGORIES))
+    await mongo.orders.insert_many(copy(ORDERS))
+    return mongo
+
+
+def query(lookup):
+    return (
+        mongodb_client.query("orders")
+        .sort([("_id", 1)])
+        .populate("brand", "brands", lookup=lookup)
+        .populate("tags", "brands", lookup=lookup)
+        .populate("items.product_category", "product_categories", lookup=lookup)
+    )
+
+
+@pytest.mark.parametrize("lookup", [False, True])
+async def test_populate_resolves_references(orders, lookup):
+    documents = await query(lookup).exec()
+
+    assert ordered(documents) == ordered(POPULATED)
+
+
+async def test_lookup_and_batched_populate_give_the_same_documents(orders):
+    batched = await query(False).exec()
+    pushed_down = await query(True).exec()
+
+    assert ordered(batched) == ordered(pushed_down)
+    assert ordered([await query(False).exec_one()]) == ordered([await query(True).exec_one()])
+
+
+async def test_batched_populate_serves_cached_references(orders):
+    first = await query(False).exec()
+    await orders.brands.delete_many({})
+    await orders.product_categories.delete_many({})
+
+    assert ordered(await query(False).exec()) == ordered(first)
@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from app.db.mongo_client import mongodb_client
+from app.db.query_cache import query_cache, query_hash
+
+OID = ObjectId("65a1b2c3d4e5f60718293a4b")
+
+
+def aggregate(pipeline):
+    return {"aggregate": "sales", "pipeline": pipeline, "cursor": {}}
+
+
+def test_hash_ignores_dict_key_order():
+    a = aggregate([{"$match": {"lga": OID, "brand": "x", "date": {"$gte": 1, "$lt": 5}}}])
+    b = aggregate([{"$match": {"date": {"$lt": 5, "$gte": 1}, "brand": "x", "lga": OID}}])
+
+    assert query_hash(a) == query_hash(b)
+
+
+def test_hash_keeps_sort_key_order():
+    a = aggregate([{"$sort": {"lga": 1, "brand": 1}}])
+    b = aggregate([{"$sort": {"brand": 1, "lga": 1}}])
+
+    assert query_hash(a) != query_hash(b)
+
+
+def test_hash_ignores_set_operand_order():
+    other = ObjectId("65a1b2c3d4e5f60718293a4c")
+    a = aggregate([{"$match": {"date": {"$in": [OID, other]}}}])
+    b = aggregate([{"$match": {"date": {"$in": [other, OID]}}}])
+
+    assert query_hash(a) == query_hash(b)
+
+
+@pytest.mark.parametrize(
+    "stage",
+    [
+        lambda operands: {"$match": {"$expr": {"$in": operands}}},
+        lambda operands: {"$project": {"found": {"$in": operands}}},
+        lambda operands: {"$group": {"_id": {"$in": operands}}},
+        lambda operands: {"$set": {"found": {"$in": operands}}},
+    ],
+)
+def test_hash_keeps_expression_operand_order(stage):
+    a = aggregate([stage(["a", "$arr"])])
+    b = aggregate([stage(["$arr", "a"])])
+
+    assert query_hash(a) != query_hash(b)
+
+
+def test_hash_ignores_set_operand_order_in_nested_filters():
+    other = ObjectId("65a1b2c3d4e5f60718293a4c")
+
+    def lookup(ids):
+        pipeline = [{"$match": {"$or": [{"brand": {"$nin": ids}}]}}]
+        return aggregate([{"$lookup": {"from": "brands", "pipeline": pipeline}}])
+
+    def find(ids):
+        return mongodb_client.find_command("sales", {"lga": {"$in": ids}})
+
+    assert query_hash(lookup([OID, other])) == query_hash(lookup([other, OID]))
+    assert query_hash(find([OID, other])) == query_hash(find([other, OID]))
+
+
+def test_hash_distinguishes_object_id_from_equal_looking_string():
+    a = aggregate([{"$match": {"lga": OID}}])
+    b = aggregate([{"$match": {"lga": str(OID)}}])
+    c = aggregate([{"$match": {"lga": ObjectId(str(OID))}}])
+
+    assert query_hash(a) != query_hash(b)
+    assert query_hash(a) == query_hash(c)
+
+
+def test_hash_matches_aware_and_naive_datetimes_of_the_same_instant():
+    naive = datetime(2024, 1, 1, 12, 0)
+    utc = naive.replace(tzinfo=timezone.utc)
+    lagos = utc.astimezone(timezone(timedelta(hours=1)))
+
+    hashes = {
+        query_hash(aggregate([{"$match": {"start_date": {"$gte": value}}}]))
+        for value in (naive, utc, lagos)
+    }
+
+    assert len(hashes) == 1
+
+
+def test_hash_distinguishes_different_instants():
+    naive = datetime(2024, 1, 1, 12, 0)
+    shifted = naive.replace(tzinfo=timezone(timedelta(hours=1)))
+
+    assert query_hash(aggregate([{"$match": {"d": naive}}])) != query_hash(
+        aggregate([{"$match": {"d": shifted}}])
+    )
+
+
+def test_hash_is_stable_across_runs():
+    command = aggregate(
+        [
+            {"$match": {"lga": OID, "date": {"$gte": datetime(2024, 1, 1)}}},
+            {"$group": {"_id": "$lga", "count": {"$sum": 1}}},
+            {"$sort": {"_id": 1}},
+        ]
+    )
+
+    assert (
+        query_hash(command)
+        == "4e11140627ade1c2f2f504d3e3f1aaa6c564515c96dd21306eb74cb4bfeaa0a4"
+    )
+
+
+def test_builder_hash_matches_equivalent_pipelines():
+    a = mongodb_client.aggregate("sales").match({"lga": OID, "brand": "x"})
+    b = mongodb_client.aggregate("sales").match({"brand": "x", "lga": OID})
+
+    assert a.query_hash() == b.query_hash()
+    assert query_cache.key(a.command()).startswith(query_cache.prefix("sales"))
+
+
+@pytest.mark.anyio
+async def test_equivalent_commands_share_one_entry(redis):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return [{"_id": OID, "at": datetime(2024, 1, 1)}]
+
+    naive = datetime(2024, 1, 1)
+    aware = naive.replace(tzinfo=timezone.utc)
+    first = await query_cache.get_or_compute(
+        aggregate([{"$match": {"a": 1, "d": naive}}]), compute
+    )
+    second = await query_cache.get_or_compute(
+        aggregate([{"$match": {"d": aware, "a": 1}}]), compute
+    )
+
+    assert first == second == [{"_id": OID, "at": datetime(2024, 1, 1)}]
+    assert len(calls) == 1
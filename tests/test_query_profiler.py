@@ -0,0 +1,76 @@
+from app.db.query_profiler import redact
+
+
+def test_filter_literals_are_redacted():
+    assert redact({"state": "Lagos", "year": {"$in": [2023, 2024]}}) == {
+        "state": "?",
+        "year": {"$in": "?"},
+    }
+
+
+def test_shape_operators_are_kept():
+    pipeline = [
+        {"$match": {"brand": "Acme"}},
+        {"$group": {"_id": "$lga", "total": {"$sum": 1}}},
+        {"$sort": {"total": -1}},
+    ]
+
+    assert redact(pipeline) == [
+        {"$match": {"brand": "?"}},
+        {"$group": {"_id": "$lga", "total": {"$sum": 1}}},
+        {"$sort": {"total": -1}},
+    ]
+
+
+def test_lookup_sub_pipeline_literals_are_redacted():
+    stage = {
+        "$lookup": {
+            "from": "brands",
+            "let": {"brand": "$brand"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$_id", "$$brand"]}, "tier": "gold"}},
+                {"$project": {"brand_name": 1}},
+            ],
+            "as": "brand",
+        }
+    }
+
+    assert redact(stage) == {
+        "$lookup": {
+            "from": "brands",
+            "let": {"brand": "$brand"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": "?"}, "tier": "?"}},
+                {"$project": {"brand_name": 1}},
+            ],
+            "as": "brand",
+        }
+    }
+
+
+def test_facet_and_union_sub_pipelines_are_redacted():
+    stages = [
+        {
+            "$facet": {
+                "data": [
+                    {"$match": {"state": "Kano"}},
+                    {"$lookup": {"from": "lgas", "pipeline": [{"$match": {"code": 7}}], "as": "lga"}},
+                ],
+                "total": [{"$count": "count"}],
+            }
+        },
+        {"$unionWith": {"coll": "archive", "pipeline": [{"$match": {"year": 2020}}]}},
+    ]
+
+    assert redact(stages) == [
+        {
+            "$facet": {
+                "data": [
+                    {"$match": {"state": "?"}},
+                    {"$lookup": {"from": "lgas", "pipeline": [{"$match": {"code": "?"}}], "as": "lga"}},
+                ],
+                "total": [{"$count": "count"}],
+            }
+        },
+        {"$unionWith": {"coll": "archive", "pipeline": [{"$match": {"year": "?"}}]}},
+    ]
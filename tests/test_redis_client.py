@@ -0,0 +1,51 @@
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.db.memory_cache import memory_cache
+from app.db.redis_client import redis_client
+from app.services.base import BaseService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def failing_writes(redis, monkeypatch):
+    """Make every Redis write fail as during an outage."""
+
+    async def fail(*args, **kwargs):
+        raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(redis, "setex", fail)
+    monkeypatch.setattr(redis, "pipeline", lambda **kwargs: FailingPipeline())
+    return redis
+
+
+class FailingPipeline:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    async def execute(self):
+        raise ConnectionError("Redis is down")
+
+
+async def test_set_cached_data_returns_size(redis):
+    size = await redis_client.set_cached_data("key", {"a": 1})
+
+    assert size == len(await redis.get("key"))
+
+
+async def test_failed_writes_are_not_reported_as_stored(failing_writes):
+    assert await redis_client.set_cached_data("key", {"a": 1}) is None
+    assert await redis_client.set_cached_list("list", [{"a": 1}, {"b": 2}]) is None
+
+
+async def test_failed_write_does_not_fill_l1(failing_writes):
+    await BaseService.set_cached_data("key", {"a": 1})
+
+    assert memory_cache.get("key") is None
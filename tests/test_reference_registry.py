@@ -0,0 +1,44 @@
+import pytest
+from bson import ObjectId
+
+from app.db.mongo_client import mongodb_client
+from app.db.reference_registry import ReferenceRegistry, mark_changed
+
+pytestmark = pytest.mark.anyio
+
+BRAND = ObjectId()
+
+
+@pytest.fixture
+async def registry(mongo):
+    await mongo.brands.insert_one({"_id": BRAND, "brand_name": "Brand"})
+    registry = ReferenceRegistry(
+        mongodb_client, {"brands": {"brand_name": 1}}, refresh_interval=300
+    )
+    assert await registry.reload() is True
+    return registry
+
+
+async def test_unchanged_collections_are_not_read_again(registry):
+    version = registry.version
+
+    assert await registry.reload() is False
+    assert registry.version == version
+    assert registry.stats()["loads"] == 1
+    assert registry.stats()["unchanged_reloads"] == 1
+
+
+async def test_inserted_documents_are_loaded(registry, mongo):
+    added = ObjectId()
+    await mongo.brands.insert_one({"_id": added, "brand_name": "Added"})
+
+    assert await registry.reload() is True
+    assert registry.get("brands", added)["brand_name"] == "Added"
+
+
+async def test_edits_in_place_are_loaded_once_marked(registry, mongo):
+    await mongo.brands.replace_one({"_id": BRAND}, {"brand_name": "Renamed"})
+    await mark_changed(mongodb_client, "brands")
+
+    assert await registry.reload() is True
+    assert registry.get("brands", BRAND)["brand_name"] == "Renamed"
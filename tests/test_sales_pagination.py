@@ -0,0 +1,162 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.db.mongo_client import mongodb_client
+from app.db.rollup import METRICS
+from app.services.sales_service import REFERENCE_FIELDS, SalesService
+
+pytestmark = pytest.mark.anyio
+
+LIMIT = 5
+PERIODS = {"start_date": datetime(2024, 1, 1), "end_date": datetime(2024, 2, 28)}
+
+
+async def join_then_facet(collection, filters, fields, skip, limit, items=False):
+    """
+    Page sales metrics as before pagination moved ahead of the join: every
+    group is joined with $lookup and $unwind, then $facet slices the page and
+    counts the total. Groups were returned in no particular order; they are
+    sorted by key here, as the paginated result sets are.
+    """
+    match = {}
+    if "start_date" in filters:
+        periods = await mongodb_client.find_many(
+            "periods",
+            {
+                "start_date": {"$gte": filters["start_date"]},
+                "end_date": {"$lte": filters["end_date"]},
+            },
+        )
+        match["date"] = {"$in": [period["_id"] for period in periods]}
+    elif not items:
+        match["date"] = {"$exists": False}
+    for field in ("lga", "state", "brand"):
+        if f"{field}_id" in filters:
+            match[field] = ObjectId(filters[f"{field}_id"])
+
+    prefix = "$items." if items else "$"
+    pipeline = [{"$match": match}]
+    group_id = {"lga": "$lga"}
+    if items:
+        pipeline.append({"$unwind": "$items"})
+        if "product_category" in filters:
+            category = ObjectId(filters["product_category"])
+            pipeline.append({"$match": {"items.product_category": category}})
+        group_id["product_category"] = "$items.product_category"
+    if "brand_id" in filters:
+        group_id["brand"] = "$brand"
+    pipeline.append(
+        {
+            "$group": {
+                "_id": group_id,
+                "count": {"$sum": 1},
+                **{
+                    name: {"$avg": f"{prefix}{field}"}
+                    for name, field in METRICS.items()
+                },
+            }
+        }
+    )
+    for field in fields:
+        pipeline += [
+            {
+                "$lookup": {
+                    "from": REFERENCE_FIELDS[field],
+                    "localField": f"_id.{field}",
+                    "foreignField": "_id",
+                    "as": field,
+                }
+            },
+            {"$unwind": f"${field}"},
+        ]
+    pipeline += [
+        {"$sort": {"_id": 1}},
+        {
+            "$project": {
+                "_id": 0,
+                "count": 1,
+                **{name: 1 for name in fields + list(METRICS)},
+            }
+        },
+        {
+            "$facet": {
+                "data": [{"$skip": skip}, {"$limit": limit}],
+                "total": [{"$count": "total"}],
+            }
+        },
+    ]
+
+    cursor = await mongodb_client.get_collection(collection).aggregate(pipeline)
+    result = (await cursor.to_list())[0]
+    return {
+        "data": [
+            SalesService.transform_aggregated_to_geojson(doc) for doc in result["data"]
+        ],
+        "total": result["total"][0]["total"] if result["total"] else 0,
+    }
+
+
+async def assert_same_pages(method, collection, filters, fields, items=False):
+    first = await method(skip=0, limit=LIMIT, **filters)
+    assert first["total"] > 0
+
+    for skip in range(0, first["total"] + LIMIT, LIMIT):
+        page = await method(skip=skip, limit=LIMIT, **filters)
+        before = await join_then_facet(collection, filters, fields, skip, LIMIT, items)
+
+        assert page["data"] == before["data"]
+        assert page["total"] == before["total"]
+
+
+V1_FILTERS = {
+    "undated": lambda ids: {},
+    "periods": lambda ids: PERIODS,
+    "lga": lambda ids: {**PERIODS, "lga_id": str(ids["lgas"][1])},
+    "brand": lambda ids: {**PERIODS, "brand_id": str(ids["brands"][0])},
+}
+V2_FILTERS = {
+    "everything": lambda ids: {},
+    "periods": lambda ids: PERIODS,
+    "state": lambda ids: {**PERIODS, "state_id": str(ids["states"][0])},
+    "brand": lambda ids: {"brand_id": str(ids["brands"][1])},
+    "category": lambda ids: {
+        **PERIODS,
+        "product_category": str(ids["categories"][1]),
+    },
+}
+
+
+@pytest.mark.parametrize("name", V1_FILTERS)
+async def test_pages_match_join_then_facet_v1(sales, name):
+    filters = V1_FILTERS[name](sales)
+    fields = ["lga", "brand"] if "brand_id" in filters else ["lga"]
+
+    await assert_same_pages(
+        SalesService.get_sales_metrics, "brand_boundaries_unit", filters, fields
+    )
+
+
+@pytest.mark.parametrize("name", V2_FILTERS)
+async def test_pages_match_join_then_facet_v2(sales, name):
+    filters = V2_FILTERS[name](sales)
+    fields = ["lga", "product_category"]
+    if "brand_id" in filters:
+        fields.append("brand")
+
+    await assert_same_pages(
+        SalesService.get_sales_metricsv2,
+        "brand_category_boundaries_unit",
+        filters,
+        fields,
+        items=True,
+    )
+
+
+async def test_rows_of_deleted_references_are_left_out_of_the_total(sales):
+    page = await SalesService.get_sales_metricsv2(limit=1000)
+    categories = {feature["properties"]["product_category"] for feature in page["data"]}
+
+    assert categories == {"Category 0", "Category 1"}
+    assert page["total"] == len(page["data"])
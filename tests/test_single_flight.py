@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.core.metrics import metrics
+from app.db.redis_client import redis_client
+from app.db.single_flight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+WAIT_TIMEOUT = 5.0
+
+
+def worker() -> SingleFlight:
+    """A coordinator with its own in-flight tasks, as in a separate worker."""
+    return SingleFlight(
+        client=redis_client, lease_ms=10000, wait_timeout=WAIT_TIMEOUT, poll_interval=0.01
+    )
+
+
+class Backend:
+    """A computation that stores its result in a dict standing in for the cache."""
+
+    def __init__(self, cacheable: bool = True, seconds: float = 0.1):
+        self.cache = {}
+        self.calls = 0
+        self.cacheable = cacheable
+        self.seconds = seconds
+
+    async def compute(self):
+        self.calls += 1
+        await asyncio.sleep(self.seconds)
+        value = f"value {self.calls}"
+        if self.cacheable:
+            self.cache["key"] = value
+        else:
+            SingleFlight.not_cached()
+        return value
+
+    async def lookup(self):
+        return self.cache.get("key")
+
+
+async def test_local_callers_share_one_computation(redis):
+    flight, backend = worker(), Backend(cacheable=False)
+
+    results = await asyncio.gather(
+        *(flight.do("key", backend.compute, backend.lookup) for _ in range(20))
+    )
+
+    assert backend.calls == 1
+    assert set(results) == {"value 1"}
+
+
+async def test_other_workers_read_the_cached_result(redis):
+    backend = Backend()
+
+    results = await asyncio.gather(
+        *(worker().do("key", backend.compute, backend.lookup) for _ in range(5))
+    )
+
+    assert backend.calls == 1
+    assert set(results) == {"value 1"}
+
+
+async def test_other_workers_stop_waiting_when_the_result_is_not_cached(redis):
+    backend = Backend(cacheable=False, seconds=0.2)
+    holder, waiters = worker(), [worker() for _ in range(4)]
+
+    started = time.monotonic()
+    first = asyncio.create_task(holder.do("key", backend.compute, backend.lookup))
+    await asyncio.sleep(0.02)
+    await asyncio.gather(
+        *(
+            flight.do("key", backend.compute, backend.lookup)
+            for flight in waiters
+            for _ in range(5)
+        )
+    )
+    await first
+
+    # Once per worker, concurrently, rather than one after another as each
+    # takes the lock or at the wait timeout
+    assert backend.calls == 1 + len(waiters)
+    assert time.monotonic() - started < 2 * backend.seconds + 0.25
+
+
+async def test_redis_outage_computes_without_the_lock_and_is_counted(redis, monkeypatch):
+    async def fail(*args, **kwargs):
+        raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(redis, "set", fail)
+    before = metrics.counter_value("cache_redis_errors_total", op="lock")
+
+    assert await redis_client.acquire_lock("lock:key", "token", 1000) is True
+    assert metrics.counter_value("cache_redis_errors_total", op="lock") == before + 1